@@ -0,0 +1,80 @@
+"""Memory per chunk and encoder frames/sec for text-only and mixed chunk
+streams. Run it on two checkouts to compare chunk layouts or dispatch.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_chunk_dispatch.py
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from assistant_stream.assistant_stream_chunk import (
+    StepFinishChunk,
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization.assistant_transport import (
+    AssistantTransportEncoder,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+CHUNKS = 200_000
+ROUNDS = 7
+
+
+def bytes_per_chunk() -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    chunks = [TextDeltaChunk(text_delta="tok") for _ in range(CHUNKS)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del chunks
+    return (size - CHUNKS * 8) / CHUNKS  # exclude the list's pointers
+
+
+def text_stream() -> list:
+    return [TextDeltaChunk(text_delta=f"tok{i} ") for i in range(CHUNKS)]
+
+
+def mixed_stream() -> list:
+    chunks = []
+    for i in range(CHUNKS // 10):
+        chunks.extend(TextDeltaChunk(text_delta=f"tok{j} ") for j in range(6))
+        chunks.append(ToolCallBeginChunk(tool_call_id=f"c{i}", tool_name="search"))
+        chunks.append(ToolCallDeltaChunk(tool_call_id=f"c{i}", args_text_delta="{}"))
+        chunks.append(
+            UpdateStateChunk(operations=[{"type": "set", "path": ["n"], "value": i}])
+        )
+        chunks.append(StepFinishChunk(finish_reason="stop"))
+    return chunks
+
+
+async def frames_per_second(encoder_cls, chunks: list) -> float:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    best = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        frames = 0
+        async for _ in encoder_cls().encode_stream_bytes(stream()):
+            frames += 1
+        best = max(best, frames / (time.perf_counter() - start))
+    return best
+
+
+async def main() -> None:
+    print(f"bytes per TextDeltaChunk: {bytes_per_chunk():.0f}")
+    for name, chunks in (("text", text_stream()), ("mixed", mixed_stream())):
+        for encoder_cls in (DataStreamEncoder, AssistantTransportEncoder):
+            rate = await frames_per_second(encoder_cls, chunks)
+            print(f"{name:>5} {encoder_cls.__name__:>25}: {rate / 1000:5.0f}k frames/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Counts ASGI `http.response.body` sends and wall time for a 2k-token answer
+streamed through AssistantStreamResponse, with and without write coalescing.
+Tokens arrive in bursts, as they do when an upstream model client flushes
+several deltas per network read.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_coalesce.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream import create_run
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+TOKENS = 2_000
+BURST = 8
+
+
+async def answer(controller):
+    for i in range(TOKENS):
+        controller.append_text(f"tok{i} ")
+        if i % BURST == BURST - 1:
+            await asyncio.sleep(0)
+
+
+async def serve(coalesce) -> tuple:
+    sends = 0
+    size = 0
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal sends, size
+        if message["type"] == "http.response.body":
+            sends += 1
+            size += len(message.get("body", b""))
+            # Yield like a real transport write.
+            await asyncio.sleep(0)
+
+    response = AssistantStreamResponse(
+        create_run(answer), DataStreamEncoder(), heartbeat=False, coalesce=coalesce
+    )
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    start = time.perf_counter()
+    await response(scope, receive, send)
+    return sends, size, time.perf_counter() - start
+
+
+def main() -> None:
+    for label, coalesce in (("off", False), ("ready frames", True), ("2ms", 0.002)):
+        sends, size, elapsed = asyncio.run(serve(coalesce))
+        print(
+            f"{label:>12}: {sends:>5} sends, {size / 1e3:6.1f} kB, "
+            f"{elapsed * 1e3:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Bytes per streamed token for the data stream in the verbose and compact
+dialects, on a simulated LangGraph subgraph run: a tool call whose subgraph
+streams an AI message into the tool message's artifact state while the same
+tokens are echoed as text deltas under the tool call's parent id.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_compact_dialect.py
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from assistant_stream import create_run
+from assistant_stream.modules.langgraph import (
+    append_langgraph_event,
+    get_tool_call_subgraph_state,
+)
+from assistant_stream.serialization.data_stream import (
+    DataStreamDecoder,
+    DataStreamEncoder,
+)
+
+TOKENS = 2_000
+HISTORY = 12
+NAMESPACE = ("research:4f1c",)
+
+
+async def run(controller) -> None:
+    messages = []
+    for i in range(HISTORY - 1):
+        messages.append(HumanMessage(content=f"question {i}", id=f"h{i}").model_dump())
+    messages.append(
+        AIMessage(
+            content="",
+            id="a1",
+            tool_calls=[{"id": "call_research", "name": "research", "args": {}}],
+        ).model_dump()
+    )
+    controller.state = {"messages": messages}
+
+    subgraph = controller.with_parent_id("call_research")
+    for i in range(TOKENS):
+        token = f" tok{i}"
+        # Looked up per event, as a LangGraph stream loop does.
+        subgraph_state = get_tool_call_subgraph_state(
+            controller, NAMESPACE, "research", {"messages": []}
+        )
+        append_langgraph_event(
+            subgraph_state,
+            NAMESPACE,
+            "messages",
+            (AIMessageChunk(content=token, id="sub-a1"), {}),
+        )
+        subgraph.append_text(token)
+        # One flush per token, as when tokens arrive from the model.
+        controller.flush()
+        await asyncio.sleep(0)
+
+
+async def encode(compact: bool) -> bytes:
+    encoder = DataStreamEncoder(compact=compact)
+    frames = [frame async for frame in encoder.encode_stream_bytes(create_run(run))]
+    return b"".join(frames)
+
+
+async def main() -> None:
+    verbose = await encode(False)
+    compact = await encode(True)
+    decoded = DataStreamDecoder().feed(compact)
+    assert decoded == DataStreamDecoder().feed(verbose)
+
+    for label, wire in (("verbose", verbose), ("compact", compact)):
+        print(
+            f"{label:>8}: {len(wire) / TOKENS:6.1f} bytes/token, "
+            f"{len(wire) / 1e3:7.1f} kB total"
+        )
+    print(f"  saving: {1 - len(compact) / len(verbose):.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
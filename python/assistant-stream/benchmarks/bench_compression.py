@@ -0,0 +1,97 @@
+"""Compression ratios for streamed bodies with a sync flush after every write
+(uncoalesced) and after every ~1 KiB of frames, against compressing the whole
+body at once. Inputs: the assistant-transport interop fixture and a long
+LangGraph state stream (2k AI message chunks merged into state).
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_compression.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.messages import AIMessageChunk, HumanMessage  # noqa: E402
+
+from assistant_stream import create_run  # noqa: E402
+from assistant_stream.modules.langgraph import append_langgraph_event  # noqa: E402
+from assistant_stream.serialization.assistant_transport import (  # noqa: E402
+    AssistantTransportEncoder,
+)
+from assistant_stream.serialization.compression import (  # noqa: E402
+    available_encodings,
+    compress_frames,
+    create_compressor,
+)
+from tests.generate_interop_fixture import FIXTURE_PATH  # noqa: E402
+
+TOKENS = 2_000
+
+
+def fixture_frames() -> list:
+    body = FIXTURE_PATH.read_bytes()
+    return [frame + b"\n\n" for frame in body.split(b"\n\n") if frame]
+
+
+async def langgraph_frames() -> list:
+    async def run(controller):
+        controller.state = {"messages": []}
+        append_langgraph_event(
+            controller.state,
+            (),
+            "messages",
+            (HumanMessage(content="Tell me a long story.", id="human_1"), {}),
+        )
+        for i in range(TOKENS):
+            append_langgraph_event(
+                controller.state,
+                (),
+                "messages",
+                (AIMessageChunk(content=f"word{i % 50} ", id="ai_1"), {}),
+            )
+            if i % 16 == 15:
+                await asyncio.sleep(0)
+
+    encoder = AssistantTransportEncoder()
+    return [frame async for frame in encoder.encode_stream_bytes(create_run(run))]
+
+
+async def compressed_size(frames: list, encoding: str, min_flush: int) -> int:
+    async def stream():
+        for frame in frames:
+            yield frame
+
+    compressor = create_compressor(encoding)
+    size = 0
+    async for chunk in compress_frames(stream(), compressor, min_flush):
+        size += len(chunk)
+    return size
+
+
+def whole_body_size(frames: list, encoding: str) -> int:
+    compressor = create_compressor(encoding)
+    return len(compressor.compress(b"".join(frames)) + compressor.finish())
+
+
+async def main() -> None:
+    inputs = {
+        "interop fixture": fixture_frames(),
+        "langgraph state": await langgraph_frames(),
+    }
+    for name, frames in inputs.items():
+        raw = sum(len(frame) for frame in frames)
+        print(f"{name}: {len(frames)} frames, {raw / 1e3:.1f} kB")
+        for encoding in available_encodings():
+            per_write = await compressed_size(frames, encoding, 0)
+            per_kib = await compressed_size(frames, encoding, 1024)
+            whole = whole_body_size(frames, encoding)
+            print(
+                f"  {encoding:>4}: per write {raw / per_write:5.2f}x, "
+                f"per 1 KiB {raw / per_kib:5.2f}x, whole body {raw / whole:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
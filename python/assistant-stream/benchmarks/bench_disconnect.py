@@ -0,0 +1,82 @@
+"""Time from a client disconnect to a create_run callback seeing
+cancellation, while the callback is in a 1 s tool call that writes nothing.
+"before" serves the same response through StreamingResponse.__call__, the
+previous code path; "after" through AssistantStreamResponse.__call__.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_disconnect.py
+"""
+
+import asyncio
+import statistics
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from assistant_stream import RunController, create_run
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+TOOL_CALL_SECONDS = 1.0
+TRIALS = 5
+
+
+async def trial(serve, spec_version: str) -> float:
+    loop = asyncio.get_running_loop()
+    disconnected = asyncio.Event()
+    cancelled = asyncio.Event()
+    times: dict = {}
+
+    async def run(controller: RunController):
+        controller.append_text("calling tool")
+        deadline = loop.time() + TOOL_CALL_SECONDS
+        # The tool polls for cancellation but has nothing to stream.
+        while loop.time() < deadline and not controller.is_cancelled:
+            await asyncio.sleep(0.001)
+        if not controller.is_cancelled:
+            controller.append_text("tool done")
+            await controller.cancelled_event.wait()
+        times["cancelled"] = loop.time()
+        cancelled.set()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if disconnected.is_set():
+            raise OSError("client went away")
+        if message.get("body"):
+            times["disconnected"] = loop.time()
+            disconnected.set()
+
+    response = AssistantStreamResponse(create_run(run), DataStreamEncoder())
+    scope = {"type": "http", "asgi": {"spec_version": spec_version}, "headers": []}
+    try:
+        await serve(response, scope, receive, send)
+    except ClientDisconnect:
+        pass
+    # As a server would once the request is over; an unclosed body is only
+    # finalized, cancelling the run, when it is garbage collected.
+    del response
+    await asyncio.wait_for(cancelled.wait(), timeout=5)
+    return times["cancelled"] - times["disconnected"]
+
+
+async def main() -> None:
+    for label, serve in (
+        ("before", StreamingResponse.__call__),
+        ("after", AssistantStreamResponse.__call__),
+    ):
+        for spec_version in ("2.4", "2.3"):
+            latencies = [await trial(serve, spec_version) for _ in range(TRIALS)]
+            print(
+                f"{label:>6} (ASGI {spec_version}): mean "
+                f"{statistics.mean(latencies) * 1000:7.1f} ms disconnect -> cancel"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""Counts the work done per 10k frames between chunk and socket-ready bytes
+for the data-stream and assistant-transport encoders: str<->bytes conversion
+calls (traced with sys.setprofile) and wall time.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_encoder_bytes.py
+"""
+
+import asyncio
+import sys
+import time
+
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk, UpdateStateChunk
+from assistant_stream.serialization.assistant_transport import AssistantTransportEncoder
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+FRAMES = 10_000
+
+
+def make_chunks() -> list:
+    chunks = []
+    for i in range(FRAMES):
+        if i % 4 == 3:
+            chunks.append(
+                UpdateStateChunk(
+                    operations=[
+                        {
+                            "type": "append-text",
+                            "path": ["messages", "3", "content"],
+                            "value": f"tok{i}",
+                        }
+                    ]
+                )
+            )
+        else:
+            chunks.append(TextDeltaChunk(text_delta=f"tok{i} "))
+    return chunks
+
+
+async def socket_frames(encoder, chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    if hasattr(encoder, "encode_stream_bytes"):
+        async for frame in encoder.encode_stream_bytes(stream()):
+            yield frame
+    else:
+        # Pre-bytes pipeline: str frames encoded by the response or store.
+        async for frame in encoder.encode_stream(stream()):
+            yield frame.encode("utf-8")
+
+
+async def drain(encoder, chunks) -> int:
+    total = 0
+    async for frame in socket_frames(encoder, chunks):
+        total += len(frame)
+    return total
+
+
+def count_conversions(encoder, chunks) -> int:
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "c_call" and getattr(arg, "__name__", "") in ("encode", "decode"):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        asyncio.run(drain(encoder, chunks))
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def main() -> None:
+    chunks = make_chunks()
+    for name, make_encoder in (
+        ("data-stream", DataStreamEncoder),
+        ("assistant-transport", AssistantTransportEncoder),
+    ):
+        conversions = count_conversions(make_encoder(), chunks)
+        start = time.perf_counter()
+        size = asyncio.run(drain(make_encoder(), chunks))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>20}: {conversions:>6} str<->bytes conversions, "
+            f"{size / 1e3:8.1f} kB, {elapsed * 1e3:7.1f} ms per {FRAMES} chunks"
+        )
+
+
+if __name__ == "__main__":
+    main()
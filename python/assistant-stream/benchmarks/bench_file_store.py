@@ -0,0 +1,105 @@
+"""Segment-file resumable store: append throughput of 50 concurrent
+streams of 1,000 token frames under each fsync policy, catch-up read
+throughput of those streams against the in-memory store, throughput of a
+reader tailing each stream while it is written, and the time to recover
+them when a store is created on the directory after a restart.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_file_store.py
+"""
+
+import asyncio
+import tempfile
+import time
+
+from assistant_stream.resumable import (
+    create_file_resumable_stream_store,
+    create_in_memory_resumable_stream_store,
+)
+
+STREAMS = 50
+TOKENS = 1_000
+FRAME = b'0:"token 1234 "\n'
+
+
+async def write(store) -> float:
+    async def produce(stream_id: str) -> None:
+        await store.acquire(stream_id)
+        for _ in range(TOKENS):
+            await store.append(stream_id, FRAME)
+        await store.finalize(stream_id, "done")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(f"s{i}") for i in range(STREAMS)))
+    return time.perf_counter() - start
+
+
+async def catch_up(store) -> float:
+    async def read(stream_id: str) -> None:
+        count = 0
+        async for _ in store.read(stream_id, "", asyncio.Event()):
+            count += 1
+        assert count == TOKENS
+
+    start = time.perf_counter()
+    for _ in range(5):
+        await asyncio.gather(*(read(f"s{i}") for i in range(STREAMS)))
+    return time.perf_counter() - start
+
+
+async def tail(store) -> float:
+    async def read(stream_id: str) -> None:
+        count = 0
+        async for _ in store.read(stream_id, "", asyncio.Event()):
+            count += 1
+        assert count == TOKENS
+
+    async def produce(stream_id: str) -> None:
+        await store.acquire(stream_id)
+        readers.append(asyncio.create_task(read(stream_id)))
+        await asyncio.sleep(0)
+        for _ in range(TOKENS):
+            await store.append(stream_id, FRAME)
+            await asyncio.sleep(0)
+        await store.finalize(stream_id, "done")
+
+    readers: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(f"t{i}") for i in range(STREAMS)))
+    await asyncio.gather(*readers)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    frames = STREAMS * TOKENS
+    memory = create_in_memory_resumable_stream_store()
+    elapsed = await write(memory)
+    print(f"{'in-memory':>17}: appends {frames / elapsed:9.0f}/s")
+    elapsed = await catch_up(memory)
+    print(f"{'in-memory':>17}: catch-up {5 * frames / elapsed:8.0f} entries/s")
+    elapsed = await tail(memory)
+    print(f"{'in-memory':>17}: tail {frames / elapsed:12.0f} entries/s")
+
+    for fsync in ("never", "finalize", "always"):
+        with tempfile.TemporaryDirectory() as directory:
+            store = create_file_resumable_stream_store(directory, fsync=fsync)
+            elapsed = await write(store)
+            print(f"{'fsync=' + fsync:>17}: appends {frames / elapsed:9.0f}/s")
+            if fsync != "never":
+                continue
+            elapsed = await catch_up(store)
+            print(f"{'file':>17}: catch-up {5 * frames / elapsed:8.0f} entries/s")
+            elapsed = await tail(store)
+            print(f"{'file':>17}: tail {frames / elapsed:12.0f} entries/s")
+            store.dispose()
+            start = time.perf_counter()
+            create_file_resumable_stream_store(directory)
+            # The tailed streams are recovered too.
+            print(
+                f"{'recovery':>17}: {2 * STREAMS} streams, {2 * frames} entries in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
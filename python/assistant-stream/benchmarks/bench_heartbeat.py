@@ -0,0 +1,100 @@
+"""Compares the timer-wheel `add_keepalive` with the previous task-per-frame
+implementation: CPU time for 10k idle keepalive streams over a few
+heartbeat intervals, and per-frame overhead on a hot stream.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_heartbeat.py
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from assistant_stream.serialization.heartbeat import add_keepalive
+
+IDLE_STREAMS = 10_000
+IDLE_INTERVAL = 0.5
+IDLE_SECONDS = 3.0
+HOT_FRAMES = 100_000
+TOKEN = b": heartbeat\n\n"
+
+
+async def task_per_frame_keepalive(stream, interval, token):
+    # The implementation this benchmark replaces.
+    task: Optional[asyncio.Task] = None
+    try:
+        while True:
+            if task is None:
+                task = asyncio.create_task(stream.__anext__())
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if not done:
+                yield token
+                continue
+            try:
+                item = task.result()
+            except StopAsyncIteration:
+                task = None
+                return
+            task = None
+            yield item
+    finally:
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+        await stream.aclose()
+
+
+async def idle(stop: asyncio.Event):
+    yield b"data: start\n\n"
+    await stop.wait()
+
+
+async def run_idle(keepalive) -> tuple:
+    stop = asyncio.Event()
+    heartbeats = 0
+
+    async def consume():
+        nonlocal heartbeats
+        async for frame in keepalive(idle(stop), IDLE_INTERVAL, TOKEN):
+            if frame is TOKEN:
+                heartbeats += 1
+
+    consumers = [asyncio.create_task(consume()) for _ in range(IDLE_STREAMS)]
+    await asyncio.sleep(0.5)
+    timers = len(asyncio.get_running_loop()._scheduled)
+    cpu_start = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    await asyncio.gather(*consumers)
+    return cpu, timers, heartbeats
+
+
+async def hot():
+    for _ in range(HOT_FRAMES):
+        yield b"0:\"tok\"\n"
+
+
+async def run_hot(keepalive) -> float:
+    start = time.perf_counter()
+    async for _ in keepalive(hot(), 15.0, TOKEN):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    for name, keepalive in (
+        ("task per frame", task_per_frame_keepalive),
+        ("timer wheel", add_keepalive),
+    ):
+        cpu, timers, heartbeats = asyncio.run(run_idle(keepalive))
+        elapsed = asyncio.run(run_hot(keepalive))
+        print(
+            f"{name:>15}: idle {IDLE_STREAMS} streams {cpu * 1e3:7.1f} ms CPU "
+            f"over {IDLE_SECONDS:.0f}s, {timers:>5} loop timers, "
+            f"{heartbeats} heartbeats; hot {elapsed / HOT_FRAMES * 1e6:5.2f} us/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Append latency of the in-memory resumable store as the number of retained
+streams grows: finished streams kept for their TTL alongside one stream being
+appended to.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_in_memory_expiry.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.resumable import create_in_memory_resumable_stream_store
+
+APPENDS = 2_000
+
+
+async def measure(retained: int) -> float:
+    store = create_in_memory_resumable_stream_store()
+    for i in range(retained):
+        await store.acquire(f"done-{i}")
+        await store.finalize(f"done-{i}", "done")
+    await store.acquire("live")
+    chunk = b'0:"token"\n'
+    start = time.perf_counter()
+    for _ in range(APPENDS):
+        await store.append("live", chunk)
+    return (time.perf_counter() - start) / APPENDS
+
+
+async def main() -> None:
+    for retained in (0, 1_000, 10_000, 50_000):
+        latency = await measure(retained)
+        print(f"{retained:6} retained streams: {latency * 1e6:8.1f} us/append")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""Tokens delivered per second from one in-memory resumable stream to 1, 100
+and 1,000 tailing readers, with the producer yielding to the loop after each
+append so readers wake once per token.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_in_memory_fanout.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.resumable import create_in_memory_resumable_stream_store
+
+TOKENS = 2_000
+
+
+async def measure(readers: int) -> tuple:
+    store = create_in_memory_resumable_stream_store()
+    await store.acquire("s")
+    signal = asyncio.Event()
+
+    async def read() -> int:
+        count = 0
+        async for _ in store.read("s", "", signal):
+            count += 1
+        return count
+
+    tasks = [asyncio.create_task(read()) for _ in range(readers)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for _ in range(TOKENS):
+        await store.append("s", b'0:"token"\n')
+        await asyncio.sleep(0)
+    await store.finalize("s", "done")
+    counts = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    assert counts == [TOKENS] * readers
+    return TOKENS / elapsed, TOKENS * readers / elapsed
+
+
+async def main() -> None:
+    for readers in (1, 100, 1_000):
+        tokens, deliveries = await measure(readers)
+        print(
+            f"{readers:5} readers: {tokens:8.0f} tokens/s, "
+            f"{deliveries:9.0f} deliveries/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""Memory held by the in-memory resumable store per retained stream: 2,000
+finished streams of 500 token frames each, measured with tracemalloc.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_in_memory_footprint.py
+"""
+
+import asyncio
+import tracemalloc
+
+from assistant_stream.resumable import create_in_memory_resumable_stream_store
+
+STREAMS = 2_000
+FRAMES = 500
+
+
+async def main() -> None:
+    frames = [f'0:"tok{i % 97}"\n'.encode() for i in range(FRAMES)]
+    payload = sum(len(frame) for frame in frames)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    store = create_in_memory_resumable_stream_store()
+    for i in range(STREAMS):
+        await store.acquire(f"s{i}")
+        for frame in frames:
+            await store.append(f"s{i}", frame)
+        await store.finalize(f"s{i}", "done")
+    held = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    per_stream = held / STREAMS
+    print(
+        f"{per_stream / 1024:7.1f} KiB per stream ({payload / 1024:.1f} KiB of frames), "
+        f"{2**30 / per_stream:8.0f} streams per GiB"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
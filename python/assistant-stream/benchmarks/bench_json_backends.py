@@ -0,0 +1,84 @@
+"""Frames/sec for each JSON serializer backend across the interop fixture
+chunk mix, plus a state-heavy variant where every update-state op carries a
+sizeable value.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_json_backends.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from assistant_stream.assistant_stream_chunk import UpdateStateChunk  # noqa: E402
+from assistant_stream.serialization.assistant_transport import (  # noqa: E402
+    AssistantTransportEncoder,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder  # noqa: E402
+from assistant_stream.serialization.json_serializer import (  # noqa: E402
+    available_json_backends,
+)
+from assistant_stream.serialization.openai_stream import (  # noqa: E402
+    OpenAIStreamEncoder,
+)
+from tests.generate_interop_fixture import CHUNKS  # noqa: E402
+
+ROUNDS = 2000
+
+
+def state_heavy_chunks() -> list:
+    message = {
+        "id": "msg_1",
+        "type": "ai",
+        "content": "The quick brown fox jumps over the lazy dog. " * 8,
+        "tool_calls": [{"id": "call_1", "name": "search", "args": {"q": "fox"}}],
+        "usage_metadata": {"input_tokens": 120, "output_tokens": 48},
+    }
+    return [
+        UpdateStateChunk(
+            operations=[{"type": "set", "path": ["messages", str(i)], "value": message}]
+        )
+        for i in range(len(CHUNKS))
+    ]
+
+
+async def frames_per_second(encoder, chunks) -> float:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    count = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        async for _frame in encoder.encode_stream_bytes(stream()):
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    backends = available_json_backends()
+    encoders = (
+        ("data-stream", DataStreamEncoder),
+        ("assistant-transport", AssistantTransportEncoder),
+        ("openai", OpenAIStreamEncoder),
+    )
+    print(f"{'chunks':>11} {'encoder':>20} " + " ".join(f"{b:>10}" for b in backends))
+    for label, chunks in (("interop", CHUNKS), ("state-heavy", state_heavy_chunks())):
+        for name, make_encoder in encoders:
+            if label == "state-heavy" and name == "openai":
+                continue  # only text deltas reach the OpenAI wire format
+            rates = [
+                await frames_per_second(make_encoder(serializer=backend), chunks)
+                for backend in backends
+            ]
+            print(
+                f"{label:>11} {name:>20} "
+                + " ".join(f"{rate / 1e3:>8.0f}k/s" for rate in rates)
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Peak RSS and text-delta latency while streaming a 20 MB payload through
+AssistantStreamResponse: a file part sent inline versus offloaded to a blob
+store, and a state string sent as one `set` versus chunked into pieces.
+Each mode runs in a fresh interpreter so peak RSS is not shared.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_large_payloads.py
+"""
+
+import asyncio
+import base64
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from assistant_stream import LocalBlobStore, create_run
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+FILE_SIZE = 20 * 1024 * 1024
+TOKENS = 200
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def serve(mode: str) -> None:
+    data = base64.b64encode(os.urandom(FILE_SIZE)).decode()
+    baseline = _rss_mb()
+
+    async def run(controller):
+        if mode.startswith("file"):
+            controller.add_file(data, "application/octet-stream")
+        else:
+            controller.state["document"] = data
+            controller.flush()
+        for i in range(TOKENS):
+            controller.append_text(f"tok{i} ")
+
+    options = {}
+    if mode == "file-offload":
+        options = {
+            "max_payload_size": 64 * 1024,
+            "blob_store": LocalBlobStore(tempfile.mkdtemp()),
+        }
+    elif mode == "state-chunked":
+        options = {"max_payload_size": 64 * 1024}
+
+    first_text = None
+    size = 0
+    start = time.perf_counter()
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal first_text, size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if first_text is None and b'0:"tok0 ' in message.get("body", b""):
+                first_text = time.perf_counter() - start
+
+    response = AssistantStreamResponse(
+        create_run(run, state={}, **options), DataStreamEncoder()
+    )
+    await response({"type": "http", "method": "GET", "headers": []}, receive, send)
+    print(
+        f"{mode:>13}: peak RSS +{_rss_mb() - baseline:6.1f} MB, "
+        f"first text delta after {first_text * 1000:6.1f} ms, "
+        f"body {size / 1024 / 1024:5.1f} MB"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        asyncio.run(serve(sys.argv[1]))
+        return
+    for mode in ("file-inline", "file-offload", "state-inline", "state-chunked"):
+        subprocess.run([sys.executable, __file__, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Longest event-loop stall seen by a concurrent 1 ms ticker while a stream
+carrying large state updates is encoded, with frames serialized inline versus
+offloaded to a worker thread. Payloads are snapshotted on the loop first, so
+row-shaped ones (many small containers) stay inline and document-shaped ones
+are offloaded.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_offload.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.assistant_stream_chunk import (
+    TextDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+
+UPDATES = 10
+ROWS = 40_000
+DOCS = 400
+
+
+def rows() -> list:
+    return [{"id": i, "title": f"row {i}", "tags": ["a", "b"]} for i in range(ROWS)]
+
+
+def docs() -> list:
+    return [{"id": i, "text": "lorem ipsum dolor sit amet " * 200} for i in range(DOCS)]
+
+
+def state_update(value):
+    return UpdateStateChunk(operations=[{"type": "set", "path": ["value"], "value": value}])
+
+
+def tool_result(value):
+    return ToolResultChunk(tool_call_id="call_1", result=value)
+
+
+def chunks(make_chunk, value) -> list:
+    out = []
+    for i in range(UPDATES):
+        out.append(make_chunk(value))
+        out.extend(TextDeltaChunk(text_delta=f"tok{j} ") for j in range(100))
+    return out
+
+
+async def measure(encoder, make_chunk, value) -> tuple:
+    stream_chunks = chunks(make_chunk, value)
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - start - 0.001)
+
+    async def stream():
+        for chunk in stream_chunks:
+            yield chunk
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    size = 0
+    async for frame in encoder.encode_stream_bytes(stream()):
+        size += len(frame)
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return worst, elapsed, size
+
+
+def report(label, encoder, worst, elapsed, size) -> None:
+    line = (
+        f"{label}: worst loop stall {worst * 1000:6.1f} ms, "
+        f"total {elapsed * 1000:6.0f} ms for {size / 1e6:.1f} MB"
+    )
+    stats = encoder.offload_stats
+    if stats is not None:
+        line += (
+            f"; {stats.offloaded_frames} frames offloaded, "
+            f"{stats.offload_seconds * 1000:.0f} ms in workers, "
+            f"max {stats.max_offload_seconds * 1000:.1f} ms"
+        )
+    print(line)
+
+
+async def main() -> None:
+    for shape, make_chunk, value in (
+        ("state rows", state_update, rows()),
+        ("state docs", state_update, docs()),
+        ("tool rows", tool_result, rows()),
+        ("tool docs", tool_result, docs()),
+    ):
+        for label, encoder in (
+            ("inline", DataStreamEncoder()),
+            ("offload", DataStreamEncoder(offload=True)),
+        ):
+            worst, elapsed, size = await measure(encoder, make_chunk, value)
+            report(f"{shape:>10} {label:>8}", encoder, worst, elapsed, size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
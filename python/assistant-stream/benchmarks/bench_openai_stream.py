@@ -0,0 +1,70 @@
+"""Throughput of OpenAIStreamEncoder on a 20k-token text stream against the
+previous encoder, which rebuilt and serialized the full envelope (including
+`int(time.time())`) for every token.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_openai_stream.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.serialization.openai_stream import OpenAIStreamEncoder
+
+TOKENS = 20_000
+ROUNDS = 5
+
+
+class PerTokenEnvelopeEncoder(OpenAIStreamEncoder):
+    # The frame builder this benchmark replaces.
+    def _create_frame(self, delta={}, finish_reason=None) -> bytes:
+        response = {
+            "id": self.id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": self.model,
+            "system_fingerprint": self.system_fingerprint,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": delta,
+                    "logprobs": None,
+                    "finish_reason": finish_reason,
+                }
+            ],
+        }
+        return b"data: " + self._serializer.dumps(response) + b"\n\n"
+
+
+async def drain(encoder, chunks) -> int:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    total = 0
+    async for frame in encoder.encode_stream_bytes(stream()):
+        total += len(frame)
+    return total
+
+
+def main() -> None:
+    chunks = [TextDeltaChunk(text_delta=f"tok{i} ") for i in range(TOKENS)]
+    for serializer in ("stdlib", "orjson"):
+        for name, make_encoder in (
+            ("per-token envelope", PerTokenEnvelopeEncoder),
+            ("template", OpenAIStreamEncoder),
+        ):
+            best = float("inf")
+            for _ in range(ROUNDS):
+                encoder = make_encoder(serializer=serializer)
+                start = time.perf_counter()
+                asyncio.run(drain(encoder, chunks))
+                best = min(best, time.perf_counter() - start)
+            print(
+                f"{serializer:>7} {name:>18}: {TOKENS / best / 1e3:7.1f}k tokens/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Time to follow a streamed tool-call argument document as it arrives:
+re-parsing the accumulated prefix on every delta versus feeding each delta
+to one IncrementalJSONParser. Deltas are 4 characters, as tokenizers emit.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_partial_json.py
+"""
+
+import json
+import time
+
+from assistant_stream.modules.partial_json import IncrementalJSONParser
+
+DELTA = 4
+
+
+def document(size: int) -> str:
+    return json.dumps(
+        {
+            "url": "https://example.com/search",
+            "query": "lorem ipsum " * (size // 24),
+            "rows": [{"id": i, "score": i / 7} for i in range(size // 200)],
+        }
+    )
+
+
+def reparse(text: str) -> None:
+    for end in range(DELTA, len(text) + DELTA, DELTA):
+        parser = IncrementalJSONParser()
+        parser.feed(text[:end])
+        parser.value
+
+
+def incremental(text: str) -> None:
+    parser = IncrementalJSONParser()
+    for start in range(0, len(text), DELTA):
+        parser.feed(text[start : start + DELTA])
+        parser.value
+
+
+def bench(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    for size in (1_000, 10_000, 50_000):
+        text = document(size)
+        full = bench(reparse, text)
+        inc = bench(incremental, text)
+        print(
+            f"{len(text):>6} chars: re-parse prefix {full * 1000:9.1f} ms, "
+            f"incremental {inc * 1000:6.1f} ms ({full / inc:6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
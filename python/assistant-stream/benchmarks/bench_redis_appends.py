@@ -0,0 +1,70 @@
+"""Append latency and throughput of the Redis resumable store with its Lua
+scripts versus GET plus a pipelined XADD/EXPIRE, against the in-process Redis
+stand-in with a simulated 0.5 ms network round trip: one producer appending
+back to back, then 100 producers at once.
+
+Run from python/assistant-stream:
+    uv run python -m benchmarks.bench_redis_appends
+"""
+
+import asyncio
+import statistics
+import time
+
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import RedisStandIn
+
+ROUND_TRIP_MS = 0.5
+APPENDS = 2_000
+PRODUCERS = 100
+CHUNK = b"x" * 64
+
+
+async def one_producer(scripts: bool) -> tuple:
+    client = RedisStandIn(round_trip_ms=ROUND_TRIP_MS)
+    store = RedisResumableStreamStore(client, scripts=scripts)
+    await store.acquire("s")
+    client.round_trips = 0
+    latencies = []
+    for _ in range(APPENDS):
+        start = time.perf_counter()
+        await store.append("s", CHUNK)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return (
+        statistics.mean(latencies),
+        latencies[int(len(latencies) * 0.99)],
+        client.round_trips / APPENDS,
+    )
+
+
+async def many_producers(scripts: bool) -> float:
+    client = RedisStandIn(round_trip_ms=ROUND_TRIP_MS)
+    store = RedisResumableStreamStore(client, scripts=scripts)
+    stream_ids = [f"s{i}" for i in range(PRODUCERS)]
+    for stream_id in stream_ids:
+        await store.acquire(stream_id)
+
+    async def produce(stream_id: str) -> None:
+        for _ in range(APPENDS // 10):
+            await store.append(stream_id, CHUNK)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(stream_id) for stream_id in stream_ids))
+    return PRODUCERS * (APPENDS // 10) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    for label, scripts in (("pipeline", False), ("scripts", True)):
+        mean, p99, round_trips = await one_producer(scripts)
+        throughput = await many_producers(scripts)
+        print(
+            f"{label:>8}: {round_trips:.0f} round trips/append, "
+            f"latency mean {mean * 1000:5.2f} ms p99 {p99 * 1000:5.2f} ms, "
+            f"{1 / mean:6.0f} appends/s serial, "
+            f"{throughput:7.0f} appends/s over {PRODUCERS} producers"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
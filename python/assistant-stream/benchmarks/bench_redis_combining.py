@@ -0,0 +1,50 @@
+"""Append throughput of the Redis resumable store at 100, 500 and 1000
+concurrent producers, with each append its own round trip versus appends of
+all streams combined into one pipeline per loop iteration or per 1 ms
+window. Runs against the in-process Redis stand-in with a simulated 0.5 ms
+round trip and a pool of 50 connections.
+
+Run from python/assistant-stream:
+    uv run python -m benchmarks.bench_redis_combining
+"""
+
+import asyncio
+import time
+
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import RedisStandIn
+
+APPENDS = 20
+CHUNK = b"x" * 64
+
+
+async def measure(producers: int, combine_ms) -> tuple:
+    client = RedisStandIn(round_trip_ms=0.5, pool_size=50)
+    store = RedisResumableStreamStore(client, combine_ms=combine_ms)
+    stream_ids = [f"s{i}" for i in range(producers)]
+    for stream_id in stream_ids:
+        await store.acquire(stream_id)
+    client.round_trips = 0
+
+    async def produce(stream_id: str) -> None:
+        for _ in range(APPENDS):
+            await store.append(stream_id, CHUNK)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(stream_id) for stream_id in stream_ids))
+    elapsed = time.perf_counter() - start
+    return producers * APPENDS / elapsed, client.round_trips
+
+
+async def main() -> None:
+    for producers in (100, 500, 1000):
+        for label, combine_ms in (("separate", None), ("0 ms", 0), ("1 ms", 1)):
+            throughput, round_trips = await measure(producers, combine_ms)
+            print(
+                f"{producers:5} producers {label:>8}: {throughput:7.0f} appends/s, "
+                f"{round_trips:6} round trips"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Redis commands per second and chunk delivery latency for 1000 concurrent
+resumable-stream readers (10 per stream on 100 streams, each producer
+appending 10 chunks/s), tailing with XRANGE polling versus XREAD BLOCK, and
+the commands per second the same readers issue while their streams idle.
+Runs against the in-process Redis stand-in from the test suite, so commands
+are counted exactly and latency excludes the network.
+
+Run from python/assistant-stream:
+    uv run python -m benchmarks.bench_redis_reads
+"""
+
+import asyncio
+import statistics
+import struct
+import time
+
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import PollingRedisStandIn, RedisStandIn
+
+STREAMS = 100
+READERS_PER_STREAM = 10
+CHUNKS = 30
+INTERVAL = 0.1
+
+
+async def measure(client) -> tuple:
+    store = RedisResumableStreamStore(client)
+    latencies: list = []
+    signal = asyncio.Event()
+
+    async def produce(stream_id: str) -> None:
+        for _ in range(CHUNKS):
+            await store.append(stream_id, struct.pack("d", time.perf_counter()))
+            await asyncio.sleep(INTERVAL)
+        await store.finalize(stream_id, "done")
+
+    async def consume(stream_id: str) -> None:
+        async for entry in store.read(stream_id, "", signal):
+            latencies.append(time.perf_counter() - struct.unpack("d", entry.chunk)[0])
+
+    stream_ids = [f"s{i}" for i in range(STREAMS)]
+    for stream_id in stream_ids:
+        await store.acquire(stream_id)
+    client.commands.clear()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(produce(stream_id) for stream_id in stream_ids),
+        *(
+            consume(stream_id)
+            for stream_id in stream_ids
+            for _ in range(READERS_PER_STREAM)
+        ),
+    )
+    elapsed = time.perf_counter() - start
+    reads = sum(
+        count
+        for name, count in client.commands.items()
+        if name in ("xrange", "xread", "exists", "get")
+    )
+    assert len(latencies) == STREAMS * READERS_PER_STREAM * CHUNKS
+    return sum(client.commands.values()) / elapsed, reads / elapsed, latencies
+
+
+async def measure_idle(client, seconds: float = 2.0) -> float:
+    store = RedisResumableStreamStore(client)
+    signal = asyncio.Event()
+    stream_ids = [f"s{i}" for i in range(STREAMS)]
+    for stream_id in stream_ids:
+        await store.acquire(stream_id)
+
+    async def consume(stream_id: str) -> None:
+        async for _ in store.read(stream_id, "", signal):
+            pass
+
+    readers = [
+        asyncio.create_task(consume(stream_id))
+        for stream_id in stream_ids
+        for _ in range(READERS_PER_STREAM)
+    ]
+    await asyncio.sleep(0.2)
+    client.commands.clear()
+    await asyncio.sleep(seconds)
+    commands = sum(client.commands.values())
+    signal.set()
+    await asyncio.gather(*readers)
+    return commands / seconds
+
+
+async def main() -> None:
+    for label, client in (("poll", PollingRedisStandIn()), ("xread", RedisStandIn())):
+        total, reads, latencies = await measure(client)
+        latencies.sort()
+        print(
+            f"{label:>6}: {total:8.0f} commands/s ({reads:7.0f} by readers), "
+            f"latency mean {statistics.mean(latencies) * 1000:6.1f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms"
+        )
+    for label, client in (("poll", PollingRedisStandIn()), ("xread", RedisStandIn())):
+        idle = await measure_idle(client)
+        print(f"{label:>6}: {idle:8.0f} commands/s while idle")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
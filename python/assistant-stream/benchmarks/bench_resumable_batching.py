@@ -0,0 +1,75 @@
+"""Store entries and producer time for 50 concurrent resumable streams of
+2,000 token frames each (one frame per millisecond), appending one entry per
+frame versus batching frames for up to 20 ms, on the in-memory store and on
+the Redis stand-in with a simulated 0.5 ms round trip.
+
+Run from python/assistant-stream:
+    uv run python -m benchmarks.bench_resumable_batching
+"""
+
+import asyncio
+import time
+
+from assistant_stream.resumable import (
+    create_in_memory_resumable_stream_store,
+    create_resumable_stream_context,
+)
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import RedisStandIn
+
+STREAMS = 50
+TOKENS = 2_000
+
+
+async def tokens():
+    for i in range(TOKENS):
+        yield f'0:"token {i} "\n'.encode()
+        await asyncio.sleep(0.001)
+
+
+async def measure(store, batch_ms) -> tuple:
+    entries = 0
+
+    def on_append(_stream_id: str, _size: int) -> None:
+        nonlocal entries
+        entries += 1
+
+    ctx = create_resumable_stream_context(
+        store=store, on_append=on_append, batch_ms=batch_ms
+    )
+
+    async def run(stream_id: str) -> bytes:
+        body = bytearray()
+        async for chunk in await ctx.run(stream_id, tokens):
+            body.extend(chunk)
+        return bytes(body)
+
+    start = time.perf_counter()
+    bodies = await asyncio.gather(*(run(f"s{i}") for i in range(STREAMS)))
+    elapsed = time.perf_counter() - start
+    expected = b"".join([chunk async for chunk in tokens()])
+    assert all(body == expected for body in bodies)
+    return entries / STREAMS, elapsed
+
+
+async def main() -> None:
+    for label, make_store in (
+        ("in-memory", create_in_memory_resumable_stream_store),
+        ("redis", lambda: RedisResumableStreamStore(RedisStandIn(round_trip_ms=0.5))),
+    ):
+        for batch_ms in (None, 20):
+            store = make_store()
+            per_stream, elapsed = await measure(store, batch_ms)
+            commands = ""
+            if isinstance(store, RedisResumableStreamStore):
+                client = store._client
+                commands = f", {sum(client.commands.values()) / STREAMS:6.0f} commands/stream"
+            mode = "per frame" if batch_ms is None else f"{batch_ms} ms batch"
+            print(
+                f"{label:>9} {mode:>11}: {per_stream:6.0f} entries/stream, "
+                f"{elapsed:5.2f} s{commands}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Token latency and run time seen by the client of a resumable run, for 50
+concurrent runs of 500 token frames each (one frame per millisecond) on the
+Redis stand-in with a simulated 1 ms round trip and a 16-connection pool,
+reading the run back from the store versus serving it from memory with a
+64 KiB write-behind buffer.
+
+Run from python/assistant-stream:
+    uv run python -m benchmarks.bench_resumable_write_behind
+"""
+
+import asyncio
+import statistics
+import time
+
+from assistant_stream.resumable import create_resumable_stream_context
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import RedisStandIn
+
+STREAMS = 50
+TOKENS = 500
+
+
+async def measure(write_behind_bytes) -> tuple:
+    client = RedisStandIn(round_trip_ms=1.0, pool_size=16)
+    store = RedisResumableStreamStore(client)
+    ctx = create_resumable_stream_context(
+        store=store, write_behind_bytes=write_behind_bytes
+    )
+    latencies: list[float] = []
+
+    async def run(stream_id: str) -> None:
+        sent: list[float] = []
+
+        async def tokens():
+            for i in range(TOKENS):
+                sent.append(time.perf_counter())
+                yield f'0:"token {i} "\n'.encode()
+                await asyncio.sleep(0.001)
+
+        received = 0
+        async for chunk in await ctx.run(stream_id, tokens):
+            now = time.perf_counter()
+            for _ in range(chunk.count(b"\n")):
+                latencies.append(now - sent[received])
+                received += 1
+        assert received == TOKENS
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(f"s{i}") for i in range(STREAMS)))
+    elapsed = time.perf_counter() - start
+    for i in range(STREAMS):
+        while await store.status(f"s{i}") != "done":
+            await asyncio.sleep(0.01)
+    stored = time.perf_counter() - start
+    return latencies, elapsed, stored
+
+
+async def main() -> None:
+    for label, write_behind_bytes in (("store", None), ("write-behind", 65_536)):
+        latencies, elapsed, stored = await measure(write_behind_bytes)
+        latencies.sort()
+        print(
+            f"{label:>12}: token latency mean "
+            f"{statistics.fmean(latencies) * 1000:6.2f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms; "
+            f"runs {elapsed:5.2f} s, stored {stored:5.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
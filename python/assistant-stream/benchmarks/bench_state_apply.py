@@ -0,0 +1,70 @@
+"""Compares sequential deep_apply with deep_apply_batch on LangGraph-style
+message patches: a flush of append-text ops streaming into the content of the
+last message, plus a few tool-call argument patches on the same message.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_state_apply.py
+"""
+
+import time
+
+from assistant_stream.state import deep_apply, deep_apply_batch
+
+
+def make_state(message_count: int) -> dict:
+    return {
+        "messages": [
+            {
+                "id": f"msg_{i}",
+                "type": "ai",
+                "content": "x" * 200,
+                "tool_calls": [{"id": f"call_{i}", "args": ""}],
+            }
+            for i in range(message_count)
+        ]
+    }
+
+
+def make_flush(message_index: int, op_count: int) -> list:
+    base = ["messages", str(message_index)]
+    operations = []
+    for i in range(op_count):
+        if i % 10 == 9:
+            path = [*base, "tool_calls", "0", "args"]
+        else:
+            path = [*base, "content"]
+        operations.append({"type": "append-text", "path": path, "value": "tok "})
+    return operations
+
+
+def sequential(state, operations):
+    for op in operations:
+        state = deep_apply(state, op["path"], op)
+    return state
+
+
+def bench(fn, state, operations, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(state, operations)
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    print(f"{'messages':>8} {'ops':>5} {'sequential':>12} {'batch':>12} {'speedup':>8}")
+    for message_count in (10, 100, 1000):
+        state = make_state(message_count)
+        for op_count in (20, 200):
+            operations = make_flush(message_count - 1, op_count)
+            assert sequential(state, operations) == deep_apply_batch(state, operations)
+            rounds = max(5, 20000 // (message_count + op_count))
+            seq = bench(sequential, state, operations, rounds)
+            batch = bench(deep_apply_batch, state, operations, rounds)
+            print(
+                f"{message_count:>8} {op_count:>5} {seq * 1e6:>10.1f}us "
+                f"{batch * 1e6:>10.1f}us {seq / batch:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
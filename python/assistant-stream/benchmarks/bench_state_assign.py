@@ -0,0 +1,40 @@
+"""Times assigning ~1 MB values through a state draft, which is where set
+values are checked for embedded StateProxy instances.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_state_assign.py
+"""
+
+import json
+import time
+
+from assistant_stream.state import AssistantState
+
+
+def make_values() -> dict:
+    rows = [
+        {"id": i, "name": f"row {i}", "score": i / 7, "tags": ["a", "b"]}
+        for i in range(12000)
+    ]
+    return {
+        "1 MB string": "x" * (1 << 20),
+        "12k-row tool result": rows,
+        "nested 1 MB dict": {f"k{i}": {"v": [i, str(i) * 8]} for i in range(15000)},
+    }
+
+
+def main() -> None:
+    for name, value in make_values().items():
+        size = len(json.dumps(value))
+        state = AssistantState({"result": None})
+        draft = state.draft(lambda _ops: None)
+        rounds = 20
+        start = time.perf_counter()
+        for _ in range(rounds):
+            draft["result"] = value
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{name:>22}: {size / 1e6:.2f} MB  {elapsed * 1e3:8.3f} ms/assignment")
+
+
+if __name__ == "__main__":
+    main()
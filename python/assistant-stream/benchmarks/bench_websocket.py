@@ -0,0 +1,113 @@
+"""Serving concurrent runs as one HTTP streaming response each versus one
+multiplexed WebSocket: connections opened, ASGI sends and wall time. Both
+sides run in process against in-memory ASGI channels, so the numbers count
+server-side work, not network effects.
+
+Run from python/assistant-stream:
+    uv run python benchmarks/bench_websocket.py
+"""
+
+import asyncio
+import json
+import time
+
+from assistant_stream import create_run
+from assistant_stream.serialization.data_stream import DataStreamResponse
+from assistant_stream.serialization.websocket import WebSocketMultiplexer
+
+RUNS = 50
+TOKENS = 400
+
+
+def start_run(payload):
+    async def run(controller):
+        for i in range(TOKENS):
+            controller.append_text(f"tok{i} ")
+            await asyncio.sleep(0)
+
+    return create_run(run)
+
+
+async def http_runs() -> tuple:
+    sends = 0
+    received = 0
+
+    async def serve_one(index: int) -> None:
+        nonlocal sends, received
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal sends, received
+            sends += 1
+            received += len(message.get("body", b""))
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": []}
+        await DataStreamResponse(start_run(index), coalesce=True)(scope, receive, send)
+
+    await asyncio.gather(*(serve_one(i) for i in range(RUNS)))
+    return RUNS, sends, received
+
+
+async def websocket_runs() -> tuple:
+    incoming: asyncio.Queue = asyncio.Queue()
+    sends = 0
+    received = 0
+    ended = 0
+    done = asyncio.Event()
+
+    await incoming.put({"type": "websocket.connect"})
+    for i in range(RUNS):
+        await incoming.put(
+            {"type": "websocket.receive", "text": json.dumps({"type": "start", "runId": f"r{i}"})}
+        )
+
+    async def send(message):
+        nonlocal sends, received, ended
+        if message["type"] != "websocket.send":
+            return
+        sends += 1
+        data = message.get("bytes") or message.get("text").encode()
+        if data.startswith(b"{"):
+            ended += 1
+            if ended == RUNS:
+                done.set()
+        else:
+            received += len(data)
+
+    async def receive():
+        if incoming.empty() and done.is_set():
+            return {"type": "websocket.disconnect", "code": 1000}
+        message = await incoming.get()
+        return message
+
+    async def disconnect_when_done():
+        await done.wait()
+        await incoming.put({"type": "websocket.disconnect", "code": 1000})
+
+    scope = {"type": "websocket", "path": "/runs", "headers": [], "subprotocols": []}
+    await asyncio.gather(
+        WebSocketMultiplexer(start_run, binary=True)(scope, receive, send),
+        disconnect_when_done(),
+    )
+    return 1, sends, received
+
+
+async def main() -> None:
+    for label, serve in (("http", http_runs), ("websocket", websocket_runs)):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            connections, sends, size = await serve()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(
+            f"{label:>9}: {connections:3d} connections, {sends:6d} sends, "
+            f"{size / 1e3:7.1f} kB, {best * 1000:6.0f} ms "
+            f"({RUNS * TOKENS / best / 1e3:.0f}k tokens/s)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
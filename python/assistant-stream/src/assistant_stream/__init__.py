@@ -1,20 +1,32 @@
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.websocket import WebSocketMultiplexer
 from assistant_stream.create_run import (
     create_run,
     RunController,
 )
+from assistant_stream.chunked_transfer import BlobStore, LocalBlobStore
 
 try:
     from assistant_stream.modules.langgraph import append_langgraph_event, get_tool_call_subgraph_state
 
     __all__ = [
         "AssistantStreamResponse",
+        "WebSocketMultiplexer",
         "create_run",
         "RunController",
+        "BlobStore",
+        "LocalBlobStore",
         "append_langgraph_event",
         "get_tool_call_subgraph_state",
     ]
 except ImportError:
-    __all__ = ["AssistantStreamResponse", "create_run", "RunController"]
+    __all__ = [
+        "AssistantStreamResponse",
+        "WebSocketMultiplexer",
+        "create_run",
+        "RunController",
+        "BlobStore",
+        "LocalBlobStore",
+    ]
@@ -0,0 +1,332 @@
+"""Chunked transfer of large payloads.
+
+A large string in a state `set` would otherwise go out as one giant frame,
+holding every text delta queued behind it. With a payload limit, the string
+is sent as an empty placeholder followed by sequenced `append-text` pieces,
+which the client already reassembles, and the pieces are interleaved with
+the rest of the stream. Large file parts are offloaded to a BlobStore and
+sent as a URL the client fetches instead.
+"""
+
+import asyncio
+import base64
+import binascii
+import collections
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from starlette.responses import FileResponse, Response
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    FileChunk,
+    ObjectStreamOperation,
+    UpdateStateChunk,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PAYLOAD_SIZE = 64 * 1024
+
+# Base64 is decoded in slices of this many characters (a multiple of 4), so
+# offloading a file never holds a second full copy of it.
+_DECODE_SLICE = 1024 * 1024
+
+_BLOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class BlobStore(ABC):
+    """Holds offloaded file payloads and names the URL they are served from.
+
+    `write` runs in a worker thread, so it may block on I/O. Blobs are not
+    tied to the run that wrote them; a store is responsible for deleting
+    them once clients are done with them.
+    """
+
+    @abstractmethod
+    def write(self, pieces: Iterator[bytes], mime_type: str) -> str:
+        """Store a blob from its pieces and return the URL for it."""
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Stores blobs as files in a local directory.
+
+    Returned URLs are `url_prefix` followed by the blob id; mount a route
+    there that returns `store.response(blob_id)`.
+
+    Blobs are kept until `delete` is called. With `max_age` set, blobs
+    older than that many seconds are no longer served and are deleted by
+    the next write.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        url_prefix: str = "/blobs/",
+        *,
+        max_age: Optional[float] = None,
+    ) -> None:
+        if max_age is not None and max_age <= 0:
+            raise ValueError(f"max_age must be positive, got {max_age!r}")
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="assistant-stream-blobs-")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self._max_age = max_age
+        # blob id -> (mime type, written at), oldest first.
+        self._blobs: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def write(self, pieces: Iterator[bytes], mime_type: str) -> str:
+        self._delete_expired()
+        blob_id = uuid.uuid4().hex
+        with open(os.path.join(self.directory, blob_id), "wb") as file:
+            for piece in pieces:
+                file.write(piece)
+        with self._lock:
+            self._blobs[blob_id] = (mime_type, time.monotonic())
+        return self.url_prefix + blob_id
+
+    def _delete_expired(self) -> None:
+        if self._max_age is None:
+            return
+        cutoff = time.monotonic() - self._max_age
+        with self._lock:
+            expired = []
+            for blob_id, (_, written_at) in self._blobs.items():
+                if written_at > cutoff:
+                    break
+                expired.append(blob_id)
+        for blob_id in expired:
+            self.delete(blob_id)
+
+    def path(self, blob_id: str) -> Optional[Tuple[str, str]]:
+        """The file path and mime type of a blob, or None if it is unknown."""
+        if not _BLOB_ID.fullmatch(blob_id):
+            return None
+        found = self._blobs.get(blob_id)
+        if found is None:
+            return None
+        mime_type, written_at = found
+        if self._max_age is not None and time.monotonic() - written_at >= self._max_age:
+            return None
+        return os.path.join(self.directory, blob_id), mime_type
+
+    def response(self, blob_id: str) -> Response:
+        """Serve a blob, or a 404 if it is unknown."""
+        found = self.path(blob_id)
+        if found is None:
+            return Response(status_code=404)
+        path, mime_type = found
+        return FileResponse(path, media_type=mime_type)
+
+    def delete(self, blob_id: str) -> None:
+        if not _BLOB_ID.fullmatch(blob_id):
+            return
+        with self._lock:
+            if self._blobs.pop(blob_id, None) is None:
+                return
+        try:
+            os.remove(os.path.join(self.directory, blob_id))
+        except FileNotFoundError:
+            pass
+
+
+def _decode_base64(data: str) -> Iterator[bytes]:
+    if data.startswith("data:"):
+        header, _, data = data.partition(",")
+        if not header.endswith(";base64"):
+            raise ValueError("Only base64 data URLs can be offloaded")
+    for start in range(0, len(data), _DECODE_SLICE):
+        yield base64.b64decode(data[start : start + _DECODE_SLICE], validate=True)
+
+
+def _strip_large_strings(
+    value: Any,
+    path: List[str],
+    max_size: int,
+    pieces: List[Tuple[List[str], str]],
+) -> Any:
+    """Replace strings longer than `max_size` with "" and record them.
+    Containers are copied only along the paths that changed, since `value`
+    is shared with the run's local state."""
+    if isinstance(value, str):
+        if len(value) > max_size:
+            pieces.append((path, value))
+            return ""
+        return value
+    if isinstance(value, dict):
+        stripped = None
+        for key, item in value.items():
+            new_item = _strip_large_strings(item, path + [key], max_size, pieces)
+            if new_item is not item:
+                if stripped is None:
+                    stripped = dict(value)
+                stripped[key] = new_item
+        return value if stripped is None else stripped
+    if isinstance(value, list):
+        stripped = None
+        for index, item in enumerate(value):
+            new_item = _strip_large_strings(
+                item, path + [str(index)], max_size, pieces
+            )
+            if new_item is not item:
+                if stripped is None:
+                    stripped = list(value)
+                stripped[index] = new_item
+        return value if stripped is None else stripped
+    return value
+
+
+def split_state_operations(
+    operations: List[ObjectStreamOperation], max_size: int
+) -> List[List[ObjectStreamOperation]]:
+    """
+    Split a batch of state operations so no string value exceeds `max_size`
+    characters. A `set` keeps its shape with "" in place of each large
+    string, followed by one `append-text` per piece; operations after it are
+    batched after the last piece so the client applies them in order.
+    """
+    batches: List[List[ObjectStreamOperation]] = [[]]
+    for op in operations:
+        pieces: List[Tuple[List[str], str]] = []
+        if op["type"] == "set":
+            value = _strip_large_strings(op["value"], list(op["path"]), max_size, pieces)
+            if pieces:
+                op = {"type": "set", "path": op["path"], "value": value}
+            batches[-1].append(op)
+        elif len(op["value"]) > max_size:
+            pieces.append((op["path"], op["value"]))
+        else:
+            batches[-1].append(op)
+
+        if pieces:
+            for path, text in pieces:
+                for start in range(0, len(text), max_size):
+                    batches.append(
+                        [
+                            {
+                                "type": "append-text",
+                                "path": path,
+                                "value": text[start : start + max_size],
+                            }
+                        ]
+                    )
+            batches.append([])
+    return [batch for batch in batches if batch]
+
+
+def _wake(future: Optional["asyncio.Future[None]"]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+class ChunkedTransferQueue:
+    """
+    Drop-in for the run's chunk queue that splits and offloads large
+    payloads.
+
+    Split state pieces go to a bulk lane that is served alternately with the
+    regular lane, so text deltas are not held behind a large value. State
+    updates made while pieces are pending join the bulk lane to keep state
+    operations in order; other chunks may overtake them.
+
+    Large file parts are decoded and written to the blob store in a worker
+    thread. The part keeps its place in the regular lane until its URL is
+    ready, while the bulk lane keeps being served.
+    """
+
+    def __init__(
+        self,
+        max_payload_size: int = DEFAULT_MAX_PAYLOAD_SIZE,
+        blob_store: Optional[BlobStore] = None,
+    ) -> None:
+        if max_payload_size <= 0:
+            raise ValueError(
+                f"max_payload_size must be positive, got {max_payload_size!r}"
+            )
+        self._max_payload_size = max_payload_size
+        self._blob_store = blob_store
+        self._regular: Deque[
+            Union[AssistantStreamChunk, "asyncio.Task[FileChunk]", None]
+        ] = collections.deque()
+        self._bulk: Deque[AssistantStreamChunk] = collections.deque()
+        self._bulk_turn = False
+        self._waiter: Optional["asyncio.Future[None]"] = None
+
+    def put_nowait(self, chunk: Optional[AssistantStreamChunk]) -> None:
+        if chunk is not None:
+            if chunk.type == "update-state":
+                batches = split_state_operations(
+                    chunk.operations, self._max_payload_size
+                )
+                if len(batches) > 1 or self._bulk:
+                    self._bulk.extend(
+                        UpdateStateChunk(operations=batch) for batch in batches
+                    )
+                    _wake(self._waiter)
+                    return
+            elif (
+                chunk.type == "file"
+                and self._blob_store is not None
+                and len(chunk.data) > self._max_payload_size
+            ):
+                self._regular.append(
+                    asyncio.get_running_loop().create_task(self._offload_file(chunk))
+                )
+                _wake(self._waiter)
+                return
+        self._regular.append(chunk)
+        _wake(self._waiter)
+
+    async def _offload_file(self, chunk: FileChunk) -> FileChunk:
+        assert self._blob_store is not None
+        try:
+            # Decoding happens as the store consumes the pieces, so it stays
+            # off the event loop with the write.
+            url = await asyncio.to_thread(
+                self._blob_store.write, _decode_base64(chunk.data), chunk.mime_type
+            )
+        except (ValueError, binascii.Error, OSError):
+            logger.warning(
+                "Could not offload a %d byte file part; sending it inline",
+                len(chunk.data),
+                exc_info=True,
+            )
+            return chunk
+        return FileChunk(data=url, mime_type=chunk.mime_type, parent_id=chunk.parent_id)
+
+    async def get(self) -> Optional[AssistantStreamChunk]:
+        while not self._regular and not self._bulk:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        head = self._regular[0] if self._regular else None
+        offloading = isinstance(head, asyncio.Task) and not head.done()
+        # The end-of-run sentinel waits until every piece has been sent.
+        if self._bulk and (
+            self._bulk_turn or head is None or offloading
+        ):
+            self._bulk_turn = False
+            return self._bulk.popleft()
+        self._bulk_turn = True
+        if isinstance(head, asyncio.Task):
+            chunk = await head
+            self._regular.popleft()
+            return chunk
+        return self._regular.popleft()
+
+    def task_done(self) -> None:
+        pass
@@ -19,8 +19,10 @@ from assistant_stream.assistant_stream_chunk import (
 from assistant_stream.modules.tool_call import (
     create_tool_call,
     ToolCallController,
+    ToolHandler,
     generate_openai_style_tool_call_id,
 )
+from assistant_stream.chunked_transfer import BlobStore, ChunkedTransferQueue
 from assistant_stream.state_manager import StateManager
 
 logger = logging.getLogger(__name__)
@@ -44,6 +46,7 @@ class RunController:
         self._queue = queue
         self._loop = asyncio.get_running_loop()
         self._dispose_callbacks = []
+        self._cancel_callbacks = []
         self._stream_tasks = []
         self._state_manager = StateManager(self._put_chunk_nowait, state_data)
         self._parent_id = parent_id
@@ -55,6 +58,7 @@ class RunController:
         controller = RunController(self._queue, self._state_manager.state_data, parent_id)
         controller._loop = self._loop
         controller._dispose_callbacks = self._dispose_callbacks
+        controller._cancel_callbacks = self._cancel_callbacks
         controller._stream_tasks = self._stream_tasks
         controller._state_manager = self._state_manager
         controller._cancelled_event = self._cancelled_event
@@ -93,14 +97,25 @@ class RunController:
         self._state_manager.flush()
 
     async def add_tool_call(
-        self, tool_name: str, tool_call_id: str = None
+        self,
+        tool_name: str,
+        tool_call_id: str = None,
+        *,
+        handler: Optional[ToolHandler] = None,
     ) -> ToolCallController:
-        """Add a tool call to the stream."""
+        """Add a tool call to the stream.
+
+        With `handler`, the tool runs as soon as its streamed arguments close;
+        see ToolCallController.set_handler.
+        """
         if tool_call_id is None:
             tool_call_id = generate_openai_style_tool_call_id()
 
         stream, controller = await create_tool_call(tool_name, tool_call_id, self._parent_id)
+        if handler is not None:
+            controller.set_handler(handler)
         self._dispose_callbacks.append(controller.close)
+        self._cancel_callbacks.append(controller.cancel_handler)
 
         self.add_stream(stream)
         return controller
@@ -242,14 +257,30 @@ class RunController:
         """Set cancellation signal once."""
         if not self._cancelled_event.is_set():
             self._cancelled_event.set()
+            for cancel in self._cancel_callbacks:
+                cancel()
 
 
 async def create_run(
     callback: Callable[[RunController], Coroutine[Any, Any, None]],
     *,
     state: Any | None = None,
+    max_payload_size: Optional[int] = None,
+    blob_store: Optional[BlobStore] = None,
 ) -> AsyncGenerator[AssistantStreamChunk, None]:
-    queue = asyncio.Queue()
+    """Run `callback` and yield the chunks it emits.
+
+    With `max_payload_size` set, state strings longer than that many
+    characters are streamed as sequenced append-text pieces interleaved with
+    the other chunks, and file parts larger than that are offloaded to
+    `blob_store` (when given) and sent as a URL.
+    """
+    if max_payload_size is not None:
+        queue = ChunkedTransferQueue(max_payload_size, blob_store)
+    elif blob_store is not None:
+        raise ValueError("blob_store requires max_payload_size")
+    else:
+        queue = asyncio.Queue()
     controller = RunController(queue, state_data=state)
 
     async def background_task():
@@ -0,0 +1,285 @@
+import re
+from typing import Any, List, Optional, Tuple, Union
+
+JSONPath = Tuple[Union[str, int], ...]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_RUN = re.compile(r'[^"\\]*')
+_SCALAR_RUN = re.compile(r"[0-9a-zA-Z.+\-]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_LITERALS = {"true": True, "false": False, "null": None}
+
+(
+    _VALUE,
+    _STRING,
+    _ESCAPE,
+    _UNICODE,
+    _SCALAR,
+    _ARRAY_START,
+    _KEY,
+    _COLON,
+    _AFTER_VALUE,
+    _DONE,
+) = range(10)
+
+
+class IncrementalJSONParser:
+    """
+    Parses one JSON document fed in arbitrary pieces. Each piece is scanned
+    once, so parsing a document costs O(len) however it is split.
+
+    `value` is the document parsed so far: containers are built in place and
+    a string being read holds the text received so far; numbers appear once
+    complete. `feed` returns a `(path, value)` event for every value that
+    completed in the piece, innermost first, ending with the root.
+    """
+
+    def __init__(self) -> None:
+        self._state = _VALUE
+        # One [container, key] frame per open container; for arrays the key
+        # is the index of the element being read.
+        self._stack: List[list] = []
+        self._fragments: List[str] = []
+        # The string being read as `value` last joined it.
+        self._partial: Optional[str] = None
+        self._string_is_key = False
+        self._surrogates = False
+        self._unicode = ""
+        self._scalar: List[str] = []
+        self._key_required = False
+        self._root: Any = None
+        self.done = False
+        self.error: Optional[str] = None
+
+    @property
+    def value(self) -> Any:
+        """The partial document. Containers are live; do not mutate them."""
+        if (
+            self._state in (_STRING, _ESCAPE, _UNICODE)
+            and not self._string_is_key
+        ):
+            fragments = self._fragments
+            # Rebuilt only when text arrived since the last read.
+            if len(fragments) != 1 or fragments[0] is not self._partial:
+                partial = self._partial = "".join(fragments)
+                self._fragments = [partial]
+                self._set_slot(partial)
+        return self._root
+
+    def feed(self, text: str) -> List[Tuple[JSONPath, Any]]:
+        """Parse `text`, raising ValueError once the document is invalid."""
+        if self.error is not None:
+            raise ValueError(self.error)
+        events: List[Tuple[JSONPath, Any]] = []
+        try:
+            self._feed(text, events)
+        except ValueError as e:
+            self.error = str(e)
+            raise
+        return events
+
+    def close(self) -> List[Tuple[JSONPath, Any]]:
+        """End the input. A bare top-level number completes here."""
+        if self.error is not None:
+            raise ValueError(self.error)
+        events: List[Tuple[JSONPath, Any]] = []
+        try:
+            if self._state == _SCALAR and not self._stack:
+                self._finish_scalar(events)
+            if not self.done:
+                raise ValueError("Incomplete JSON document")
+        except ValueError as e:
+            self.error = str(e)
+            raise
+        return events
+
+    def _feed(self, text: str, events: List[Tuple[JSONPath, Any]]) -> None:
+        i = 0
+        n = len(text)
+        while i < n:
+            state = self._state
+            if state == _STRING:
+                end = _STRING_RUN.match(text, i).end()
+                if end > i:
+                    self._fragments.append(text[i:end])
+                    i = end
+                    if i == n:
+                        break
+                i += 1
+                if text[i - 1] == '"':
+                    self._finish_string(events)
+                else:
+                    self._state = _ESCAPE
+                continue
+            if state == _ESCAPE:
+                ch = text[i]
+                i += 1
+                if ch == "u":
+                    self._unicode = ""
+                    self._state = _UNICODE
+                elif ch in _ESCAPES:
+                    self._fragments.append(_ESCAPES[ch])
+                    self._state = _STRING
+                else:
+                    raise ValueError(f"Invalid escape sequence \\{ch}")
+                continue
+            if state == _UNICODE:
+                take = min(4 - len(self._unicode), n - i)
+                self._unicode += text[i : i + take]
+                i += take
+                if len(self._unicode) == 4:
+                    try:
+                        code = int(self._unicode, 16)
+                    except ValueError:
+                        raise ValueError(
+                            f"Invalid unicode escape \\u{self._unicode}"
+                        ) from None
+                    if 0xD800 <= code <= 0xDFFF:
+                        self._surrogates = True
+                    self._fragments.append(chr(code))
+                    self._state = _STRING
+                continue
+            if state == _SCALAR:
+                end = _SCALAR_RUN.match(text, i).end()
+                self._scalar.append(text[i:end])
+                i = end
+                if i < n:
+                    self._finish_scalar(events)
+                continue
+
+            i = _WHITESPACE.match(text, i).end()
+            if i == n:
+                break
+            ch = text[i]
+            i += 1
+            if state == _VALUE:
+                self._begin_value(ch)
+            elif state == _ARRAY_START:
+                if ch == "]":
+                    self._close_container(events)
+                else:
+                    self._begin_value(ch)
+            elif state == _KEY:
+                if ch == '"':
+                    self._fragments = []
+                    self._string_is_key = True
+                    self._state = _STRING
+                elif ch == "}" and not self._key_required:
+                    self._close_container(events)
+                else:
+                    raise ValueError(f"Expected object key, got {ch!r}")
+            elif state == _COLON:
+                if ch != ":":
+                    raise ValueError(f"Expected ':', got {ch!r}")
+                self._state = _VALUE
+            elif state == _AFTER_VALUE:
+                frame = self._stack[-1]
+                is_object = isinstance(frame[0], dict)
+                if ch == ",":
+                    if is_object:
+                        self._key_required = True
+                        self._state = _KEY
+                    else:
+                        frame[1] += 1
+                        self._state = _VALUE
+                elif ch == ("}" if is_object else "]"):
+                    self._close_container(events)
+                else:
+                    raise ValueError(f"Unexpected {ch!r} after value")
+            else:
+                raise ValueError(f"Extra data after JSON document: {ch!r}")
+
+    def _begin_value(self, ch: str) -> None:
+        if ch == '"':
+            self._fragments = []
+            self._string_is_key = False
+            self._surrogates = False
+            self._place("")
+            self._state = _STRING
+        elif ch == "{":
+            container: Any = {}
+            self._place(container)
+            self._stack.append([container, None])
+            self._key_required = False
+            self._state = _KEY
+        elif ch == "[":
+            container = []
+            self._place(container)
+            self._stack.append([container, 0])
+            self._state = _ARRAY_START
+        elif ch in "-0123456789tfn":
+            self._scalar = [ch]
+            self._state = _SCALAR
+        else:
+            raise ValueError(f"Unexpected {ch!r} where a value was expected")
+
+    def _place(self, value: Any) -> None:
+        if not self._stack:
+            self._root = value
+            return
+        container, key = self._stack[-1]
+        if isinstance(container, list):
+            container.append(value)
+        else:
+            container[key] = value
+
+    def _set_slot(self, value: Any) -> None:
+        if not self._stack:
+            self._root = value
+        else:
+            container, key = self._stack[-1]
+            container[key] = value
+
+    def _complete(self, value: Any, events: List[Tuple[JSONPath, Any]]) -> None:
+        events.append((tuple(frame[1] for frame in self._stack), value))
+        if self._stack:
+            self._state = _AFTER_VALUE
+        else:
+            self._state = _DONE
+            self.done = True
+
+    def _finish_string(self, events: List[Tuple[JSONPath, Any]]) -> None:
+        value = "".join(self._fragments)
+        self._fragments = []
+        if self._surrogates:
+            # Rejoin \uXXXX surrogate pairs; lone surrogates are kept, as
+            # json.loads does.
+            value = value.encode("utf-16", "surrogatepass").decode(
+                "utf-16", "surrogatepass"
+            )
+            self._surrogates = False
+        if self._string_is_key:
+            self._stack[-1][1] = value
+            self._string_is_key = False
+            self._state = _COLON
+            return
+        self._set_slot(value)
+        self._complete(value, events)
+
+    def _finish_scalar(self, events: List[Tuple[JSONPath, Any]]) -> None:
+        token = "".join(self._scalar)
+        self._scalar = []
+        if token in _LITERALS:
+            value = _LITERALS[token]
+        else:
+            match = _NUMBER.fullmatch(token)
+            if match is None:
+                raise ValueError(f"Invalid JSON value {token!r}")
+            value = float(token) if match.group(1) or match.group(2) else int(token)
+        self._place(value)
+        self._complete(value, events)
+
+    def _close_container(self, events: List[Tuple[JSONPath, Any]]) -> None:
+        container, _ = self._stack.pop()
+        self._complete(container, events)
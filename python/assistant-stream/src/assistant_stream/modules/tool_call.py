@@ -1,5 +1,7 @@
 import asyncio
-from typing import Any, AsyncGenerator
+import inspect
+import logging
+from typing import Any, AsyncGenerator, Callable, List, Optional
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
     ToolCallBeginChunk,
@@ -7,9 +9,17 @@ from assistant_stream.assistant_stream_chunk import (
     ToolCallDeltaChunk,
     ToolResultChunk,
 )
+from assistant_stream.modules.partial_json import IncrementalJSONParser, JSONPath
 import string
 import random
 
+logger = logging.getLogger(__name__)
+
+ArgsFieldCallback = Callable[[JSONPath, Any], None]
+ToolHandler = Callable[[Any], Any]
+
+_NO_RESPONSE = object()
+
 
 def generate_openai_style_tool_call_id():
     prefix = "call_"
@@ -25,6 +35,19 @@ class ToolCallController:
         self.queue = queue
         self.loop = asyncio.get_running_loop()
         self._closed = False
+        self._responded = False
+        # Args text is kept until something asks for parsed args, so tool
+        # calls nobody inspects are never parsed.
+        self._args_fragments: Optional[List[str]] = []
+        self._args_parser: Optional[IncrementalJSONParser] = None
+        self._args_callbacks: List[ArgsFieldCallback] = []
+        self._args_future: Optional["asyncio.Future[Any]"] = None
+        self._handler: Optional[ToolHandler] = None
+        # Set as soon as the args settle with a handler attached, so a close
+        # issued before the handler task starts waits for its response.
+        self._handler_pending = False
+        self._handler_cancelled = False
+        self._handler_task: Optional["asyncio.Task[None]"] = None
 
         begin_chunk = ToolCallBeginChunk(
             tool_call_id=self.tool_call_id,
@@ -40,6 +63,148 @@ class ToolCallController:
             args_text_delta=args_text_delta,
         )
         self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        if self._args_parser is None:
+            self._args_fragments.append(args_text_delta)
+        else:
+            self._parse_args(args_text_delta)
+
+    @property
+    def partial_args(self) -> Any:
+        """The arguments parsed so far; see IncrementalJSONParser.value."""
+        return self._ensure_args_parser().value
+
+    @property
+    def args_complete(self) -> bool:
+        """Whether the arguments document has closed."""
+        return self._ensure_args_parser().done
+
+    def on_args_field(self, callback: ArgsFieldCallback) -> None:
+        """
+        Call `callback(path, value)` whenever an argument value completes,
+        e.g. `(("url",), "https://...")`, ending with `((), args)`.
+        Values completed before registration are not replayed.
+        """
+        self._ensure_args_parser()
+        self._args_callbacks.append(callback)
+
+    async def wait_for_args(self) -> Any:
+        """Wait until the arguments close and return them.
+
+        Raises ValueError if the arguments are not valid JSON.
+        """
+        return await asyncio.shield(self._ensure_args_future())
+
+    def set_handler(self, handler: ToolHandler) -> None:
+        """
+        Run `handler(args)` as soon as the arguments close, while the model
+        may still be generating, and respond with its return value (or its
+        error). The handler may be sync or async. It is cancelled with the
+        run, or by `cancel_handler`. A tool call takes one handler.
+        """
+        if self._handler is not None:
+            raise RuntimeError(
+                f"Tool call {self.tool_call_id} already has a handler"
+            )
+        self._handler = handler
+        future = self._ensure_args_future()
+        parser = self._args_parser
+        if parser.done or parser.error is not None:
+            self._handler_pending = True
+        future.add_done_callback(self._start_handler)
+
+    def _ensure_args_parser(self) -> IncrementalJSONParser:
+        if self._args_parser is None:
+            self._args_parser = IncrementalJSONParser()
+            text = "".join(self._args_fragments)
+            self._args_fragments = None
+            if text:
+                self._parse_args(text)
+        return self._args_parser
+
+    def _ensure_args_future(self) -> "asyncio.Future[Any]":
+        if self._args_future is None:
+            self._args_future = self.loop.create_future()
+            parser = self._ensure_args_parser()
+            if parser.error is not None:
+                self._args_future.set_exception(ValueError(parser.error))
+            elif parser.done:
+                self._args_future.set_result(parser.value)
+        return self._args_future
+
+    def _parse_args(self, text: str) -> None:
+        parser = self._args_parser
+        if parser.error is not None:
+            return
+        try:
+            events = parser.feed(text)
+        except ValueError as e:
+            logger.warning(
+                "Tool call %s has invalid JSON arguments: %s", self.tool_call_id, e
+            )
+            if self._args_future is not None:
+                self._handler_pending = self._handler is not None
+                self.loop.call_soon_threadsafe(self._settle_args, e)
+            return
+        for path, value in events:
+            for callback in self._args_callbacks:
+                callback(path, value)
+        if parser.done and self._args_future is not None:
+            self._handler_pending = self._handler is not None
+            self.loop.call_soon_threadsafe(self._settle_args, None)
+
+    def _settle_args(self, error: Optional[Exception]) -> None:
+        if self._args_future.done():
+            return
+        if error is not None:
+            self._args_future.set_exception(error)
+        else:
+            self._args_future.set_result(self._args_parser.value)
+
+    def cancel_handler(self) -> None:
+        """Stop the handler set with set_handler, or keep it from starting,
+        and close the tool call without a response unless one was set."""
+        self._handler_cancelled = True
+        task = self._handler_task
+        if task is not None and not task.done():
+            # The task closes the tool call as it unwinds.
+            task.cancel()
+        elif self._handler_pending:
+            self._finish_handler()
+
+    def _start_handler(self, future: "asyncio.Future[Any]") -> None:
+        if future.cancelled() or self._responded or self._handler_cancelled:
+            self._finish_handler()
+        elif future.exception() is not None:
+            self._finish_handler(str(future.exception()), is_error=True)
+        else:
+            self._handler_task = self.loop.create_task(
+                self._run_handler(future.result())
+            )
+
+    async def _run_handler(self, args: Any) -> None:
+        try:
+            result = self._handler(args)
+            if inspect.isawaitable(result):
+                result = await result
+        except asyncio.CancelledError:
+            self._finish_handler()
+            raise
+        except Exception as e:
+            logger.warning(
+                "Handler for tool call %s failed", self.tool_call_id, exc_info=True
+            )
+            self._finish_handler(str(e), is_error=True)
+        else:
+            self._finish_handler(result)
+
+    def _finish_handler(
+        self, response: Any = _NO_RESPONSE, is_error: bool = False
+    ) -> None:
+        self._handler_pending = False
+        if response is not _NO_RESPONSE and not self._responded:
+            self.set_response(response, is_error=is_error)
+        else:
+            self.close()
 
     def set_result(self, result: Any) -> None:
         """
@@ -60,7 +225,7 @@ class ToolCallController:
         self, result: Any, *, artifact: Any | None = None, is_error: bool = False
     ) -> None:
         """Set the result of the tool call."""
-
+        self._responded = True
         chunk = ToolResultChunk(
             tool_call_id=self.tool_call_id,
             result=result,
@@ -71,8 +236,13 @@ class ToolCallController:
         self.close()
 
     def close(self) -> None:
-        """Close the stream."""
-        if self._closed:
+        """Close the stream.
+
+        While a handler set with set_handler is pending, the close is
+        deferred: the stream closes once the handler responds. Call
+        `cancel_handler` to close without waiting for it.
+        """
+        if self._closed or self._handler_pending:
             return
         self._closed = True
         self.loop.call_soon_threadsafe(
@@ -91,11 +261,15 @@ async def create_tool_call(
     controller = ToolCallController(queue, tool_name, tool_call_id, parent_id)
 
     async def stream():
-        while True:
-            chunk = await controller.queue.get()
-            if chunk is None:
-                break
-            yield chunk
-            controller.queue.task_done()
+        try:
+            while True:
+                chunk = await controller.queue.get()
+                if chunk is None:
+                    break
+                yield chunk
+                controller.queue.task_done()
+        finally:
+            # Nobody reads the response once the stream is torn down.
+            controller.cancel_handler()
 
     return stream(), controller
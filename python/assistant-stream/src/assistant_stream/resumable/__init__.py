@@ -15,6 +15,9 @@ from assistant_stream.resumable.response import (
     create_resumable_assistant_stream_response,
     create_resume_assistant_stream_response,
 )
+from assistant_stream.resumable.stores.file import (
+    create_file_resumable_stream_store,
+)
 from assistant_stream.resumable.stores.in_memory import (
     create_in_memory_resumable_stream_store,
 )
@@ -37,6 +40,7 @@ __all__ = [
     "ResumableStreamRole",
     "ResumableStreamStatus",
     "ResumableStreamStore",
+    "create_file_resumable_stream_store",
     "create_in_memory_resumable_stream_store",
     "create_resumable_assistant_stream_response",
     "create_resumable_stream_context",
@@ -46,13 +50,21 @@ __all__ = [
 
 with suppress(ImportError):
     from assistant_stream.resumable.stores.redis import (
+        BlockingRedisLikeClient,
+        CombiningRedisLikeClient,
         RedisLikeClient,
         RedisResumableStreamStore,
+        RedisScript,
+        ScriptingRedisLikeClient,
         create_redis_resumable_stream_store,
     )
 
     __all__ += [
+        "BlockingRedisLikeClient",
+        "CombiningRedisLikeClient",
         "RedisLikeClient",
         "RedisResumableStreamStore",
+        "RedisScript",
+        "ScriptingRedisLikeClient",
         "create_redis_resumable_stream_store",
     ]
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import AsyncIterator, Callable
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
 from dataclasses import dataclass, field
 from typing import Any, Literal
 
@@ -12,6 +13,10 @@ from assistant_stream.resumable.types import (
     ResumableStreamStatus,
     ResumableStreamStore,
 )
+from assistant_stream.serialization.coalesce import (
+    DEFAULT_COALESCE_MAX_BYTES,
+    coalesce_frames,
+)
 
 logger = logging.getLogger(__name__)
 _hook_logger = logging.getLogger("assistant_stream.resumable")
@@ -22,6 +27,7 @@ OnAcquire = Callable[[str, ResumableStreamRole], None]
 OnAppend = Callable[[str, int], None]
 OnFinalize = Callable[[str, Literal["done", "error"], str | None], None]
 OnError = Callable[[str, object], None]
+WriteBehindOverflow = Literal["block", "fail"]
 
 
 def _call_hook(hook: Callable[..., Any] | None, /, *args: Any) -> None:
@@ -42,7 +48,14 @@ class ResumableStreamContext:
     _on_append: OnAppend | None
     _on_finalize: OnFinalize | None
     _on_error: OnError | None
+    _batch_ms: int | None = None
+    _batch_max_bytes: int = DEFAULT_COALESCE_MAX_BYTES
+    _write_behind_bytes: int | None = None
+    _write_behind_overflow: WriteBehindOverflow = "block"
     _tasks: set[asyncio.Task[None]] = field(default_factory=set, repr=False)
+    # Runs produced by this context that are still being written to the
+    # store, for local readers when write-behind is on.
+    _live: dict[str, _LiveStream] = field(default_factory=dict, repr=False)
 
     async def run(
         self, stream_id: str, make_stream: MakeStream
@@ -53,6 +66,12 @@ class ResumableStreamContext:
         )
         _call_hook(self._on_acquire, stream_id, role)
         if role == "producer":
+            live = write_behind = None
+            if self._write_behind_bytes is not None:
+                live = self._live[stream_id] = _LiveStream()
+                write_behind = _WriteBehind(
+                    self._write_behind_bytes, self._write_behind_overflow
+                )
             _start_producer_task(
                 self._store,
                 stream_id,
@@ -62,16 +81,35 @@ class ResumableStreamContext:
                 on_append=self._on_append,
                 on_finalize=self._on_finalize,
                 on_error=self._on_error,
+                batch_ms=self._batch_ms,
+                batch_max_bytes=self._batch_max_bytes,
+                live=live,
+                write_behind=write_behind,
+                on_done=lambda: self._forget_live(stream_id, live),
             )
-        return _read_from_store(self._store, stream_id)
+        return self._read(stream_id)
 
     async def resume(self, stream_id: str) -> AsyncIterator[bytes] | None:
+        if stream_id in self._live:
+            return self._read(stream_id)
         status = await self._store.status(stream_id)
         if status == "missing":
             return None
         return _read_from_store(self._store, stream_id)
 
+    def _forget_live(self, stream_id: str, live: _LiveStream | None) -> None:
+        if live is not None and self._live.get(stream_id) is live:
+            del self._live[stream_id]
+
+    def _read(self, stream_id: str) -> AsyncIterator[bytes]:
+        live = self._live.get(stream_id)
+        if live is not None:
+            return live.frames()
+        return _read_from_store(self._store, stream_id)
+
     async def require_resume(self, stream_id: str) -> AsyncIterator[bytes]:
+        if stream_id in self._live:
+            return self._read(stream_id)
         status = await self._store.status(stream_id)
         if status == "missing":
             raise ResumableStreamError(
@@ -96,7 +134,43 @@ def create_resumable_stream_context(
     on_append: OnAppend | None = None,
     on_finalize: OnFinalize | None = None,
     on_error: OnError | None = None,
+    batch_ms: int | None = None,
+    batch_max_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+    write_behind_bytes: int | None = None,
+    write_behind_overflow: WriteBehindOverflow = "block",
 ) -> ResumableStreamContext:
+    """
+    With `batch_ms` set, the producer appends the frames that arrive while
+    an append is in flight, or within `batch_ms` of the previous append, as
+    one store entry of at most `batch_max_bytes` (a single larger frame
+    still gets its own entry). Readers see the same bytes; `on_append`
+    fires once per entry. Keep `batch_max_bytes` within any chunk size
+    limit of the store.
+
+    With `write_behind_bytes` set, callers of `run` and `resume` on this
+    context read a run it is producing straight from memory, while a
+    separate task appends its frames to the store from a buffer of up to
+    that many bytes. Resumers elsewhere read the store as before. When the
+    store falls that far behind, `write_behind_overflow="block"` pauses
+    the run until it catches up; "fail" lets the run continue and
+    finalizes the stored copy as an error. A failing store append likewise
+    only ends the stored copy.
+    """
+    if batch_ms is not None and batch_ms < 0:
+        raise ValueError(f"batch_ms must be non-negative, got {batch_ms!r}")
+    if batch_max_bytes <= 0:
+        raise ValueError(
+            f"batch_max_bytes must be positive, got {batch_max_bytes!r}"
+        )
+    if write_behind_bytes is not None and write_behind_bytes <= 0:
+        raise ValueError(
+            f"write_behind_bytes must be positive, got {write_behind_bytes!r}"
+        )
+    if write_behind_overflow not in ("block", "fail"):
+        raise ValueError(
+            "write_behind_overflow must be 'block' or 'fail', "
+            f"got {write_behind_overflow!r}"
+        )
     return ResumableStreamContext(
         _store=store,
         _ttl_ms=ttl_ms,
@@ -105,6 +179,10 @@ def create_resumable_stream_context(
         _on_append=on_append,
         _on_finalize=on_finalize,
         _on_error=on_error,
+        _batch_ms=batch_ms,
+        _batch_max_bytes=batch_max_bytes,
+        _write_behind_bytes=write_behind_bytes,
+        _write_behind_overflow=write_behind_overflow,
     )
 
 
@@ -118,17 +196,28 @@ def _start_producer_task(
     on_append: OnAppend | None,
     on_finalize: OnFinalize | None,
     on_error: OnError | None,
+    batch_ms: int | None = None,
+    batch_max_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+    live: _LiveStream | None = None,
+    write_behind: _WriteBehind | None = None,
+    on_done: Callable[[], object] | None = None,
 ) -> None:
-    async def _pump() -> None:
+    async def _write(open_chunks: Callable[[], AsyncIterator[bytes]]) -> None:
+        batches: AsyncGenerator[bytes, None] | None = None
         try:
-            async for chunk in make_stream():
+            chunks = open_chunks()
+            if batch_ms is not None:
+                chunks = batches = coalesce_frames(
+                    chunks, batch_ms / 1000, batch_max_bytes
+                )
+            async for chunk in chunks:
                 await store.append(stream_id, chunk)
                 _call_hook(on_append, stream_id, len(chunk))
             await store.finalize(stream_id, "done")
             _call_hook(on_finalize, stream_id, "done", None)
         except Exception as err:
             _call_hook(on_error, stream_id, err)
-            message = str(err) if str(err) else repr(err)
+            message = _error_message(err)
             try:
                 await store.finalize(stream_id, "error", message)
                 _call_hook(on_finalize, stream_id, "error", message)
@@ -136,8 +225,45 @@ def _start_producer_task(
                 logger.error(
                     "resumable stream finalize failed: %s", finalize_err
                 )
+        finally:
+            if batches is not None:
+                # Stops the read-ahead task if an append failed mid-stream.
+                await batches.aclose()
+
+    async def _write_behind(buffer: _WriteBehind) -> None:
+        try:
+            await _write(buffer.frames)
+        finally:
+            # Frames the store will never take must not block the run.
+            buffer.abandon()
 
-    task = asyncio.create_task(_pump())
+    async def _pump_live(live: _LiveStream, buffer: _WriteBehind) -> None:
+        writer = asyncio.create_task(_write_behind(buffer))
+        error: str | None = "Stream cancelled"
+        try:
+            try:
+                async for frame in make_stream():
+                    live.publish(frame)
+                    await buffer.put(frame)
+            except Exception as err:
+                error = _error_message(err)
+                buffer.close(err)
+            else:
+                error = None
+                buffer.close(None)
+            live.finish(error)
+            await writer
+        finally:
+            live.finish(error)
+            if not writer.done():
+                writer.cancel()
+            if on_done is not None:
+                on_done()
+
+    if live is not None and write_behind is not None:
+        task = asyncio.create_task(_pump_live(live, write_behind))
+    else:
+        task = asyncio.create_task(_write(make_stream))
     tasks.add(task)
     task.add_done_callback(tasks.discard)
     if wait_until is not None:
@@ -154,6 +280,125 @@ def _start_producer_task(
     task.add_done_callback(_done_callback)
 
 
+def _error_message(err: BaseException) -> str:
+    return str(err) if str(err) else repr(err)
+
+
+def _wake(future: asyncio.Future[None] | None) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+class _LiveStream:
+    """A run's frames as this process produces them, for local readers."""
+
+    def __init__(self) -> None:
+        self._frames: list[bytes] = []
+        self._done = False
+        self._error: str | None = None
+        self._update: asyncio.Future[None] | None = None
+
+    def publish(self, frame: bytes) -> None:
+        self._frames.append(frame)
+        self._notify()
+
+    def finish(self, error: str | None) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        update = self._update
+        self._update = None
+        _wake(update)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            while index < len(self._frames):
+                yield self._frames[index]
+                index += 1
+            if self._done:
+                if self._error is not None:
+                    raise RuntimeError(self._error)
+                return
+            if self._update is None:
+                self._update = asyncio.get_running_loop().create_future()
+            # Shielded so a cancelled reader leaves the others waiting.
+            await asyncio.shield(self._update)
+
+
+class _WriteBehind:
+    """Frames published locally but not yet appended to the store, at most
+    `max_bytes` of them; a larger frame is let through on its own."""
+
+    def __init__(self, max_bytes: int, overflow: WriteBehindOverflow) -> None:
+        self._max_bytes = max_bytes
+        self._overflow = overflow
+        self._frames: deque[bytes] = deque()
+        self._bytes = 0
+        self._closed = False
+        self._abandoned = False
+        self._error: Exception | None = None
+        self._data_waiter: asyncio.Future[None] | None = None
+        self._space_waiter: asyncio.Future[None] | None = None
+
+    async def put(self, frame: bytes) -> None:
+        while (
+            not self._abandoned
+            and self._frames
+            and self._bytes + len(frame) > self._max_bytes
+        ):
+            if self._overflow == "fail":
+                self._error = RuntimeError("Write-behind buffer overflowed")
+                self.abandon()
+                _wake(self._data_waiter)
+                return
+            self._space_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._space_waiter
+            finally:
+                self._space_waiter = None
+        if self._abandoned:
+            return
+        self._frames.append(frame)
+        self._bytes += len(frame)
+        _wake(self._data_waiter)
+
+    def close(self, error: Exception | None) -> None:
+        self._closed = True
+        if self._error is None:
+            self._error = error
+        _wake(self._data_waiter)
+
+    def abandon(self) -> None:
+        """Drop the backlog and accept no more frames."""
+        self._abandoned = True
+        self._frames.clear()
+        self._bytes = 0
+        _wake(self._space_waiter)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        while True:
+            if self._frames:
+                frame = self._frames.popleft()
+                self._bytes -= len(frame)
+                _wake(self._space_waiter)
+                yield frame
+                continue
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                return
+            self._data_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._data_waiter
+            finally:
+                self._data_waiter = None
+
+
 async def _read_from_store(
     store: ResumableStreamStore, stream_id: str
 ) -> AsyncIterator[bytes]:
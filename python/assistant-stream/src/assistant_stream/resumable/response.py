@@ -24,9 +24,8 @@ async def create_resumable_assistant_stream_response(
 ) -> Response:
     resolved_encoder = encoder if encoder is not None else DataStreamEncoder()
 
-    async def make_stream() -> AsyncIterator[bytes]:
-        async for frame in resolved_encoder.encode_stream(create_run(callback)):
-            yield frame.encode("utf-8")
+    def make_stream() -> AsyncIterator[bytes]:
+        return resolved_encoder.encode_stream_bytes(create_run(callback))
 
     body = await context.run(stream_id, make_stream)
     return StreamingResponse(
@@ -1,10 +1,14 @@
 from contextlib import suppress
 
+from assistant_stream.resumable.stores.file import (
+    create_file_resumable_stream_store,
+)
 from assistant_stream.resumable.stores.in_memory import (
     create_in_memory_resumable_stream_store,
 )
 
 __all__ = [
+    "create_file_resumable_stream_store",
     "create_in_memory_resumable_stream_store",
 ]
 
@@ -0,0 +1,79 @@
+"""Helpers shared by the stores that keep their streams in this process."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Literal, Protocol
+
+
+@dataclass(slots=True)
+class _FinalizeMarker:
+    kind: Literal["done", "error"]
+    error: str | None = None
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Watched(Protocol):
+    update: asyncio.Future[None] | None
+
+
+async def _wait_for_update(
+    state: _Watched,
+    signalled: asyncio.Future[Any],
+    wake_by: float | None = None,
+) -> None:
+    """Wait until the stream changes, `signalled` resolves or, if given,
+    `wake_by` ms pass. Every waiter on a stream shares its `update` future;
+    a timer is only armed for a waiter that passes `wake_by`."""
+    if signalled.done():
+        return
+    if wake_by is not None and wake_by <= 0:
+        return
+
+    loop = asyncio.get_running_loop()
+    update = state.update
+    if update is None:
+        update = state.update = loop.create_future()
+    waiter = loop.create_future()
+
+    def wake(_: object = None) -> None:
+        _wake(waiter)
+
+    update.add_done_callback(wake)
+    signalled.add_done_callback(wake)
+    timer = None
+    if wake_by is not None:
+        timer = loop.call_later(wake_by / 1000.0, wake)
+    try:
+        await waiter
+    finally:
+        update.remove_done_callback(wake)
+        signalled.remove_done_callback(wake)
+        if timer is not None:
+            timer.cancel()
+
+
+def _cursor_of(seq: int) -> str:
+    if seq == 0:
+        return "0"
+    alphabet = "0123456789abcdefghijklmnopqrstuvwxyz"
+    n = seq
+    chars: list[str] = []
+    while n:
+        n, rem = divmod(n, 36)
+        chars.append(alphabet[rem])
+    return "".join(reversed(chars))
+
+
+def _seq_from_cursor(cursor: str) -> int:
+    if cursor == "":
+        return 0
+    try:
+        return int(cursor, 36)
+    except ValueError:
+        return 0
@@ -0,0 +1,570 @@
+"""Resumable streams in append-only segment files, one per stream, so that
+a single-node deployment keeps them across a restart without Redis.
+
+A segment starts with `_MAGIC`, followed by records of a 9-byte header
+(kind, payload length, CRC-32 of the payload) and the payload:
+
+    M  the stream's TTL in ms and its id, written by acquire
+    C  one appended chunk
+    D  finalized as done
+    E  finalized as an error; the payload is the message
+
+The offsets of each stream's chunks are indexed in memory and rebuilt by
+scanning the segments when the store is created. A record cut short by a
+crash fails its length or CRC check and is truncated away, and a stream
+whose producer died with the previous process is finalized as an error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from assistant_stream.resumable.errors import (
+    DEFAULT_TTL_MS,
+    ResumableStreamError,
+    validate_stream_id,
+)
+from assistant_stream.resumable.stores._common import (
+    _cursor_of,
+    _FinalizeMarker,
+    _seq_from_cursor,
+    _wait_for_update,
+    _wake,
+)
+from assistant_stream.resumable.types import (
+    CancellationSignal,
+    ResumableStreamEntry,
+    ResumableStreamRole,
+    ResumableStreamStatus,
+)
+
+FsyncPolicy = Literal["always", "finalize", "never"]
+
+_MAGIC = b"AUISEG1\n"
+_RECORD = struct.Struct("<cII")
+_TTL = struct.Struct("<Q")
+_SUFFIX = ".seg"
+_MAX_RECORD_BYTES = 2**32 - 1
+_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND | getattr(os, "O_BINARY", 0)
+)
+_REOPEN_FLAGS = _OPEN_FLAGS & ~os.O_CREAT & ~os.O_TRUNC
+DEFAULT_MAX_OPEN_FILES = 128
+
+
+@dataclass(slots=True)
+class _Segment:
+    path: str
+    # Chunk i, whose cursor is sequence number i + 1, is the file's bytes
+    # from starts[i] to ends[i].
+    starts: array[int] = field(default_factory=lambda: array("Q"))
+    ends: array[int] = field(default_factory=lambda: array("Q"))
+    size: int = 0
+    expires_at: float = 0.0
+    ttl_ms: int = 0
+    final: _FinalizeMarker | None = None
+    update: asyncio.Future[None] | None = None
+    # Open for appending while the stream is among the store's most
+    # recently written ones; reopened on its next write otherwise.
+    fd: int | None = None
+    # Wakes tailing readers if the stream expires; see `_watch_expiry`.
+    expiry_timer: asyncio.TimerHandle | None = None
+
+
+def _record(kind: bytes, payload: bytes) -> bytes:
+    return _RECORD.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+
+def _write(segment: _Segment, data: bytes) -> None:
+    assert segment.fd is not None
+    view = memoryview(data)
+    try:
+        while view:
+            view = view[os.write(segment.fd, view) :]
+    except OSError:
+        # Leave no torn record for the next append to follow.
+        with suppress(OSError):
+            os.ftruncate(segment.fd, segment.size)
+        raise
+    segment.size += len(data)
+
+
+def _close(segment: _Segment) -> None:
+    fd, segment.fd = segment.fd, None
+    if fd is not None:
+        os.close(fd)
+
+
+def _fsync_and_close(fd: int) -> None:
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+async def _fsync(segment: _Segment) -> None:
+    # A duplicate descriptor stays valid if the stream is deleted and its
+    # own descriptor closed while the sync runs.
+    if segment.fd is not None:
+        await asyncio.to_thread(_fsync_and_close, os.dup(segment.fd))
+
+
+if hasattr(os, "pread"):
+
+    def _pread(file: Any, offset: int, length: int) -> bytes:
+        return os.pread(file.fileno(), length, offset)
+
+else:
+
+    def _pread(file: Any, offset: int, length: int) -> bytes:
+        file.seek(offset)
+        return file.read(length)
+
+
+def _scan(path: str) -> tuple[str, int, _Segment] | None:
+    """Index the segment at `path`. Returns its stream id, its TTL and the
+    segment, sized to its intact records, or None if it never completed an
+    acquire."""
+    size = os.path.getsize(path)
+    if size < len(_MAGIC) + _RECORD.size:
+        return None
+    segment = _Segment(path=path)
+    meta: tuple[str, int] | None = None
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as view:
+        if view[: len(_MAGIC)] != _MAGIC:
+            return None
+        offset = len(_MAGIC)
+        while offset + _RECORD.size <= size and segment.final is None:
+            kind, length, crc = _RECORD.unpack_from(view, offset)
+            start = offset + _RECORD.size
+            end = start + length
+            if end > size:
+                break
+            payload = view[start:end]
+            if zlib.crc32(payload) != crc:
+                break
+            if meta is None:
+                if kind != b"M" or length < _TTL.size:
+                    return None
+                (ttl_ms,) = _TTL.unpack_from(payload)
+                meta = (payload[_TTL.size :].decode("utf-8"), ttl_ms)
+            elif kind == b"C":
+                segment.starts.append(start)
+                segment.ends.append(end)
+            elif kind == b"D":
+                segment.final = _FinalizeMarker(kind="done")
+            elif kind == b"E":
+                segment.final = _FinalizeMarker(
+                    kind="error", error=payload.decode("utf-8", "replace")
+                )
+            else:
+                break
+            offset = end
+    if meta is None:
+        return None
+    segment.size = offset
+    return meta[0], meta[1], segment
+
+
+class _FileResumableStreamStore:
+    def __init__(
+        self,
+        *,
+        directory: str,
+        default_ttl_ms: int,
+        now: Callable[[], float],
+        fsync: FsyncPolicy,
+        max_chunk_bytes: int | None,
+        max_open_files: int,
+    ) -> None:
+        self._directory = directory
+        # Segments holding a descriptor, least recently written first.
+        self._open: OrderedDict[str, _Segment] = OrderedDict()
+        self._max_open_files = max_open_files
+        self._streams: dict[str, _Segment] = {}
+        # Min-heap of (expires_at, order, stream_id, segment), rescheduled
+        # lazily as in the in-memory store.
+        self._expiry: list[tuple[float, int, str, _Segment]] = []
+        self._expiry_order = itertools.count()
+        self._default_ttl_ms = default_ttl_ms
+        self._now = now
+        self._fsync = fsync
+        self._max_chunk_bytes = max_chunk_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _path(self, stream_id: str) -> str:
+        # Stream ids may differ only in case, or be "." or "..", so files
+        # are named by hash and the id is kept in the M record.
+        digest = hashlib.sha256(stream_id.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, digest[:32] + _SUFFIX)
+
+    def _recover(self) -> None:
+        with os.scandir(self._directory) as entries:
+            paths = [
+                (entry.path, entry.stat().st_mtime * 1000)
+                for entry in entries
+                if entry.name.endswith(_SUFFIX) and entry.is_file()
+            ]
+        for path, modified_at in paths:
+            scanned = _scan(path)
+            if scanned is None:
+                os.remove(path)
+                continue
+            stream_id, ttl_ms, segment = scanned
+            expires_at = modified_at + ttl_ms
+            if expires_at <= self._now() or path != self._path(stream_id):
+                os.remove(path)
+                continue
+            if segment.size < os.path.getsize(path):
+                os.truncate(path, segment.size)
+            if segment.final is None:
+                # Its producer is gone; finalize it rather than leave
+                # readers waiting out the TTL.
+                error = "Stream interrupted by a restart"
+                segment.fd = os.open(path, _OPEN_FLAGS & ~os.O_TRUNC)
+                try:
+                    _write(segment, _record(b"E", error.encode("utf-8")))
+                    if self._fsync != "never":
+                        os.fsync(segment.fd)
+                finally:
+                    _close(segment)
+                segment.final = _FinalizeMarker(kind="error", error=error)
+            segment.ttl_ms = ttl_ms
+            segment.expires_at = expires_at
+            self._streams[stream_id] = segment
+            self._schedule_expiry(stream_id, segment)
+
+    def _writable(self, segment: _Segment) -> _Segment:
+        """Give `segment` a descriptor, closing the least recently written
+        segment's if that would exceed `max_open_files`."""
+        if segment.fd is not None:
+            self._open.move_to_end(segment.path)
+            return segment
+        segment.fd = os.open(segment.path, _REOPEN_FLAGS)
+        self._track(segment)
+        return segment
+
+    def _track(self, segment: _Segment) -> None:
+        self._open[segment.path] = segment
+        while len(self._open) > self._max_open_files:
+            _, idle = self._open.popitem(last=False)
+            _close(idle)
+
+    def _release(self, segment: _Segment) -> None:
+        self._open.pop(segment.path, None)
+        _close(segment)
+
+    def _sync_directory(self) -> None:
+        # Makes a new segment's directory entry durable; not possible on
+        # every platform.
+        with suppress(OSError):
+            fd = os.open(self._directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _schedule_expiry(self, stream_id: str, segment: _Segment) -> None:
+        heapq.heappush(
+            self._expiry,
+            (segment.expires_at, next(self._expiry_order), stream_id, segment),
+        )
+
+    def _remove(self, stream_id: str, segment: _Segment) -> None:
+        del self._streams[stream_id]
+        self._release(segment)
+        if segment.expiry_timer is not None:
+            segment.expiry_timer.cancel()
+            segment.expiry_timer = None
+        # Readers with the file open keep reading it where unlinking an
+        # open file is allowed.
+        with suppress(OSError):
+            os.remove(segment.path)
+
+    def _evict(self, stream_id: str, segment: _Segment) -> None:
+        self._remove(stream_id, segment)
+        if segment.final is None:
+            segment.final = _FinalizeMarker(kind="error", error="Stream expired")
+        self._notify(segment)
+
+    def _evict_expired(self) -> None:
+        t = self._now()
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= t:
+            _, _, stream_id, segment = heapq.heappop(expiry)
+            if self._streams.get(stream_id) is not segment:
+                continue
+            if segment.expires_at > t:
+                self._schedule_expiry(stream_id, segment)
+                continue
+            self._evict(stream_id, segment)
+
+    def _live_segment(self, stream_id: str) -> _Segment | None:
+        segment = self._streams.get(stream_id)
+        if segment is not None and segment.expires_at <= self._now():
+            self._evict(stream_id, segment)
+            return None
+        return segment
+
+    def _watch_expiry(self, stream_id: str, segment: _Segment) -> None:
+        """Arm the stream's expiry timer, which evicts it, waking its
+        tailing readers, if its TTL runs out without a write. One timer
+        serves every reader of the stream."""
+        if segment.expiry_timer is None:
+            segment.expiry_timer = asyncio.get_running_loop().call_later(
+                max(segment.expires_at - self._now(), 0) / 1000.0,
+                self._on_expiry_timer,
+                stream_id,
+                segment,
+            )
+
+    def _on_expiry_timer(self, stream_id: str, segment: _Segment) -> None:
+        segment.expiry_timer = None
+        if self._streams.get(stream_id) is not segment or segment.final is not None:
+            return
+        if self._live_segment(stream_id) is not None and segment.update is not None:
+            # Written to since the timer was armed; wait out the new TTL.
+            self._watch_expiry(stream_id, segment)
+
+    def _notify(self, segment: _Segment) -> None:
+        update = segment.update
+        if update is not None:
+            segment.update = None
+            _wake(update)
+
+    def _require_active(self, stream_id: str) -> _Segment:
+        segment = self._live_segment(stream_id)
+        if segment is None:
+            raise RuntimeError(f"Stream not found: {stream_id}")
+        if segment.final is not None:
+            raise ResumableStreamError(
+                "finalized",
+                f"Stream already finalized: {stream_id}",
+            )
+        return segment
+
+    async def acquire(
+        self, stream_id: str, *, ttl_ms: int | None = None
+    ) -> ResumableStreamRole:
+        validate_stream_id(stream_id)
+        self._evict_expired()
+        if stream_id in self._streams:
+            return "consumer"
+
+        resolved_ttl = ttl_ms if ttl_ms is not None else self._default_ttl_ms
+        segment = _Segment(
+            path=self._path(stream_id),
+            expires_at=self._now() + resolved_ttl,
+            ttl_ms=resolved_ttl,
+        )
+        segment.fd = os.open(segment.path, _OPEN_FLAGS, 0o644)
+        try:
+            _write(
+                segment,
+                _MAGIC
+                + _record(b"M", _TTL.pack(resolved_ttl) + stream_id.encode("utf-8")),
+            )
+        except OSError:
+            _close(segment)
+            raise
+        self._track(segment)
+        self._streams[stream_id] = segment
+        self._schedule_expiry(stream_id, segment)
+        if self._fsync != "never":
+            self._sync_directory()
+        return "producer"
+
+    async def append(self, stream_id: str, chunk: bytes) -> None:
+        validate_stream_id(stream_id)
+        limit = _MAX_RECORD_BYTES
+        if self._max_chunk_bytes is not None:
+            limit = min(limit, self._max_chunk_bytes)
+        if len(chunk) > limit:
+            raise RuntimeError(f"Chunk exceeds maxChunkBytes: {len(chunk)}")
+        segment = self._require_active(stream_id)
+        start = segment.size + _RECORD.size
+        _write(self._writable(segment), _record(b"C", chunk))
+        segment.starts.append(start)
+        segment.ends.append(segment.size)
+        segment.expires_at = self._now() + segment.ttl_ms
+        if self._fsync == "always":
+            await _fsync(segment)
+        self._notify(segment)
+
+    async def finalize(
+        self,
+        stream_id: str,
+        status: Literal["done", "error"],
+        error: str | None = None,
+    ) -> None:
+        validate_stream_id(stream_id)
+        segment = self._live_segment(stream_id)
+        if segment is None:
+            raise RuntimeError(f"Stream not found: {stream_id}")
+        if segment.final is not None:
+            return
+        if status == "done":
+            final = _FinalizeMarker(kind="done")
+            _write(self._writable(segment), _record(b"D", b""))
+        else:
+            final = _FinalizeMarker(
+                kind="error", error=error if error is not None else "Stream errored"
+            )
+            record = _record(b"E", final.error.encode("utf-8"))
+            _write(self._writable(segment), record)
+        segment.final = final
+        segment.expires_at = self._now() + segment.ttl_ms
+        try:
+            if self._fsync != "never":
+                await _fsync(segment)
+        finally:
+            self._release(segment)
+            self._notify(segment)
+
+    async def read(
+        self, stream_id: str, cursor: str, signal: CancellationSignal
+    ) -> AsyncIterator[ResumableStreamEntry]:
+        validate_stream_id(stream_id)
+        segment = self._live_segment(stream_id)
+        if segment is None:
+            raise RuntimeError(f"Stream not found: {stream_id}")
+
+        idx = min(max(_seq_from_cursor(cursor), 0), len(segment.ends))
+        # Opened before any await, so a delete cannot unlink it first. The
+        # chunks already written are caught up through one memory map;
+        # chunks appended while tailing are read with a positioned read
+        # each instead of remapping the grown file.
+        file = open(segment.path, "rb", buffering=0)
+        view: mmap.mmap | None = None
+        mapped = 0
+        signalled: asyncio.Future[Any] | None = None
+
+        try:
+            if idx < len(segment.ends):
+                view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                mapped = len(view)
+            while True:
+                if signal.is_set():
+                    return
+
+                while idx < len(segment.ends):
+                    if signal.is_set():
+                        return
+                    start = segment.starts[idx]
+                    end = segment.ends[idx]
+                    if end <= mapped:
+                        chunk = view[start:end]
+                    else:
+                        chunk = _pread(file, start, end - start)
+                    yield ResumableStreamEntry(
+                        cursor=_cursor_of(idx + 1), chunk=chunk
+                    )
+                    idx += 1
+
+                if segment.final is not None:
+                    if segment.final.kind == "error":
+                        raise RuntimeError(segment.final.error or "Stream errored")
+                    return
+
+                if signalled is None:
+                    signalled = asyncio.ensure_future(signal.wait())
+                self._watch_expiry(stream_id, segment)
+                await _wait_for_update(segment, signalled)
+                if self._streams.get(stream_id) is segment:
+                    self._live_segment(stream_id)
+        finally:
+            if signalled is not None:
+                signalled.cancel()
+            if view is not None:
+                view.close()
+            file.close()
+
+    async def status(self, stream_id: str) -> ResumableStreamStatus:
+        validate_stream_id(stream_id)
+        segment = self._live_segment(stream_id)
+        if segment is None:
+            return "missing"
+        if segment.final is None:
+            return "streaming"
+        return "error" if segment.final.kind == "error" else "done"
+
+    async def delete(self, stream_id: str) -> None:
+        validate_stream_id(stream_id)
+        segment = self._streams.get(stream_id)
+        if segment is None:
+            return
+        self._remove(stream_id, segment)
+        if segment.final is None:
+            segment.final = _FinalizeMarker(kind="done")
+        self._notify(segment)
+
+    def dispose(self) -> None:
+        """Close the segments still being written, leaving them on disk for
+        the next store on this directory to recover."""
+        for segment in self._open.values():
+            _close(segment)
+        self._open.clear()
+
+
+def create_file_resumable_stream_store(
+    directory: str | os.PathLike[str],
+    *,
+    default_ttl_ms: int = DEFAULT_TTL_MS,
+    now: Callable[[], float] | None = None,
+    fsync: FsyncPolicy = "finalize",
+    max_chunk_bytes: int | None = None,
+    max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+) -> _FileResumableStreamStore:
+    """
+    Keeps each stream in an append-only segment file under `directory`,
+    for single-node deployments whose streams should survive a restart.
+    Only one store may use a directory at a time. Creating the store scans
+    the existing segments, rebuilding their indexes, deleting expired ones,
+    and finalizing streams left streaming by a crash as errors.
+
+    `fsync="always"` syncs every append to disk, "finalize" syncs a stream
+    once it is finalized, and "never" leaves writeback to the OS. Readers
+    catch up through a memory map of the segment, are woken in-process as
+    it grows, and read each new chunk with a positioned read. TTLs refresh
+    on every write; after a restart they count from the segment's
+    modification time, so `now` must be wall-clock ms.
+
+    Appends go to the page cache from the event loop; only fsyncs run in a
+    thread. Streaming segments keep a descriptor open between writes, at
+    most `max_open_files` of them; the least recently written is closed and
+    reopened on its next write. Each active `read` holds one more
+    descriptor until it returns, so size `ulimit -n` for the readers too.
+    """
+    if fsync not in ("always", "finalize", "never"):
+        raise ValueError(
+            f"fsync must be 'always', 'finalize' or 'never', got {fsync!r}"
+        )
+    if not isinstance(max_open_files, int) or max_open_files <= 0:
+        raise ValueError(
+            f"max_open_files must be a positive integer, got {max_open_files!r}"
+        )
+    return _FileResumableStreamStore(
+        directory=os.fspath(directory),
+        default_ttl_ms=default_ttl_ms,
+        now=now if now is not None else (lambda: time.time() * 1000),
+        fsync=fsync,
+        max_chunk_bytes=max_chunk_bytes,
+        max_open_files=max_open_files,
+    )
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
 import time
+from array import array
+from collections import OrderedDict
 from collections.abc import AsyncIterator, Callable
-from contextlib import suppress
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Any, Literal
 
 from assistant_stream.resumable.errors import (
     DEFAULT_TTL_MS,
     ResumableStreamError,
     validate_stream_id,
 )
+from assistant_stream.resumable.stores._common import (
+    _cursor_of,
+    _FinalizeMarker,
+    _seq_from_cursor,
+    _wait_for_update,
+    _wake,
+)
 from assistant_stream.resumable.types import (
     CancellationSignal,
     ResumableStreamEntry,
@@ -20,41 +30,42 @@ from assistant_stream.resumable.types import (
 )
 
 
-@dataclass
-class _FinalizeMarker:
-    kind: Literal["done", "error"]
-    error: str | None = None
-
-
-@dataclass
+@dataclass(slots=True)
 class _StreamState:
-    entries: list[ResumableStreamEntry] = field(default_factory=list)
-    next_seq: int = 1
+    # Chunks are stored back to back in `data`; chunk i, whose cursor is
+    # sequence number i + 1, ends at `ends[i]`. Offsets are 32-bit until a
+    # stream outgrows them. Finalizing trims both to their exact size, with
+    # `data` becoming immutable bytes.
+    data: bytearray | bytes = field(default_factory=bytearray)
+    ends: array[int] = field(default_factory=lambda: array("I"))
     expires_at: float = 0.0
     ttl_ms: int = 0
     final: _FinalizeMarker | None = None
-    waiters: list[asyncio.Event] = field(default_factory=list)
-
-
-def _cursor_of(seq: int) -> str:
-    if seq == 0:
-        return "0"
-    alphabet = "0123456789abcdefghijklmnopqrstuvwxyz"
-    n = seq
-    chars: list[str] = []
-    while n:
-        n, rem = divmod(n, 36)
-        chars.append(alphabet[rem])
-    return "".join(reversed(chars))
-
-
-def _seq_from_cursor(cursor: str) -> int:
-    if cursor == "":
-        return 0
-    try:
-        return int(cursor, 36)
-    except ValueError:
-        return 0
+    # Resolved, and replaced on the next wait, whenever the stream changes;
+    # every tailing reader waits on the same future.
+    update: asyncio.Future[None] | None = None
+    # The entry built last, shared by tailing readers that all want the
+    # newest chunk.
+    last_entry: ResumableStreamEntry | None = None
+    last_index: int = -1
+    # Wakes tailing readers if the stream expires; see `_watch_expiry`.
+    expiry_timer: asyncio.TimerHandle | None = None
+
+
+_MAX_NARROW_OFFSET = 2**32 - 1
+
+
+def _entry_at(state: _StreamState, index: int) -> ResumableStreamEntry:
+    if state.last_index == index and state.last_entry is not None:
+        return state.last_entry
+    start = state.ends[index - 1] if index else 0
+    entry = ResumableStreamEntry(
+        cursor=_cursor_of(index + 1),
+        chunk=bytes(state.data[start : state.ends[index]]),
+    )
+    state.last_entry = entry
+    state.last_index = index
+    return entry
 
 
 class _InMemoryResumableStreamStore:
@@ -67,8 +78,19 @@ class _InMemoryResumableStreamStore:
         max_entries_per_stream: int | None,
         max_streams: int | None,
         gc_interval_ms: int | None,
+        max_total_bytes: int | None = None,
     ) -> None:
         self._streams: dict[str, _StreamState] = {}
+        # Streams by last use, oldest first, for max_total_bytes eviction.
+        self._streaming_lru: OrderedDict[str, _StreamState] = OrderedDict()
+        self._finalized_lru: OrderedDict[str, _StreamState] = OrderedDict()
+        self._total_bytes = 0
+        self._max_total_bytes = max_total_bytes
+        # Min-heap of (expires_at, order, stream_id, state). Refreshing a
+        # TTL only moves state.expires_at later; a stale heap entry is
+        # rescheduled when it surfaces, so appends never touch the heap.
+        self._expiry: list[tuple[float, int, str, _StreamState]] = []
+        self._expiry_order = itertools.count()
         self._default_ttl_ms = default_ttl_ms
         self._now = now
         self._max_chunk_bytes = max_chunk_bytes
@@ -99,74 +121,106 @@ class _InMemoryResumableStreamStore:
 
         self._gc_task = loop.create_task(_gc_loop())
 
+    def _schedule_expiry(self, stream_id: str, state: _StreamState) -> None:
+        heapq.heappush(
+            self._expiry,
+            (state.expires_at, next(self._expiry_order), stream_id, state),
+        )
+
+    def _remove(self, stream_id: str, state: _StreamState) -> None:
+        del self._streams[stream_id]
+        self._streaming_lru.pop(stream_id, None)
+        self._finalized_lru.pop(stream_id, None)
+        self._total_bytes -= len(state.data)
+        if state.expiry_timer is not None:
+            state.expiry_timer.cancel()
+            state.expiry_timer = None
+
+    def _touch(self, stream_id: str, state: _StreamState) -> None:
+        lru = self._streaming_lru if state.final is None else self._finalized_lru
+        lru[stream_id] = state
+        lru.move_to_end(stream_id)
+
+    def _evict(
+        self, stream_id: str, state: _StreamState, reason: str = "Stream expired"
+    ) -> None:
+        # Readers already holding the state keep replaying its entries.
+        self._remove(stream_id, state)
+        if state.final is None:
+            state.final = _FinalizeMarker(kind="error", error=reason)
+        self._notify(state)
+
+    def _make_room(self, size: int, stream_id: str, state: _StreamState) -> None:
+        """Evict least recently used streams, finalized ones first, until
+        `size` more bytes fit in max_total_bytes."""
+        limit = self._max_total_bytes
+        if limit is None or self._total_bytes + size <= limit:
+            return
+        if len(state.data) + size > limit:
+            raise RuntimeError(f"Stream exceeded maxTotalBytes: {stream_id}")
+        for lru in (self._finalized_lru, self._streaming_lru):
+            while self._total_bytes + size > limit and lru:
+                victim_id, victim = next(iter(lru.items()))
+                if victim is state:
+                    break
+                self._evict(victim_id, victim, "Stream evicted")
+
     def _evict_expired(self) -> None:
         t = self._now()
-        expired: list[tuple[str, _StreamState]] = []
-        for stream_id, state in self._streams.items():
-            if state.expires_at <= t:
-                expired.append((stream_id, state))
-        for stream_id, state in expired:
-            del self._streams[stream_id]
-            if state.final is None:
-                state.final = _FinalizeMarker(kind="error", error="Stream expired")
-            self._notify(state)
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= t:
+            _, _, stream_id, state = heapq.heappop(expiry)
+            if self._streams.get(stream_id) is not state:
+                # Deleted, or evicted when it was last accessed.
+                continue
+            if state.expires_at > t:
+                self._schedule_expiry(stream_id, state)
+                continue
+            self._evict(stream_id, state)
+
+    def _live_state(self, stream_id: str) -> _StreamState | None:
+        """The stream's state, evicting it first if its TTL has passed.
+        Only this stream is checked; expired streams elsewhere are left to
+        the next acquire or GC sweep."""
+        state = self._streams.get(stream_id)
+        if state is not None and state.expires_at <= self._now():
+            self._evict(stream_id, state)
+            return None
+        return state
 
-    def _notify(self, state: _StreamState) -> None:
-        waiters = state.waiters
-        state.waiters = []
-        for event in waiters:
-            event.set()
+    def _watch_expiry(self, stream_id: str, state: _StreamState) -> None:
+        """Arm the stream's expiry timer, which evicts it, waking its
+        tailing readers, if its TTL runs out without a write. One timer
+        serves every reader of the stream."""
+        if state.expiry_timer is None:
+            state.expiry_timer = asyncio.get_running_loop().call_later(
+                max(state.expires_at - self._now(), 0) / 1000.0,
+                self._on_expiry_timer,
+                stream_id,
+                state,
+            )
 
-    def _find_start_index(self, state: _StreamState, cursor: str) -> int:
-        if cursor == "":
-            return 0
-        after = _seq_from_cursor(cursor)
-        lo = 0
-        hi = len(state.entries)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            seq = _seq_from_cursor(state.entries[mid].cursor)
-            if seq <= after:
-                lo = mid + 1
-            else:
-                hi = mid
-        return lo
-
-    async def _wait_for_update(
-        self,
-        state: _StreamState,
-        signal: CancellationSignal,
-        wake_by: float | None,
-    ) -> None:
-        if signal.is_set():
-            return
-        if wake_by is not None and wake_by <= 0:
+    def _on_expiry_timer(self, stream_id: str, state: _StreamState) -> None:
+        state.expiry_timer = None
+        if self._streams.get(stream_id) is not state or state.final is not None:
             return
+        if self._live_state(stream_id) is not None and state.update is not None:
+            # Written to since the timer was armed; wait out the new TTL.
+            self._watch_expiry(stream_id, state)
 
-        event = asyncio.Event()
-        state.waiters.append(event)
-
-        notify_task = asyncio.create_task(event.wait())
-        signal_task = asyncio.create_task(signal.wait())
-        tasks: set[asyncio.Task[object]] = {notify_task, signal_task}
-        if wake_by is not None:
-            tasks.add(asyncio.create_task(asyncio.sleep(wake_by / 1000.0)))
+    def _notify(self, state: _StreamState) -> None:
+        update = state.update
+        if update is not None:
+            state.update = None
+            _wake(update)
 
-        try:
-            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-        finally:
-            for task in tasks:
-                if not task.done():
-                    task.cancel()
-            for task in tasks:
-                with suppress(asyncio.CancelledError):
-                    await task
-            with suppress(ValueError):
-                state.waiters.remove(event)
+    def _find_start_index(self, state: _StreamState, cursor: str) -> int:
+        # Chunk i has sequence number i + 1, so reading after `cursor`
+        # starts at the index equal to its sequence number.
+        return min(max(_seq_from_cursor(cursor), 0), len(state.ends))
 
     def _require_active(self, stream_id: str) -> _StreamState:
-        self._evict_expired()
-        state = self._streams.get(stream_id)
+        state = self._live_state(stream_id)
         if state is None:
             raise RuntimeError(f"Stream not found: {stream_id}")
         if state.final is not None:
@@ -189,14 +243,12 @@ class _InMemoryResumableStreamStore:
             raise RuntimeError("maxStreams exceeded")
 
         resolved_ttl = ttl_ms if ttl_ms is not None else self._default_ttl_ms
-        self._streams[stream_id] = _StreamState(
-            entries=[],
-            next_seq=1,
+        state = self._streams[stream_id] = _StreamState(
             expires_at=self._now() + resolved_ttl,
             ttl_ms=resolved_ttl,
-            final=None,
-            waiters=[],
         )
+        self._touch(stream_id, state)
+        self._schedule_expiry(stream_id, state)
         return "producer"
 
     async def append(self, stream_id: str, chunk: bytes) -> None:
@@ -210,12 +262,17 @@ class _InMemoryResumableStreamStore:
         state = self._require_active(stream_id)
         if (
             self._max_entries_per_stream is not None
-            and len(state.entries) >= self._max_entries_per_stream
+            and len(state.ends) >= self._max_entries_per_stream
         ):
             raise RuntimeError(f"Stream exceeded maxEntriesPerStream: {stream_id}")
-        seq = state.next_seq
-        state.next_seq += 1
-        state.entries.append(ResumableStreamEntry(cursor=_cursor_of(seq), chunk=chunk))
+        self._touch(stream_id, state)
+        self._make_room(len(chunk), stream_id, state)
+        state.data += chunk
+        end = len(state.data)
+        if end > _MAX_NARROW_OFFSET and state.ends.typecode == "I":
+            state.ends = array("Q", state.ends)
+        state.ends.append(end)
+        self._total_bytes += len(chunk)
         state.expires_at = self._now() + state.ttl_ms
         self._notify(state)
 
@@ -227,8 +284,7 @@ class _InMemoryResumableStreamStore:
     ) -> None:
         self._ensure_gc()
         validate_stream_id(stream_id)
-        self._evict_expired()
-        state = self._streams.get(stream_id)
+        state = self._live_state(stream_id)
         if state is None:
             raise RuntimeError(f"Stream not found: {stream_id}")
         if state.final is not None:
@@ -239,6 +295,10 @@ class _InMemoryResumableStreamStore:
             state.final = _FinalizeMarker(
                 kind="error", error=error if error is not None else "Stream errored"
             )
+        self._streaming_lru.pop(stream_id, None)
+        self._touch(stream_id, state)
+        state.data = bytes(state.data)
+        state.ends = array(state.ends.typecode, state.ends)
         state.expires_at = self._now() + state.ttl_ms
         self._notify(state)
 
@@ -247,37 +307,45 @@ class _InMemoryResumableStreamStore:
     ) -> AsyncIterator[ResumableStreamEntry]:
         self._ensure_gc()
         validate_stream_id(stream_id)
-        self._evict_expired()
-        state = self._streams.get(stream_id)
+        state = self._live_state(stream_id)
         if state is None:
             raise RuntimeError(f"Stream not found: {stream_id}")
 
+        self._touch(stream_id, state)
         idx = self._find_start_index(state, cursor)
+        # Watches the signal for the whole read, so waits need no tasks.
+        signalled: asyncio.Future[Any] | None = None
 
-        while True:
-            if signal.is_set():
-                return
-
-            while idx < len(state.entries):
+        try:
+            while True:
                 if signal.is_set():
                     return
-                yield state.entries[idx]
-                idx += 1
 
-            if state.final is not None:
-                if state.final.kind == "error":
-                    raise RuntimeError(state.final.error or "Stream errored")
-                return
+                while idx < len(state.ends):
+                    if signal.is_set():
+                        return
+                    yield _entry_at(state, idx)
+                    idx += 1
 
-            wake_by = state.expires_at - self._now()
-            await self._wait_for_update(state, signal, wake_by)
-            self._evict_expired()
+                if state.final is not None:
+                    if state.final.kind == "error":
+                        raise RuntimeError(state.final.error or "Stream errored")
+                    return
+
+                if signalled is None:
+                    signalled = asyncio.ensure_future(signal.wait())
+                self._watch_expiry(stream_id, state)
+                await _wait_for_update(state, signalled)
+                if self._streams.get(stream_id) is state:
+                    self._live_state(stream_id)
+        finally:
+            if signalled is not None:
+                signalled.cancel()
 
     async def status(self, stream_id: str) -> ResumableStreamStatus:
         self._ensure_gc()
         validate_stream_id(stream_id)
-        self._evict_expired()
-        state = self._streams.get(stream_id)
+        state = self._live_state(stream_id)
         if state is None:
             return "missing"
         if state.final is None:
@@ -290,7 +358,7 @@ class _InMemoryResumableStreamStore:
         state = self._streams.get(stream_id)
         if state is None:
             return
-        del self._streams[stream_id]
+        self._remove(stream_id, state)
         if state.final is None:
             state.final = _FinalizeMarker(kind="done")
         self._notify(state)
@@ -310,7 +378,15 @@ def create_in_memory_resumable_stream_store(
     max_entries_per_stream: int | None = None,
     max_streams: int | None = None,
     gc_interval_ms: int | None = None,
+    max_total_bytes: int | None = None,
 ) -> _InMemoryResumableStreamStore:
+    """
+    Chunks of each stream are kept in one contiguous buffer. With
+    `max_total_bytes`, an append that would take the store past it first
+    evicts the least recently used finalized streams, then the least
+    recently used streaming ones, whose readers fail with "Stream evicted".
+    A stream that alone would exceed the budget fails its append.
+    """
     return _InMemoryResumableStreamStore(
         default_ttl_ms=default_ttl_ms,
         now=now if now is not None else (lambda: time.time() * 1000),
@@ -318,4 +394,5 @@ def create_in_memory_resumable_stream_store(
         max_entries_per_stream=max_entries_per_stream,
         max_streams=max_streams,
         gc_interval_ms=gc_interval_ms,
+        max_total_bytes=max_total_bytes,
     )
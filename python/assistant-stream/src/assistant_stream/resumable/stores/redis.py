@@ -5,6 +5,7 @@ import json
 import math
 from collections.abc import AsyncIterator
 from contextlib import suppress
+from dataclasses import dataclass
 from typing import Any, Literal, Protocol
 
 from assistant_stream.resumable.errors import (
@@ -20,6 +21,8 @@ from assistant_stream.resumable.types import (
 )
 
 DEFAULT_POLL_INTERVAL_MS = 100
+DEFAULT_BLOCK_MS = 5000
+DEFAULT_READ_COUNT = 100
 DEFAULT_KEY_PREFIX = "aui:resumable"
 
 FIELD_CHUNK = "c"
@@ -48,6 +51,109 @@ class RedisLikeClient(Protocol):
     async def pipeline(self, commands: list[dict[str, Any]]) -> None: ...
 
 
+class BlockingRedisLikeClient(RedisLikeClient, Protocol):
+    """A client that can wait for stream entries server-side. Readers use
+    XREAD instead of polling XRANGE when the client has `xread`."""
+
+    async def xread(
+        self, key: str, last_id: str, count: int, block_ms: int | None
+    ) -> list[dict[str, Any]]:
+        """Up to `count` entries after `last_id`. With `block_ms`, wait that
+        long for one to arrive and return [] on timeout."""
+        ...
+
+
+@dataclass(frozen=True)
+class RedisScript:
+    """A Lua script the store runs atomically on the server. Both keys a
+    script touches share the stream's hash tag, so scripts also run on a
+    cluster."""
+
+    name: str
+    source: str
+
+
+class ScriptingRedisLikeClient(RedisLikeClient, Protocol):
+    """A client that can run the store's scripts. Acquire, append and
+    finalize then take one round trip each."""
+
+    async def run_script(
+        self, script: RedisScript, keys: list[str], args: list[str | bytes | int]
+    ) -> Any:
+        """Run `script` with EVALSHA, loading it first if the server does
+        not have it cached."""
+        ...
+
+
+class CombiningRedisLikeClient(ScriptingRedisLikeClient, Protocol):
+    """A client that can send many script calls in one pipeline, which the
+    store's write combiner needs."""
+
+    async def run_scripts(
+        self, calls: list[tuple[RedisScript, list[str], list[str | bytes | int]]]
+    ) -> list[Any]:
+        """Run `calls` in one non-transactional pipeline and return their
+        results in order, with an exception in place of a failed call."""
+        ...
+
+
+# The scripts read and write the same fields as the pipelined commands
+# they replace: meta is JSON with "status" and "ttlSec", and stream entries
+# carry "c" for a chunk or "fin" (and "error") when finalized. Key TTLs are
+# refreshed only once they have run down to half the stream's TTL, so most
+# appends are a GET, a PTTL and an XADD on the server.
+ACQUIRE_SCRIPT = RedisScript(
+    "acquire",
+    """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+  redis.call('DEL', KEYS[2])
+  return 1
+end
+return 0
+""",
+)
+
+APPEND_SCRIPT = RedisScript(
+    "append",
+    """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 'missing' end
+local ok, meta = pcall(cjson.decode, raw)
+if not ok or type(meta) ~= 'table' then return 'missing' end
+if meta['status'] ~= 'streaming' then return 'finalized' end
+local ttl = tonumber(meta['ttlSec']) or tonumber(ARGV[2])
+redis.call('XADD', KEYS[2], '*', 'c', ARGV[1])
+if redis.call('PTTL', KEYS[2]) < ttl * 500 then
+  redis.call('EXPIRE', KEYS[2], ttl)
+  redis.call('EXPIRE', KEYS[1], ttl)
+end
+return 'ok'
+""",
+)
+
+FINALIZE_SCRIPT = RedisScript(
+    "finalize",
+    """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 'missing' end
+local ok, meta = pcall(cjson.decode, raw)
+if not ok or type(meta) ~= 'table' then return 'missing' end
+if meta['status'] ~= 'streaming' then return 'ok' end
+local ttl = tonumber(meta['ttlSec']) or tonumber(ARGV[3])
+local final = {status = ARGV[1], ttlSec = ttl}
+if ARGV[1] == 'error' then
+  final['error'] = ARGV[2]
+  redis.call('XADD', KEYS[2], '*', 'fin', 'error', 'error', ARGV[2])
+else
+  redis.call('XADD', KEYS[2], '*', 'fin', 'done')
+end
+redis.call('SET', KEYS[1], cjson.encode(final), 'EX', ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+return 'ok'
+""",
+)
+
+
 class RedisResumableStreamStore:
     def __init__(
         self,
@@ -57,12 +163,51 @@ class RedisResumableStreamStore:
         default_ttl_ms: int = DEFAULT_TTL_MS,
         poll_interval_ms: int = DEFAULT_POLL_INTERVAL_MS,
         max_chunk_bytes: int | None = None,
+        block_ms: int = DEFAULT_BLOCK_MS,
+        read_count: int = DEFAULT_READ_COUNT,
+        scripts: bool = True,
+        combine_ms: int | None = None,
     ) -> None:
+        """
+        Readers page through a stream `read_count` entries at a time. With a
+        BlockingRedisLikeClient they then tail it with XREAD BLOCK, checking
+        that the stream still exists every `block_ms`; other clients poll
+        XRANGE every `poll_interval_ms`.
+
+        With a ScriptingRedisLikeClient, acquire, append and finalize run as
+        Lua scripts in one round trip each. Pass `scripts=False` where the
+        server does not allow scripting.
+
+        With `combine_ms` and a CombiningRedisLikeClient, appends from all
+        streams made within `combine_ms` of each other share one pipeline;
+        0 combines appends made in the same event loop iteration.
+        """
+        if block_ms <= 0:
+            raise ValueError(f"block_ms must be positive, got {block_ms!r}")
+        if read_count <= 0:
+            raise ValueError(f"read_count must be positive, got {read_count!r}")
         self._client = client
         self._key_prefix = key_prefix
         self._default_ttl_ms = default_ttl_ms
         self._poll_interval_ms = poll_interval_ms
         self._max_chunk_bytes = max_chunk_bytes
+        self._block_ms = block_ms
+        self._read_count = read_count
+        self._run_script = (
+            getattr(client, "run_script", None) if scripts else None
+        )
+        self._combiner: _WriteCombiner | None = None
+        if combine_ms is not None:
+            if combine_ms < 0:
+                raise ValueError(
+                    f"combine_ms must be non-negative, got {combine_ms!r}"
+                )
+            run_scripts = getattr(client, "run_scripts", None)
+            if run_scripts is None or self._run_script is None:
+                raise ValueError(
+                    "combine_ms needs a client with run_scripts and scripts enabled"
+                )
+            self._combiner = _WriteCombiner(run_scripts, combine_ms / 1000)
 
     def _meta_key(self, stream_id: str) -> str:
         return f"{self._key_prefix}:{{{stream_id}}}:meta"
@@ -82,6 +227,13 @@ class RedisResumableStreamStore:
         validate_stream_id(stream_id)
         ttl_sec = _ms_to_sec(ttl_ms if ttl_ms is not None else self._default_ttl_ms)
         meta = json.dumps({"status": "streaming", "ttlSec": ttl_sec})
+        if self._run_script is not None:
+            acquired = await self._run_script(
+                ACQUIRE_SCRIPT,
+                [self._meta_key(stream_id), self._data_key(stream_id)],
+                [meta, ttl_sec],
+            )
+            return "producer" if acquired else "consumer"
         acquired = await self._client.set_nx(self._meta_key(stream_id), meta, ttl_sec)
         if acquired:
             await self._client.delete([self._data_key(stream_id)])
@@ -99,6 +251,22 @@ class RedisResumableStreamStore:
             )
         data_key = self._data_key(stream_id)
         meta_key = self._meta_key(stream_id)
+        if self._run_script is not None:
+            run = self._combiner.run if self._combiner else self._run_script
+            result = await run(
+                APPEND_SCRIPT,
+                [meta_key, data_key],
+                [chunk, _ms_to_sec(self._default_ttl_ms)],
+            )
+            result = _read_string(result)
+            if result == "missing":
+                raise RuntimeError(f"Stream not found: {stream_id}")
+            if result == "finalized":
+                raise ResumableStreamError(
+                    "finalized",
+                    f"Stream already finalized: {stream_id}",
+                )
+            return
         meta = await self._read_meta(stream_id)
         if meta is None:
             raise RuntimeError(f"Stream not found: {stream_id}")
@@ -127,6 +295,19 @@ class RedisResumableStreamStore:
         validate_stream_id(stream_id)
         data_key = self._data_key(stream_id)
         meta_key = self._meta_key(stream_id)
+        if self._run_script is not None:
+            result = await self._run_script(
+                FINALIZE_SCRIPT,
+                [meta_key, data_key],
+                [
+                    status,
+                    error if error is not None else "Stream errored",
+                    _ms_to_sec(self._default_ttl_ms),
+                ],
+            )
+            if _read_string(result) == "missing":
+                raise RuntimeError(f"Stream not found: {stream_id}")
+            return
         existing = await self._read_meta(stream_id)
         if existing is None:
             raise RuntimeError(f"Stream not found: {stream_id}")
@@ -169,41 +350,92 @@ class RedisResumableStreamStore:
             raise RuntimeError(f"Stream not found: {stream_id}")
 
         last_id = STREAM_START_ID if cursor == "" else cursor
-
-        while True:
-            if signal.is_set():
-                return
-
-            start = "-" if last_id == STREAM_START_ID else f"({last_id}"
-            entries = await self._client.xrange(data_key, start, "+")
-
-            for entry in entries:
-                if signal.is_set():
-                    return
-                entry_id = entry["id"]
-                fields = entry["fields"]
-                last_id = entry_id
-
-                fin = _read_string(fields.get(FIELD_FIN))
-                if fin == FIN_DONE:
-                    return
-                if fin == FIN_ERROR:
-                    raise RuntimeError(
-                        _read_string(fields.get(FIELD_ERROR)) or "Stream errored"
+        xread = getattr(self._client, "xread", None)
+        if xread is None:
+            pages = self._poll_pages(data_key, meta_key, last_id, signal)
+        else:
+            pages = self._blocking_pages(xread, data_key, meta_key, last_id, signal)
+
+        try:
+            async for entries in pages:
+                for entry in entries:
+                    if signal.is_set():
+                        return
+                    entry_id = entry["id"]
+                    fields = entry["fields"]
+
+                    fin = _read_string(fields.get(FIELD_FIN))
+                    if fin == FIN_DONE:
+                        return
+                    if fin == FIN_ERROR:
+                        raise RuntimeError(
+                            _read_string(fields.get(FIELD_ERROR)) or "Stream errored"
+                        )
+
+                    raw = fields.get(FIELD_CHUNK)
+                    if raw is None:
+                        continue
+                    yield ResumableStreamEntry(cursor=entry_id, chunk=_to_bytes(raw))
+        finally:
+            await pages.aclose()
+
+    async def _blocking_pages(
+        self,
+        xread: Any,
+        data_key: str,
+        meta_key: str,
+        last_id: str,
+        signal: CancellationSignal,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        # Catch up in full pages without blocking; block only once a page
+        # comes back short, i.e. the reader is at the tail. One waiter on
+        # the signal serves every blocking read of this reader.
+        block_ms: int | None = None
+        signalled: asyncio.Future[Any] | None = None
+        try:
+            while not signal.is_set():
+                if block_ms is None:
+                    entries = await xread(data_key, last_id, self._read_count, None)
+                else:
+                    if signalled is None:
+                        signalled = asyncio.ensure_future(signal.wait())
+                    entries = await _unless_signalled(
+                        xread(data_key, last_id, self._read_count, block_ms),
+                        signalled,
                     )
-
-                raw = fields.get(FIELD_CHUNK)
-                if raw is None:
+                    if entries is None:
+                        return
+                if entries:
+                    last_id = entries[-1]["id"]
+                    yield entries
+                    if len(entries) >= self._read_count:
+                        block_ms = None
+                    else:
+                        block_ms = self._block_ms
                     continue
-                yield ResumableStreamEntry(cursor=entry_id, chunk=_to_bytes(raw))
+                if not await self._client.exists(meta_key):
+                    return
+                block_ms = self._block_ms
+        finally:
+            if signalled is not None:
+                signalled.cancel()
 
-            if len(entries) > 0:
+    async def _poll_pages(
+        self,
+        data_key: str,
+        meta_key: str,
+        last_id: str,
+        signal: CancellationSignal,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        while not signal.is_set():
+            start = "-" if last_id == STREAM_START_ID else f"({last_id}"
+            entries = await self._client.xrange(data_key, start, "+")
+            if entries:
+                last_id = entries[-1]["id"]
+                yield entries
                 continue
-
-            still_exists = await self._client.exists(meta_key)
-            if not still_exists:
+            if not await self._client.exists(meta_key):
                 return
-
             await _sleep(self._poll_interval_ms, signal)
 
     async def status(self, stream_id: str) -> ResumableStreamStatus:
@@ -230,6 +462,68 @@ class RedisResumableStreamStore:
         )
 
 
+# Upper bound on the calls in one combined pipeline; a full batch is sent
+# without waiting for the window to end.
+_MAX_COMBINED_CALLS = 1000
+
+
+class _WriteCombiner:
+    """Sends the script calls made by every stream within one window as a
+    single pipeline, and resolves each caller with its own result."""
+
+    def __init__(self, run_scripts: Any, window: float) -> None:
+        self._run_scripts = run_scripts
+        self._window = window
+        self._calls: list[tuple[RedisScript, list[str], list[Any]]] = []
+        self._futures: list[asyncio.Future[Any]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task[None]] = set()
+
+    async def run(
+        self, script: RedisScript, keys: list[str], args: list[Any]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._calls.append((script, keys, args))
+        self._futures.append(future)
+        if len(self._calls) >= _MAX_COMBINED_CALLS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        calls, futures = self._calls, self._futures
+        self._calls, self._futures = [], []
+        task = asyncio.get_running_loop().create_task(self._send(calls, futures))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(
+        self,
+        calls: list[tuple[RedisScript, list[str], list[Any]]],
+        futures: list[asyncio.Future[Any]],
+    ) -> None:
+        try:
+            results = await self._run_scripts(calls)
+        except Exception as err:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for future, result in zip(futures, results):
+            # A caller cancelled while waiting has already given up.
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 def _ms_to_sec(ms: int) -> int:
     return max(1, math.ceil(ms / 1000))
 
@@ -251,6 +545,24 @@ async def _sleep(ms: int, signal: CancellationSignal) -> None:
         await asyncio.wait_for(signal.wait(), timeout=ms / 1000.0)
 
 
+async def _unless_signalled(
+    awaitable: Any, signalled: asyncio.Future[Any]
+) -> Any:
+    """Await `awaitable`, or cancel it and return None once `signalled` is
+    done. `signalled` itself is left for the caller to cancel."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        await asyncio.wait({task, signalled}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not task.done():
+            task.cancel()
+    if not task.cancelled() and task.done():
+        return task.result()
+    with suppress(asyncio.CancelledError):
+        await task
+    return None
+
+
 def _read_string(value: str | bytes | None) -> str | None:
     if value is None:
         return None
@@ -265,9 +577,24 @@ def _to_bytes(value: str | bytes) -> bytes:
     return value.encode("utf-8")
 
 
+def _parse_entries(reply: Any) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for entry_id, fields in reply:
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode("utf-8")
+        parsed_fields: dict[str, str | bytes] = {}
+        for field_key, field_value in fields.items():
+            if isinstance(field_key, bytes):
+                field_key = field_key.decode("utf-8")
+            parsed_fields[field_key] = field_value
+        out.append({"id": entry_id, "fields": parsed_fields})
+    return out
+
+
 class _RedisAsyncioAdapter:
     def __init__(self, client: Any) -> None:
         self._client = client
+        self._scripts: dict[str, Any] = {}
 
     async def set_nx(self, key: str, value: str, ttl_sec: int) -> bool:
         result = await self._client.set(key, value, nx=True, ex=ttl_sec)
@@ -294,17 +621,59 @@ class _RedisAsyncioAdapter:
         self, key: str, start: str, end: str
     ) -> list[dict[str, Any]]:
         reply = await self._client.xrange(key, min=start, max=end)
-        out: list[dict[str, Any]] = []
-        for entry_id, fields in reply:
-            if isinstance(entry_id, bytes):
-                entry_id = entry_id.decode("utf-8")
-            parsed_fields: dict[str, str | bytes] = {}
-            for field_key, field_value in fields.items():
-                if isinstance(field_key, bytes):
-                    field_key = field_key.decode("utf-8")
-                parsed_fields[field_key] = field_value
-            out.append({"id": entry_id, "fields": parsed_fields})
-        return out
+        return _parse_entries(reply)
+
+    async def xread(
+        self, key: str, last_id: str, count: int, block_ms: int | None
+    ) -> list[dict[str, Any]]:
+        reply = await self._client.xread({key: last_id}, count=count, block=block_ms)
+        if not reply:
+            return []
+        # RESP2 replies [[key, entries]]; RESP3 replies {key: [entries]}.
+        if isinstance(reply, dict):
+            streams = list(reply.values())
+            entries = streams[0][0] if streams and streams[0] else []
+        else:
+            entries = reply[0][1]
+        return _parse_entries(entries)
+
+    async def run_script(
+        self, script: RedisScript, keys: list[str], args: list[str | bytes | int]
+    ) -> Any:
+        # redis-py's registered scripts call EVALSHA and load the script on
+        # NOSCRIPT, so each script is sent in full once per server.
+        return await self._registered(script)(keys=keys, args=args)
+
+    async def run_scripts(
+        self, calls: list[tuple[RedisScript, list[str], list[str | bytes | int]]]
+    ) -> list[Any]:
+        from redis.exceptions import NoScriptError
+
+        # Without a transaction, a cluster client routes each call to the
+        # node owning its keys; every script's keys share one hash tag.
+        pipe = self._client.pipeline(transaction=False)
+        for script, keys, args in calls:
+            pipe.evalsha(self._registered(script).sha, len(keys), *keys, *args)
+        results = await pipe.execute(raise_on_error=False)
+        # A call that found its script missing did not run; the registered
+        # script loads it and runs the call again.
+        for index, result in enumerate(results):
+            if isinstance(result, NoScriptError):
+                script, keys, args = calls[index]
+                try:
+                    results[index] = await self._registered(script)(
+                        keys=keys, args=args
+                    )
+                except Exception as err:
+                    results[index] = err
+        return results
+
+    def _registered(self, script: RedisScript) -> Any:
+        registered = self._scripts.get(script.name)
+        if registered is None:
+            registered = self._client.register_script(script.source)
+            self._scripts[script.name] = registered
+        return registered
 
     async def pipeline(self, commands: list[dict[str, Any]]) -> None:
         if not commands:
@@ -328,8 +697,17 @@ def create_redis_resumable_stream_store(
     default_ttl_ms: int = DEFAULT_TTL_MS,
     poll_interval_ms: int = DEFAULT_POLL_INTERVAL_MS,
     max_chunk_bytes: int | None = None,
+    block_ms: int = DEFAULT_BLOCK_MS,
+    read_count: int = DEFAULT_READ_COUNT,
+    scripts: bool = True,
+    combine_ms: int | None = None,
 ) -> RedisResumableStreamStore:
-    """Create a store backed by a ``redis.asyncio.Redis`` client."""
+    """Create a store backed by a ``redis.asyncio.Redis`` client.
+
+    Tailing readers hold a connection in XREAD BLOCK, so size the client's
+    pool for the number of concurrent readers, and keep any socket timeout
+    above `block_ms`.
+    """
     try:
         import redis.asyncio  # noqa: F401
     except ImportError as exc:
@@ -355,4 +733,8 @@ def create_redis_resumable_stream_store(
         default_ttl_ms=default_ttl_ms,
         poll_interval_ms=poll_interval_ms,
         max_chunk_bytes=max_chunk_bytes,
+        block_ms=block_ms,
+        read_count=read_count,
+        scripts=scripts,
+        combine_ms=combine_ms,
     )
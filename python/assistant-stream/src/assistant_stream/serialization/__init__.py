@@ -1,4 +1,5 @@
 from assistant_stream.serialization.data_stream import (
+    DataStreamDecoder,
     DataStreamEncoder,
     DataStreamResponse,
 )
@@ -7,15 +8,37 @@ from assistant_stream.serialization.openai_stream import (
     OpenAIStreamResponse,
 )
 from assistant_stream.serialization.assistant_transport import (
+    AssistantTransportDecoder,
     AssistantTransportEncoder,
     AssistantTransportResponse,
 )
+from assistant_stream.serialization.json_serializer import (
+    JSONSerializer,
+    MsgspecSerializer,
+    OrjsonSerializer,
+    StdlibJSONSerializer,
+    resolve_json_serializer,
+)
+from assistant_stream.serialization.offload import OffloadStats
+from assistant_stream.serialization.stream_decoder import StreamDecoder, relay
+from assistant_stream.serialization.websocket import WebSocketMultiplexer
 
 __all__ = [
+    "DataStreamDecoder",
     "DataStreamEncoder",
     "DataStreamResponse",
     "OpenAIStreamEncoder",
     "OpenAIStreamResponse",
+    "AssistantTransportDecoder",
     "AssistantTransportEncoder",
     "AssistantTransportResponse",
+    "JSONSerializer",
+    "MsgspecSerializer",
+    "OrjsonSerializer",
+    "StdlibJSONSerializer",
+    "resolve_json_serializer",
+    "OffloadStats",
+    "StreamDecoder",
+    "relay",
+    "WebSocketMultiplexer",
 ]
@@ -1,13 +1,31 @@
 from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.coalesce import (
+    DEFAULT_COALESCE_MAX_BYTES,
+    CoalesceOption,
+    coalesce_frames,
+    resolve_coalesce_delay,
+)
+from assistant_stream.serialization.compression import (
+    CompressionLevel,
+    CompressionOption,
+    compress_frames,
+    create_compressor,
+    negotiate_encoding,
+    resolve_compression,
+)
 from assistant_stream.serialization.heartbeat import (
     HeartbeatOption,
     add_keepalive,
     resolve_heartbeat_interval,
 )
 from assistant_stream.serialization.stream_encoder import StreamEncoder
+import asyncio
 from typing import AsyncGenerator
 
+from starlette.datastructures import Headers
+from starlette.requests import ClientDisconnect
 from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 
 class AssistantStreamResponse(StreamingResponse):
@@ -17,6 +35,27 @@ class AssistantStreamResponse(StreamingResponse):
     emit it while the stream is idle (15s interval by default) to keep proxies
     from timing out the connection. Pass `heartbeat=<seconds>` to change the
     interval, or `heartbeat=False` to disable heartbeats.
+
+    The body is the encoder's `encode_stream_bytes` output, so frames reach
+    the socket as the bytes the encoder produced.
+
+    Pass `coalesce=True` to join frames that are ready at the same time into
+    one body send, or `coalesce=<seconds>` to also wait that long for more
+    frames after the first send. Batches are capped at `coalesce_max_bytes`.
+    Coalescing is off by default; the first frame is never delayed.
+
+    Pass `compression=True` (or a list such as `["br", "gzip"]`) to negotiate
+    `Accept-Encoding` and compress the body. Each write is sync-flushed, so
+    combine it with `coalesce` to compress whole batches.
+    `compression_level` takes one level or a mapping per encoding, and
+    `compression_min_flush` holds back writes until that many uncompressed
+    bytes are pending; keepalives and the first frame are never held, and
+    held writes are flushed once the stream has been quiet for 50ms.
+
+    The response listens for `http.disconnect` while it streams, on every
+    ASGI spec version, and closes the stream as soon as the client goes
+    away, so a `create_run` callback sees `is_cancelled` right away instead
+    of at its next write.
     """
 
     def __init__(
@@ -24,13 +63,101 @@ class AssistantStreamResponse(StreamingResponse):
         stream: AsyncGenerator[AssistantStreamChunk, None],
         stream_encoder: StreamEncoder,
         heartbeat: HeartbeatOption = True,
+        coalesce: CoalesceOption = False,
+        coalesce_max_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+        compression: CompressionOption = False,
+        compression_level: CompressionLevel = None,
+        compression_min_flush: int = 0,
     ):
         heartbeat_interval = resolve_heartbeat_interval(heartbeat)
+        coalesce_delay = resolve_coalesce_delay(coalesce)
+        self._compression_encodings = resolve_compression(compression)
+        self._compression_level = compression_level
+        self._compression_min_flush = compression_min_flush
         keepalive_token = stream_encoder.get_keepalive_token()
-        body = stream_encoder.encode_stream(stream)
+        self._keepalive_frame = (
+            None if keepalive_token is None else keepalive_token.encode("utf-8")
+        )
+        body = stream_encoder.encode_stream_bytes(stream)
         if heartbeat_interval is not None and keepalive_token is not None:
-            body = add_keepalive(body, heartbeat_interval, keepalive_token)
+            body = add_keepalive(
+                body, heartbeat_interval, keepalive_token.encode("utf-8")
+            )
+        if coalesce_delay is not None:
+            body = coalesce_frames(body, coalesce_delay, coalesce_max_bytes)
         super().__init__(
             body,
             media_type=stream_encoder.get_media_type(),
         )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+        if self._compression_encodings:
+            self._negotiate_compression(scope)
+        body_task = asyncio.ensure_future(self._send_body(send))
+        disconnect_task = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            await asyncio.wait(
+                {body_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            disconnect_task.cancel()
+            body_task.cancel()
+            # Wait for the stream to close so a cancelled run has stopped
+            # before the server moves on.
+            await asyncio.wait({body_task, disconnect_task})
+        if not body_task.cancelled():
+            body_task.result()
+        if self.background is not None:
+            await self.background()
+
+    async def _send_body(self, send: Send) -> None:
+        body = self.body_iterator
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            async for chunk in body:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            raise ClientDisconnect()
+        finally:
+            # Cancelled while awaiting `send`, the body is suspended at a
+            # yield rather than unwound; close it so the run is cancelled now.
+            aclose = getattr(body, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _negotiate_compression(self, scope: Scope) -> None:
+        if "content-encoding" in self.headers:
+            return
+        self.headers.add_vary_header("Accept-Encoding")
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self._compression_encodings,
+        )
+        if encoding is None:
+            return
+        self.headers["Content-Encoding"] = encoding
+        self.body_iterator = compress_frames(
+            self.body_iterator,
+            create_compressor(encoding, self._compression_level),
+            self._compression_min_flush,
+            self._keepalive_frame,
+        )
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
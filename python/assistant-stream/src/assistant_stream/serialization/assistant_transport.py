@@ -1,6 +1,8 @@
 from assistant_stream.assistant_stream_chunk import (
     AnnotationsChunk,
     AssistantStreamChunk,
+    DataChunk,
+    ErrorChunk,
     FileChunk,
     ReasoningDeltaChunk,
     ReasoningPartStartChunk,
@@ -12,32 +14,40 @@ from assistant_stream.assistant_stream_chunk import (
     ToolCallArgsTextFinishChunk,
     ToolCallDeltaChunk,
     ToolResultChunk,
+    UpdateStateChunk,
 )
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.coalesce import CoalesceOption
+from assistant_stream.serialization.compression import CompressionOption
 from assistant_stream.serialization.heartbeat import (
     SSE_HEARTBEAT_LINE,
     HeartbeatOption,
 )
-from assistant_stream.serialization.stream_encoder import StreamEncoder
-from assistant_stream.state_proxy import StateProxy
-from typing import AsyncGenerator, Any
+from assistant_stream.serialization.json_serializer import (
+    JSONBackend,
+    JSONSerializer,
+    StateProxyJSONEncoder,  # noqa: F401 (re-exported)
+    StdlibJSONSerializer,
+    resolve_json_serializer,
+)
+from assistant_stream.serialization.offload import (
+    FrameOffloader,
+    OffloadOption,
+    OffloadStats,
+    has_cooperative_dumps,
+    resolve_offload_threshold,
+)
+from assistant_stream.serialization.stream_decoder import StreamDecoder
+from assistant_stream.serialization.stream_encoder import StreamEncoder, _overrides
+from typing import Any, AsyncGenerator, Callable
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class StateProxyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that can handle StateProxy objects."""
-
-    def default(self, obj: Any) -> Any:
-        if isinstance(obj, StateProxy):
-            return obj._get_value()
-        return super().default(obj)
-
-
 class _Canonicalizer:
     """Translate the internal flat chunk dialect into the canonical
     assistant-transport wire shape consumed by the TS AssistantTransportDecoder
@@ -243,53 +253,60 @@ class _Canonicalizer:
         frames.append({"type": "part-finish", "path": path})
         return frames
 
+    def _text_delta(self, chunk: TextDeltaChunk) -> list[dict[str, Any]]:
+        return self._append_delta(chunk, chunk.text_delta, "text")
+
+    def _reasoning_delta(self, chunk: ReasoningDeltaChunk) -> list[dict[str, Any]]:
+        return self._append_delta(chunk, chunk.reasoning_delta, "reasoning")
+
+    def _data(self, chunk: DataChunk) -> list[dict[str, Any]]:
+        # The TS union requires `data` to be an array; wrap single values so
+        # a dict payload satisfies the accumulator's array spread.
+        return [{"type": "data", "data": [chunk.data]}]
+
+    def _annotations(self, chunk: AnnotationsChunk) -> list[dict[str, Any]]:
+        return [{"type": "annotations", "annotations": chunk.annotations}]
+
+    def _step_start(self, chunk: StepStartChunk) -> list[dict[str, Any]]:
+        return [{"type": "step-start", "messageId": chunk.message_id}]
+
+    def _step_finish(self, chunk: StepFinishChunk) -> list[dict[str, Any]]:
+        return [
+            {
+                "type": "step-finish",
+                "finishReason": chunk.finish_reason,
+                "usage": {
+                    "inputTokens": chunk.input_tokens,
+                    "outputTokens": chunk.output_tokens,
+                },
+                "isContinued": chunk.is_continued,
+            }
+        ]
+
+    def _error(self, chunk: ErrorChunk) -> list[dict[str, Any]]:
+        return [{"type": "error", "error": chunk.error}]
+
+    def _update_state(self, chunk: UpdateStateChunk) -> list[dict[str, Any]]:
+        return [{"type": "update-state", "operations": chunk.operations}]
+
     def translate(self, chunk: AssistantStreamChunk) -> list[dict[str, Any]]:
-        match chunk.type:
-            case "text-delta":
-                return self._append_delta(chunk, chunk.text_delta, "text")
-            case "reasoning-part-start":
-                return self._start_reasoning_part(chunk)
-            case "reasoning-delta":
-                return self._append_delta(chunk, chunk.reasoning_delta, "reasoning")
-            case "tool-call-begin":
-                return self._begin_tool_call(chunk)
-            case "tool-call-delta":
-                return self._tool_call_delta(chunk)
-            case "tool-call-args-text-finish":
-                return self._finish_tool_call_args(chunk)
-            case "tool-result":
-                return self._tool_result(chunk)
-            case "source":
-                return self._source(chunk)
-            case "file":
-                return self._file(chunk)
-            case "data":
-                # The TS union requires `data` to be an array; wrap single values
-                # so a dict payload satisfies the accumulator's array spread.
-                return [{"type": "data", "data": [chunk.data]}]
-            case "annotations":
-                return [{"type": "annotations", "annotations": chunk.annotations}]
-            case "step-start":
-                return [{"type": "step-start", "messageId": chunk.message_id}]
-            case "step-finish":
-                return [
-                    {
-                        "type": "step-finish",
-                        "finishReason": chunk.finish_reason,
-                        "usage": {
-                            "inputTokens": chunk.input_tokens,
-                            "outputTokens": chunk.output_tokens,
-                        },
-                        "isContinued": chunk.is_continued,
-                    }
-                ]
-            case "error":
-                return [{"type": "error", "error": chunk.error}]
-            case "update-state":
-                return [{"type": "update-state", "operations": chunk.operations}]
-            case _:
+        translate = _TRANSLATORS.get(chunk.__class__)
+        if translate is None:
+            # Subclassed or duck-typed chunks fall back to their type tag.
+            translate = _TRANSLATORS_BY_TYPE.get(chunk.type)
+            if translate is None:
                 self._warn_once("unknown-chunk-type", chunk.type)
                 return []
+        return translate(self, chunk)
+
+    def open_part_index(self, kind: str, parent_id: str | None) -> int | None:
+        """The path index of the open text or reasoning part if a delta of
+        `kind` and `parent_id` extends it, so its only frame is a
+        text-delta; None when translate() is needed."""
+        part = self._append_part
+        if part is not None and part[0] == kind and part[2] == parent_id:
+            return part[1][0]
+        return None
 
     def close(self) -> list[dict[str, Any]]:
         frames = self._close_append_part()
@@ -302,6 +319,32 @@ class _Canonicalizer:
         return frames
 
 
+_TRANSLATORS: dict[type, Callable[[_Canonicalizer, Any], list[dict[str, Any]]]] = {
+    TextDeltaChunk: _Canonicalizer._text_delta,
+    ReasoningPartStartChunk: _Canonicalizer._start_reasoning_part,
+    ReasoningDeltaChunk: _Canonicalizer._reasoning_delta,
+    ToolCallBeginChunk: _Canonicalizer._begin_tool_call,
+    ToolCallDeltaChunk: _Canonicalizer._tool_call_delta,
+    ToolCallArgsTextFinishChunk: _Canonicalizer._finish_tool_call_args,
+    ToolResultChunk: _Canonicalizer._tool_result,
+    SourceChunk: _Canonicalizer._source,
+    FileChunk: _Canonicalizer._file,
+    DataChunk: _Canonicalizer._data,
+    AnnotationsChunk: _Canonicalizer._annotations,
+    StepStartChunk: _Canonicalizer._step_start,
+    StepFinishChunk: _Canonicalizer._step_finish,
+    ErrorChunk: _Canonicalizer._error,
+    UpdateStateChunk: _Canonicalizer._update_state,
+}
+
+_TRANSLATORS_BY_TYPE = {
+    chunk_cls.TYPE: translate for chunk_cls, translate in _TRANSLATORS.items()
+}
+
+# Stands in for the text while a text-delta frame template is serialized.
+_TEXT_SLOT = "\x00text\x00"
+
+
 class AssistantTransportEncoder(StreamEncoder):
     """
     AssistantTransportEncoder encodes AssistantStreamChunks into the canonical
@@ -309,22 +352,410 @@ class AssistantTransportEncoder(StreamEncoder):
     completes.
     """
 
+    # Class-level default so subclasses that skip `__init__` still serialize.
+    _serializer: JSONSerializer = StdlibJSONSerializer()
+
+    _offloader: FrameOffloader | None = None
+
+    def __init__(
+        self,
+        *,
+        serializer: JSONSerializer | JSONBackend | None = None,
+        offload: OffloadOption = False,
+        offload_stats: OffloadStats | None = None,
+    ) -> None:
+        """
+        `serializer` selects the JSON backend: the stdlib (default, byte-exact
+        historical output), "orjson", "msgspec", "auto", or a JSONSerializer.
+
+        `offload` serializes frames whose payload is estimated above a size
+        in bytes in a worker thread: True for DEFAULT_OFFLOAD_THRESHOLD, an
+        int for a custom threshold. Usage is counted in `offload_stats`.
+        Serializers without a GIL-releasing `dumps_cooperative`, such as
+        orjson and msgspec, keep every frame inline.
+        """
+        self._serializer = resolve_json_serializer(serializer)
+        threshold = resolve_offload_threshold(offload)
+        if threshold is not None and has_cooperative_dumps(self._serializer):
+            self._offloader = FrameOffloader(threshold, offload_stats)
+
+    @property
+    def offload_stats(self) -> OffloadStats | None:
+        """Offload counters, or None when offloading is disabled."""
+        return None if self._offloader is None else self._offloader.stats
+
     def get_media_type(self) -> str:
         return "text/event-stream"
 
     def get_keepalive_token(self) -> str:
         return SSE_HEARTBEAT_LINE
 
+    def _delta_template(self, index: int) -> tuple[bytes, bytes]:
+        dumps = self._serializer.dumps
+        encoded = dumps({"type": "text-delta", "textDelta": _TEXT_SLOT, "path": [index]})
+        prefix, suffix = encoded.split(dumps(_TEXT_SLOT))
+        return b"data: " + prefix, suffix + b"\n\n"
+
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
     ) -> AsyncGenerator[str, None]:
+        async for frame in self._native_bytes(stream):
+            yield frame.decode("utf-8")
+
+    def encode_stream_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        if _overrides(self, AssistantTransportEncoder, "encode_stream"):
+            # A subclass's `encode_stream` supplies the frames.
+            return StreamEncoder.encode_stream_bytes(self, stream)
+        return self._native_bytes(stream)
+
+    async def _native_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        dumps = self._serializer.dumps
         canonicalizer = _Canonicalizer()
+        # Deltas that extend the open part are spliced into a per-part
+        # template, skipping the frame dict and list on the token path.
+        templates: dict[int, tuple[bytes, bytes]] = {}
+        offloader = self._offloader
+
+        def encode_frames(frames: list[dict[str, Any]]) -> list[bytes]:
+            # Runs in a worker; see JSONSerializer.dumps_cooperative.
+            cooperative = self._serializer.dumps_cooperative
+            return [b"data: " + cooperative(frame) + b"\n\n" for frame in frames]
+
         async for chunk in stream:
+            chunk_cls = chunk.__class__
+            index = None
+            if chunk_cls is TextDeltaChunk:
+                index = canonicalizer.open_part_index("text", chunk.parent_id)
+                text = chunk.text_delta
+            elif chunk_cls is ReasoningDeltaChunk:
+                index = canonicalizer.open_part_index("reasoning", chunk.parent_id)
+                text = chunk.reasoning_delta
+            if index is not None:
+                template = templates.get(index)
+                if template is None:
+                    template = templates[index] = self._delta_template(index)
+                yield template[0] + dumps(text) + template[1]
+                continue
+            if offloader is not None and offloader.is_large(chunk):
+                # Translation stays on the loop; only serialization moves.
+                frames = canonicalizer.translate(offloader.snapshot(chunk))
+                for encoded in await offloader.run(encode_frames, frames):
+                    yield encoded
+                continue
             for frame in canonicalizer.translate(chunk):
-                yield f"data: {json.dumps(frame, cls=StateProxyJSONEncoder)}\n\n"
+                yield b"data: " + dumps(frame) + b"\n\n"
         for frame in canonicalizer.close():
-            yield f"data: {json.dumps(frame, cls=StateProxyJSONEncoder)}\n\n"
-        yield "data: [DONE]\n\n"
+            yield b"data: " + dumps(frame) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+
+class _Decanonicalizer:
+    """Inverse of `_Canonicalizer`: resolves part paths back to the text,
+    reasoning or tool call they address and rebuilds the flat chunks.
+    Re-encoding its output reproduces the original wire frames."""
+
+    def __init__(self, warn_once) -> None:
+        self._warn_once = warn_once
+        # Indexed by the part's path; parts are allocated in part-start order.
+        self._parts: list[tuple[str, str | None]] = []
+        self._settled_tools: set[int] = set()
+        self._tools_with_args: set[int] = set()
+        # Tool-closing chunks ("{}" placeholder args, args finish) are held
+        # until another frame arrives: if the stream ends instead, they are
+        # what the encoder's `close()` emits and re-encoding recreates them
+        # in the same order.
+        self._held: list[tuple[AssistantStreamChunk, int | None]] = []
+        # Where the held run crossed the finish of the open text/reasoning
+        # part; `close()` output can only start there.
+        self._held_split: int | None = None
+        # The open text or reasoning part, which `close()` finishes first.
+        self._append_part: int | None = None
+
+    def _part_at(self, frame: dict[str, Any]) -> int | None:
+        path = frame.get("path")
+        if (
+            not isinstance(path, list)
+            or len(path) != 1
+            or not isinstance(path[0], int)
+            or not 0 <= path[0] < len(self._parts)
+        ):
+            return None
+        return path[0]
+
+    def _part_start(self, part: dict[str, Any]) -> list[AssistantStreamChunk]:
+        kind = part["type"]
+        parent_id = part.get("parentId")
+        if kind in ("text", "reasoning"):
+            self._append_part = len(self._parts)
+        if kind == "text":
+            self._parts.append(("text", parent_id))
+            return []
+        if kind == "reasoning":
+            self._parts.append(("reasoning", parent_id))
+            if "unstable_summary" not in part:
+                return []
+            return [
+                ReasoningPartStartChunk(
+                    unstable_summary=part["unstable_summary"], parent_id=parent_id
+                )
+            ]
+        if kind == "tool-call":
+            self._parts.append(("tool-call", part["toolCallId"]))
+            return [
+                ToolCallBeginChunk(
+                    tool_call_id=part["toolCallId"],
+                    tool_name=part["toolName"],
+                    parent_id=parent_id,
+                )
+            ]
+        self._parts.append((kind, None))
+        if kind == "source":
+            return [
+                SourceChunk(
+                    id=part["id"],
+                    url=part["url"],
+                    source_type=part.get("sourceType", "url"),
+                    title=part.get("title"),
+                    parent_id=parent_id,
+                )
+            ]
+        if kind == "file":
+            return [
+                FileChunk(
+                    data=part["data"], mime_type=part["mimeType"], parent_id=parent_id
+                )
+            ]
+        self._warn_once(f"unknown-part-type:{kind}", json.dumps(part)[:200])
+        return []
+
+    def _text_delta(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        index = self._part_at(frame)
+        if index is None:
+            self._warn_once("unknown-path:text-delta", str(frame.get("path")))
+            return []
+        kind, ref = self._parts[index]
+        text = frame["textDelta"]
+        if kind == "text":
+            return [TextDeltaChunk(text_delta=text, parent_id=ref)]
+        if kind == "reasoning":
+            return [ReasoningDeltaChunk(reasoning_delta=text, parent_id=ref)]
+        if kind == "tool-call":
+            if index in self._settled_tools:
+                # The "{}" placeholder the encoder adds when a result closes
+                # an argument-less call; the result recreates it.
+                return []
+            chunk = ToolCallDeltaChunk(tool_call_id=ref, args_text_delta=text)
+            if text == "{}" and index not in self._tools_with_args:
+                self._tools_with_args.add(index)
+                self._hold(chunk, None)
+                return []
+            self._tools_with_args.add(index)
+            return [chunk]
+        self._warn_once(f"text-delta-into:{kind}", str(frame.get("path")))
+        return []
+
+    def _tool_part(self, frame: dict[str, Any]) -> int | None:
+        index = self._part_at(frame)
+        if index is None or self._parts[index][0] != "tool-call":
+            return None
+        return index
+
+    def _args_finish(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        index = self._tool_part(frame)
+        if index is None or index in self._settled_tools:
+            return []
+        self._settled_tools.add(index)
+        self._hold(
+            ToolCallArgsTextFinishChunk(tool_call_id=self._parts[index][1]), index
+        )
+        return []
+
+    def _result(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        index = self._tool_part(frame)
+        if index is None:
+            # Root results carry no tool call id; re-encoding an unknown id
+            # puts them back at the root.
+            tool_call_id = ""
+        else:
+            tool_call_id = self._parts[index][1]
+            self._settled_tools.add(index)
+        return [
+            ToolResultChunk(
+                tool_call_id=tool_call_id,
+                result=frame.get("result"),
+                artifact=frame.get("artifact"),
+                is_error=frame.get("isError", False),
+            )
+        ]
+
+    def _hold(self, chunk: AssistantStreamChunk, closes: int | None) -> None:
+        if not self._held:
+            self._held_split = 0 if self._append_part is None else None
+        self._held.append((chunk, closes))
+
+    def _part_finish(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        index = self._part_at(frame)
+        if index is not None and index == self._append_part:
+            self._append_part = None
+            if self._held:
+                self._held_split = len(self._held)
+        return []
+
+    def flush(self) -> list[AssistantStreamChunk]:
+        held = [chunk for chunk, _ in self._held]
+        self._held = []
+        return held
+
+    def close(self) -> list[AssistantStreamChunk]:
+        if self._held and self._held_split is not None:
+            tail = self._held[self._held_split :]
+            tail_closes = [index for _, index in tail if index is not None]
+            unsettled = [
+                index
+                for index, (kind, _) in enumerate(self._parts)
+                if kind == "tool-call"
+                and (index not in self._settled_tools or index in tail_closes)
+            ]
+            if tail_closes == unsettled:
+                del self._held[self._held_split :]
+        return self.flush()
+
+    def translate(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        chunks = self._translate(frame)
+        if chunks and self._held:
+            chunks = self.flush() + chunks
+        return chunks
+
+    def _translate(self, frame: dict[str, Any]) -> list[AssistantStreamChunk]:
+        match frame.get("type"):
+            case "part-start":
+                return self._part_start(frame["part"])
+            case "text-delta":
+                return self._text_delta(frame)
+            case "tool-call-args-text-finish":
+                return self._args_finish(frame)
+            case "result":
+                return self._result(frame)
+            case "part-finish":
+                return self._part_finish(frame)
+            case "message-finish":
+                return []
+            case "data":
+                if not isinstance(frame["data"], list):
+                    raise TypeError("data must be an array")
+                return [DataChunk(data=item) for item in frame["data"]]
+            case "annotations":
+                return [AnnotationsChunk(annotations=frame["annotations"])]
+            case "step-start":
+                return [StepStartChunk(message_id=frame.get("messageId", ""))]
+            case "step-finish":
+                usage = frame.get("usage") or {}
+                return [
+                    StepFinishChunk(
+                        finish_reason=frame["finishReason"],
+                        input_tokens=usage.get("inputTokens", 0),
+                        output_tokens=usage.get("outputTokens", 0),
+                        is_continued=frame.get("isContinued", False),
+                    )
+                ]
+            case "error":
+                return [ErrorChunk(error=frame.get("error"))]
+            case "update-state":
+                return [UpdateStateChunk(operations=frame["operations"])]
+            case other:
+                self._warn_once(f"unknown-type:{other}", json.dumps(frame)[:200])
+                return []
+
+
+class AssistantTransportDecoder(StreamDecoder):
+    """
+    Decodes the assistant-transport SSE stream produced by
+    AssistantTransportEncoder, stopping at `[DONE]`. Comment lines
+    (heartbeats) are skipped and invalid chunks are dropped with a warning.
+    In strict mode (the default), unknown SSE event types and a stream that
+    ends without `[DONE]` raise ValueError, like the TS decoder.
+    """
+
+    def __init__(self, *, strict: bool = True) -> None:
+        super().__init__()
+        self._strict = strict
+        self._warned_reasons: set[str] = set()
+        self._decanonicalizer = _Decanonicalizer(self._warn_once)
+        self._data: list[bytes] = []
+        self._event: bytes | None = None
+        self._done = False
+
+    def _warn_once(self, reason: str, detail: str) -> None:
+        if reason in self._warned_reasons:
+            return
+        self._warned_reasons.add(reason)
+        logger.warning(
+            "Dropped invalid assistant-transport chunk (%s): %s", reason, detail
+        )
+
+    def _decode_line(self, line: bytes) -> list[AssistantStreamChunk]:
+        if self._done:
+            return []
+        if not line:
+            return self._dispatch()
+        if line.startswith(b":"):
+            return []
+        field, _, value = line.partition(b":")
+        if value.startswith(b" "):
+            value = value[1:]
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"event":
+            self._event = value
+        return []
+
+    def _dispatch(self) -> list[AssistantStreamChunk]:
+        if not self._data:
+            self._event = None
+            return []
+        data = b"\n".join(self._data)
+        event = self._event
+        self._data = []
+        self._event = None
+        if event not in (None, b"message"):
+            name = event.decode("utf-8", "replace")
+            if self._strict:
+                raise ValueError(f"Unknown SSE event type: {name}")
+            self._warn_once(f"event:{name}", data[:200].decode("utf-8", "replace"))
+            return []
+        if data == b"[DONE]":
+            self._done = True
+            return self._decanonicalizer.close()
+        try:
+            frame = json.loads(data)
+        except ValueError:
+            self._warn_once("unparseable", data[:200].decode("utf-8", "replace"))
+            return []
+        if not isinstance(frame, dict):
+            self._warn_once("not-an-object", data[:200].decode("utf-8", "replace"))
+            return []
+        try:
+            return self._decanonicalizer.translate(frame)
+        except (AttributeError, KeyError, TypeError):
+            self._warn_once(
+                f"invalid-fields:{frame.get('type')}",
+                data[:200].decode("utf-8", "replace"),
+            )
+            return []
+
+    def _finish(self) -> list[AssistantStreamChunk]:
+        chunks = self._dispatch()
+        if not self._done:
+            chunks.extend(self._decanonicalizer.flush())
+            message = "Stream ended abruptly without receiving [DONE] marker"
+            if self._strict:
+                raise ValueError(message)
+            logger.warning(message)
+        return chunks
 
 
 class AssistantTransportResponse(AssistantStreamResponse):
@@ -332,5 +763,13 @@ class AssistantTransportResponse(AssistantStreamResponse):
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
         heartbeat: HeartbeatOption = True,
+        coalesce: CoalesceOption = False,
+        compression: CompressionOption = False,
     ):
-        super().__init__(stream, AssistantTransportEncoder(), heartbeat=heartbeat)
+        super().__init__(
+            stream,
+            AssistantTransportEncoder(),
+            heartbeat=heartbeat,
+            coalesce=coalesce,
+            compression=compression,
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import math
+from typing import AsyncGenerator, List, Optional, Union
+
+DEFAULT_COALESCE_MAX_BYTES = 64 * 1024
+
+CoalesceOption = Union[float, int, bool, None]
+
+
+def resolve_coalesce_delay(coalesce: CoalesceOption) -> Optional[float]:
+    """
+    Normalize a coalesce option to the extra wait in seconds.
+
+    True coalesces only frames that are already available (no extra wait);
+    a positive number also waits up to that many seconds for more frames;
+    False and None disable coalescing.
+    """
+    if coalesce is True:
+        return 0.0
+    if coalesce is False or coalesce is None:
+        return None
+    delay = float(coalesce)
+    if not math.isfinite(delay) or delay < 0:
+        raise ValueError(f"coalesce delay must be a non-negative finite number, got {coalesce!r}")
+    return delay
+
+
+class _Coalescer:
+    """Reads the upstream stream in a single pump task and hands the consumer
+    everything buffered since its last send as one batch."""
+
+    def __init__(
+        self,
+        stream: AsyncGenerator[bytes, None],
+        max_delay: float,
+        max_bytes: int,
+    ) -> None:
+        self._stream = stream
+        self._max_delay = max_delay
+        self._max_bytes = max_bytes
+        self._loop = asyncio.get_running_loop()
+        self._frames: List[bytes] = []
+        self._buffered = 0
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._data_waiter: Optional[asyncio.Future[None]] = None
+        self._space_waiter: Optional[asyncio.Future[None]] = None
+        self._task = self._loop.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for frame in self._stream:
+                self._frames.append(frame)
+                self._buffered += len(frame)
+                _wake(self._data_waiter)
+                if self._buffered >= self._max_bytes:
+                    # Bound read-ahead to one batch so a slow client applies
+                    # backpressure to the run.
+                    self._space_waiter = self._loop.create_future()
+                    await self._space_waiter
+        except asyncio.CancelledError:
+            raise
+        except BaseException as err:
+            self._error = err
+        finally:
+            self._done = True
+            _wake(self._data_waiter)
+
+    async def _wait_for_data(self, timeout: Optional[float]) -> None:
+        waiter = self._data_waiter = self._loop.create_future()
+        handle = None
+        if timeout is not None:
+            handle = self._loop.call_later(timeout, _wake, waiter)
+        try:
+            await waiter
+        finally:
+            self._data_waiter = None
+            if handle is not None:
+                handle.cancel()
+
+    def _take_batch(self) -> bytes:
+        frames = self._frames
+        size = 0
+        count = 0
+        for frame in frames:
+            if count and size + len(frame) > self._max_bytes:
+                break
+            size += len(frame)
+            count += 1
+        batch = frames[0] if count == 1 else b"".join(frames[:count])
+        del frames[:count]
+        self._buffered -= size
+        _wake(self._space_waiter)
+        return batch
+
+    async def batches(self) -> AsyncGenerator[bytes, None]:
+        first = True
+        while True:
+            if not self._frames and not self._done:
+                await self._wait_for_data(None)
+            if self._frames:
+                if not first and self._max_delay > 0:
+                    deadline = self._loop.time() + self._max_delay
+                    while not self._done and self._buffered < self._max_bytes:
+                        remaining = deadline - self._loop.time()
+                        if remaining <= 0:
+                            break
+                        await self._wait_for_data(remaining)
+                first = False
+                yield self._take_batch()
+                continue
+            if self._error is not None:
+                raise self._error
+            return
+
+    async def aclose(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.wait({self._task})
+        # Plain async iterators have nothing to close.
+        aclose = getattr(self._stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _wake(future: Optional["asyncio.Future[None]"]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+async def coalesce_frames(
+    stream: AsyncGenerator[bytes, None],
+    max_delay: float = 0.0,
+    max_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Join frames that are ready at the same time into one body chunk, so a
+    burst of per-token frames becomes a single ASGI send. The first batch is
+    sent as soon as a frame exists; later batches may wait up to `max_delay`
+    seconds for more frames. Batches hold at most `max_bytes` unless a single
+    frame is larger.
+    """
+    if max_bytes <= 0:
+        raise ValueError(f"max_bytes must be positive, got {max_bytes!r}")
+    coalescer = _Coalescer(stream, max_delay, max_bytes)
+    try:
+        async for batch in coalescer.batches():
+            yield batch
+    finally:
+        await coalescer.aclose()
@@ -0,0 +1,342 @@
+"""Streaming response compression.
+
+Compressors sync-flush after each write, so every body chunk the client
+receives decodes to the frames sent so far and streaming latency is kept.
+gzip uses the stdlib; brotli (`brotli`) and zstd (`zstandard`) are used when
+the package is installed.
+"""
+
+import asyncio
+import math
+import zlib
+from abc import ABC, abstractmethod
+from typing import (
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+CompressionOption = Union[bool, Iterable[str], None]
+
+CompressionLevel = Union[int, Mapping[str, int], None]
+
+# How long `compress_frames` holds writes below `min_flush_size` back.
+DEFAULT_MAX_FLUSH_DELAY = 0.05
+
+# Frames `compress_frames` reads ahead of the client while holding writes.
+_MAX_READ_AHEAD = 64 * 1024
+
+
+class StreamCompressor(ABC):
+    """Incremental compressor for one response body."""
+
+    encoding: str
+    default_level: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Feed `data`; may return nothing until the next flush."""
+        pass
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """Emit everything fed so far as a decodable block."""
+        pass
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """End the compressed stream."""
+        pass
+
+
+class GzipStreamCompressor(StreamCompressor):
+    encoding = "gzip"
+    default_level = 6
+
+    def __init__(self, level: Optional[int] = None) -> None:
+        level = self.default_level if level is None else level
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStreamCompressor(StreamCompressor):
+    encoding = "br"
+    # Quality 11 is far too slow for per-write flushing.
+    default_level = 4
+
+    def __init__(self, level: Optional[int] = None) -> None:
+        import brotli
+
+        level = self.default_level if level is None else level
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdStreamCompressor(StreamCompressor):
+    encoding = "zstd"
+    default_level = 3
+
+    def __init__(self, level: Optional[int] = None) -> None:
+        import zstandard
+
+        level = self.default_level if level is None else level
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Server preference order when the client ranks encodings equally.
+_COMPRESSORS: Dict[str, Tuple[Type[StreamCompressor], Optional[str]]] = {
+    "zstd": (ZstdStreamCompressor, "zstandard"),
+    "br": (BrotliStreamCompressor, "brotli"),
+    "gzip": (GzipStreamCompressor, None),
+}
+
+
+def _importable(module: Optional[str]) -> bool:
+    if module is None:
+        return True
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings usable in this environment, in preference order."""
+    return tuple(
+        encoding
+        for encoding, (_, module) in _COMPRESSORS.items()
+        if _importable(module)
+    )
+
+
+def resolve_compression(compression: CompressionOption) -> Tuple[str, ...]:
+    """
+    Normalize a compression option to the offered encodings.
+
+    True offers every available encoding; an iterable of names offers those
+    in the given order and raises if one is unknown or not installed;
+    False and None disable compression.
+    """
+    if compression is True:
+        return available_encodings()
+    if compression is False or compression is None:
+        return ()
+    if isinstance(compression, str):
+        compression = (compression,)
+    encodings = tuple(compression)
+    for encoding in encodings:
+        if encoding not in _COMPRESSORS:
+            raise ValueError(f"Unknown content encoding: {encoding!r}")
+        _, module = _COMPRESSORS[encoding]
+        if not _importable(module):
+            raise ImportError(
+                f"Content encoding {encoding!r} requires the {module!r} package"
+            )
+    return encodings
+
+
+def negotiate_encoding(
+    accept_encoding: str, offered: Iterable[str]
+) -> Optional[str]:
+    """
+    Pick the encoding for an `Accept-Encoding` header value, or None for
+    identity. Higher q-values win; ties go to the earlier offered encoding.
+    """
+    ranks: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranks[name] = q
+
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in offered:
+        q = ranks.get(encoding, ranks.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def create_compressor(
+    encoding: str, level: CompressionLevel = None
+) -> StreamCompressor:
+    if isinstance(level, Mapping):
+        level = level.get(encoding)
+    compressor_cls, _ = _COMPRESSORS[encoding]
+    return compressor_cls(level)
+
+
+class _FramePump:
+    """Reads the upstream stream in a single task, so the compressor can stop
+    waiting for the next frame when held writes are due."""
+
+    def __init__(self, stream: AsyncGenerator[bytes, None], max_bytes: int) -> None:
+        self._stream = stream
+        self._max_bytes = max_bytes
+        self._loop = asyncio.get_running_loop()
+        self.frames: List[bytes] = []
+        self._buffered = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._data_waiter: Optional[asyncio.Future[None]] = None
+        self._space_waiter: Optional[asyncio.Future[None]] = None
+        self._task = self._loop.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for frame in self._stream:
+                self.frames.append(frame)
+                self._buffered += len(frame)
+                _wake(self._data_waiter)
+                if self._buffered >= self._max_bytes:
+                    # Bound read-ahead so a slow client applies backpressure
+                    # to the run.
+                    self._space_waiter = self._loop.create_future()
+                    await self._space_waiter
+        except asyncio.CancelledError:
+            raise
+        except BaseException as err:
+            self.error = err
+        finally:
+            self.done = True
+            _wake(self._data_waiter)
+
+    async def wait(self, timeout: Optional[float]) -> None:
+        waiter = self._data_waiter = self._loop.create_future()
+        handle = None
+        if timeout is not None:
+            handle = self._loop.call_later(timeout, _wake, waiter)
+        try:
+            await waiter
+        finally:
+            self._data_waiter = None
+            if handle is not None:
+                handle.cancel()
+
+    def take(self) -> List[bytes]:
+        frames = self.frames
+        self.frames = []
+        self._buffered = 0
+        _wake(self._space_waiter)
+        return frames
+
+    async def aclose(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.wait({self._task})
+        await self._stream.aclose()
+
+
+def _wake(future: Optional["asyncio.Future[None]"]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+async def compress_frames(
+    stream: AsyncGenerator[bytes, None],
+    compressor: StreamCompressor,
+    min_flush_size: int = 0,
+    keepalive: Optional[bytes] = None,
+    max_flush_delay: float = DEFAULT_MAX_FLUSH_DELAY,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Compress a body stream, sync-flushing once at least `min_flush_size`
+    uncompressed bytes are pending. The default flushes after every write;
+    larger values hold small writes back in exchange for a better ratio.
+
+    The first frame and `keepalive` frames are flushed right away, and held
+    writes are flushed at most `max_flush_delay` seconds after the first of
+    them, so a stream that goes quiet never leaves data in the compressor.
+    """
+    if not math.isfinite(max_flush_delay) or max_flush_delay <= 0:
+        raise ValueError(
+            "max_flush_delay must be a positive finite number, "
+            f"got {max_flush_delay!r}"
+        )
+    if min_flush_size <= 0:
+        try:
+            async for frame in stream:
+                yield compressor.compress(frame) + compressor.flush()
+            yield compressor.finish()
+        finally:
+            await stream.aclose()
+        return
+
+    loop = asyncio.get_running_loop()
+    pump = _FramePump(stream, max(min_flush_size, _MAX_READ_AHEAD))
+    pending = 0
+    held = b""
+    first = True
+    deadline = 0.0
+    try:
+        while True:
+            if not pump.frames and not pump.done:
+                timeout = deadline - loop.time() if pending else None
+                if timeout is None or timeout > 0:
+                    await pump.wait(timeout)
+            if pending and loop.time() >= deadline:
+                yield held + compressor.flush()
+                held = b""
+                pending = 0
+            if not pump.frames:
+                if not pump.done:
+                    continue
+                if pump.error is not None:
+                    raise pump.error
+                break
+            for frame in pump.take():
+                held += compressor.compress(frame)
+                if not pending:
+                    deadline = loop.time() + max_flush_delay
+                pending += len(frame)
+                if first or pending >= min_flush_size or frame == keepalive:
+                    first = False
+                    yield held + compressor.flush()
+                    held = b""
+                    pending = 0
+        yield held + compressor.finish()
+    finally:
+        await pump.aclose()
@@ -1,105 +1,399 @@
 from assistant_stream.assistant_stream_chunk import (
+    AnnotationsChunk,
     AssistantStreamChunk,
+    DataChunk,
+    ErrorChunk,
+    FileChunk,
+    ReasoningDeltaChunk,
+    ReasoningPartStartChunk,
+    SourceChunk,
+    StepFinishChunk,
+    StepStartChunk,
+    TextDeltaChunk,
     ToolCallArgsTextFinishChunk,
+    ToolCallBeginChunk,
     ToolCallDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
 )
+import copy
 import json
 import logging
-from typing import AsyncGenerator, Any
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.coalesce import CoalesceOption
+from assistant_stream.serialization.compression import CompressionOption
 from assistant_stream.serialization.heartbeat import (
     DATA_STREAM_KEEPALIVE_LINE,
     HeartbeatOption,
 )
-from assistant_stream.serialization.stream_encoder import StreamEncoder
-from assistant_stream.state_proxy import StateProxy
+from assistant_stream.serialization.json_serializer import (
+    JSONBackend,
+    JSONSerializer,
+    StateProxyJSONEncoder,  # noqa: F401 (re-exported)
+    StdlibJSONSerializer,
+    resolve_json_serializer,
+)
+from assistant_stream.serialization.offload import (
+    CooperativeSerializer,
+    FrameOffloader,
+    OffloadOption,
+    OffloadStats,
+    has_cooperative_dumps,
+    resolve_offload_threshold,
+)
+from assistant_stream.serialization.stream_decoder import StreamDecoder
+from assistant_stream.serialization.stream_encoder import (
+    StreamEncoder,
+    _frame_encoder,
+    _overrides,
+)
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class StateProxyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that can handle StateProxy objects."""
-    def default(self, obj: Any) -> Any:
-        if isinstance(obj, StateProxy):
-            return obj._get_value()
-        return super().default(obj)
+def _text_delta_frame(encoder: "DataStreamEncoder", chunk: TextDeltaChunk) -> bytes:
+    parent_id = getattr(chunk, "parent_id", None)
+    if parent_id:
+        return encoder._frame(
+            b"aui-text-delta:", {"textDelta": chunk.text_delta, "parentId": parent_id}
+        )
+    return encoder._frame(b"0:", chunk.text_delta)
+
+
+def _reasoning_part_start_frame(
+    encoder: "DataStreamEncoder", chunk: ReasoningPartStartChunk
+) -> bytes | None:
+    if chunk.unstable_summary is None:
+        return None
+    # Reasoning otherwise reaches the wire only through its deltas, which
+    # cannot carry a summary and emit nothing at all for a part that never
+    # appends text.
+    value: dict[str, Any] = {"unstable_summary": chunk.unstable_summary}
+    if chunk.parent_id is not None:
+        value["parentId"] = chunk.parent_id
+    return encoder._frame(b"aui-reasoning-part-start:", value)
+
+
+def _reasoning_delta_frame(
+    encoder: "DataStreamEncoder", chunk: ReasoningDeltaChunk
+) -> bytes:
+    parent_id = getattr(chunk, "parent_id", None)
+    if parent_id:
+        return encoder._frame(
+            b"aui-reasoning-delta:",
+            {"reasoningDelta": chunk.reasoning_delta, "parentId": parent_id},
+        )
+    return encoder._frame(b"g:", chunk.reasoning_delta)
+
+
+def _tool_call_begin_frame(
+    encoder: "DataStreamEncoder", chunk: ToolCallBeginChunk
+) -> bytes:
+    data = {"toolCallId": chunk.tool_call_id, "toolName": chunk.tool_name}
+    parent_id = getattr(chunk, "parent_id", None)
+    if parent_id:
+        data["parentId"] = parent_id
+    return encoder._frame(b"b:", data)
+
+
+def _tool_call_delta_frame(
+    encoder: "DataStreamEncoder", chunk: ToolCallDeltaChunk
+) -> bytes:
+    return encoder._frame(
+        b"c:", {"toolCallId": chunk.tool_call_id, "argsTextDelta": chunk.args_text_delta}
+    )
+
+
+def _tool_call_args_text_finish_frame(
+    encoder: "DataStreamEncoder", chunk: ToolCallArgsTextFinishChunk
+) -> bytes:
+    return encoder._frame(
+        b"c:",
+        {
+            "toolCallId": chunk.tool_call_id,
+            "argsTextDelta": chunk.args_text_delta,
+            "isFinal": True,
+        },
+    )
+
+
+def _tool_result_frame(encoder: "DataStreamEncoder", chunk: ToolResultChunk) -> bytes:
+    res = {"toolCallId": chunk.tool_call_id, "result": chunk.result}
+    if chunk.artifact is not None:
+        res["artifact"] = chunk.artifact
+    if chunk.is_error:
+        res["isError"] = chunk.is_error
+    return encoder._frame(b"a:", res)
+
+
+def _data_frame(encoder: "DataStreamEncoder", chunk: DataChunk) -> bytes:
+    return encoder._frame(b"2:", [chunk.data])
+
+
+def _error_frame(encoder: "DataStreamEncoder", chunk: ErrorChunk) -> bytes:
+    return encoder._frame(b"3:", chunk.error)
+
+
+def _source_frame(encoder: "DataStreamEncoder", chunk: SourceChunk) -> bytes:
+    source_data = {"sourceType": chunk.source_type, "id": chunk.id, "url": chunk.url}
+    if chunk.title is not None:
+        source_data["title"] = chunk.title
+    parent_id = getattr(chunk, "parent_id", None)
+    if parent_id:
+        source_data["parentId"] = parent_id
+    return encoder._frame(b"h:", source_data)
+
+
+def _update_state_frame(
+    encoder: "DataStreamEncoder", chunk: UpdateStateChunk
+) -> bytes:
+    return encoder._frame(b"aui-state:", chunk.operations)
+
+
+def _annotations_frame(encoder: "DataStreamEncoder", chunk: AnnotationsChunk) -> bytes:
+    return encoder._frame(b"8:", chunk.annotations)
+
+
+def _step_start_frame(encoder: "DataStreamEncoder", chunk: StepStartChunk) -> bytes:
+    return encoder._frame(b"f:", {"messageId": chunk.message_id})
+
+
+def _step_finish_frame(encoder: "DataStreamEncoder", chunk: StepFinishChunk) -> bytes:
+    payload = {
+        "finishReason": chunk.finish_reason,
+        "usage": {
+            "inputTokens": chunk.input_tokens,
+            "outputTokens": chunk.output_tokens,
+        },
+        "isContinued": chunk.is_continued,
+    }
+    return encoder._frame(b"e:", payload)
+
+
+def _file_frame(encoder: "DataStreamEncoder", chunk: FileChunk) -> bytes:
+    return encoder._frame(b"k:", {"data": chunk.data, "mimeType": chunk.mime_type})
+
+
+_FRAME_ENCODERS: Dict[type, Callable[["DataStreamEncoder", Any], Optional[bytes]]] = {
+    TextDeltaChunk: _text_delta_frame,
+    ReasoningPartStartChunk: _reasoning_part_start_frame,
+    ReasoningDeltaChunk: _reasoning_delta_frame,
+    ToolCallBeginChunk: _tool_call_begin_frame,
+    ToolCallDeltaChunk: _tool_call_delta_frame,
+    ToolCallArgsTextFinishChunk: _tool_call_args_text_finish_frame,
+    ToolResultChunk: _tool_result_frame,
+    DataChunk: _data_frame,
+    ErrorChunk: _error_frame,
+    SourceChunk: _source_frame,
+    UpdateStateChunk: _update_state_frame,
+    AnnotationsChunk: _annotations_frame,
+    StepStartChunk: _step_start_frame,
+    StepFinishChunk: _step_finish_frame,
+    FileChunk: _file_frame,
+}
+
+_FRAME_ENCODERS_BY_TYPE = {
+    chunk_cls.TYPE: encode for chunk_cls, encode in _FRAME_ENCODERS.items()
+}
+
+# Chunk types that open, settle or close tool-call argument streams.
+_TOOL_CALL_TRACKED_TYPES = frozenset(
+    (
+        "step-finish",
+        "error",
+        "tool-call-begin",
+        "tool-result",
+        "tool-call-delta",
+        "tool-call-args-text-finish",
+    )
+)
+
+
+DIALECT_HEADER = "x-assistant-stream-dialect"
+COMPACT_DIALECT = "compact"
+
+# Handles per kind a stream may declare; later ids and paths are sent inline,
+# so a stream with endless distinct paths cannot grow the tables unbounded.
+_MAX_REFS = 4096
+
+_COMPACT_OPS = {"set": "s", "append-text": "a"}
+_VERBOSE_OPS = {code: op_type for op_type, code in _COMPACT_OPS.items()}
+_COMPACT_PREFIXES = frozenset(("aui-ref", "aui-t", "aui-g", "aui-s"))
+
+
+class _CompactRefs:
+    """
+    Handle tables for one stream in the compact dialect.
+
+    A parent id is declared with an `aui-ref` frame the first time it is
+    used and referenced by number afterwards. A state path is declared the
+    second time it is used, since most `set` paths are never repeated while
+    `append-text` paths repeat for every token.
+    """
+
+    def __init__(self) -> None:
+        self._parents: dict[str, int] = {}
+        self._paths: dict[tuple, int] = {}
+        self._seen_paths: set[tuple] = set()
+
+    def frame_encoders(
+        self,
+    ) -> Dict[type, Callable[["DataStreamEncoder", Any], Optional[bytes]]]:
+        return {
+            **_FRAME_ENCODERS,
+            TextDeltaChunk: self._text_delta_frame,
+            ReasoningDeltaChunk: self._reasoning_delta_frame,
+            ToolCallBeginChunk: self._tool_call_begin_frame,
+            UpdateStateChunk: self._update_state_frame,
+        }
+
+    def _parent_ref(
+        self, encoder: "DataStreamEncoder", parent_id: str
+    ) -> tuple[Any, bytes]:
+        ref = self._parents.get(parent_id)
+        if ref is not None:
+            return ref, b""
+        if len(self._parents) >= _MAX_REFS:
+            return None, b""
+        ref = self._parents[parent_id] = len(self._parents)
+        return ref, encoder._frame(b"aui-ref:", {"parentId": parent_id, "ref": ref})
+
+    def _path_ref(
+        self, encoder: "DataStreamEncoder", path: list[str], declared: list[bytes]
+    ) -> Any:
+        key = tuple(path)
+        ref = self._paths.get(key)
+        if ref is not None:
+            return ref
+        if key not in self._seen_paths:
+            self._seen_paths.add(key)
+            return path
+        if len(self._paths) >= _MAX_REFS:
+            return path
+        self._seen_paths.discard(key)
+        ref = self._paths[key] = len(self._paths)
+        declared.append(encoder._frame(b"aui-ref:", {"path": path, "ref": ref}))
+        return ref
+
+    def _text_delta_frame(
+        self, encoder: "DataStreamEncoder", chunk: TextDeltaChunk
+    ) -> bytes:
+        parent_id = getattr(chunk, "parent_id", None)
+        if not parent_id:
+            return _text_delta_frame(encoder, chunk)
+        ref, declare = self._parent_ref(encoder, parent_id)
+        if ref is None:
+            return _text_delta_frame(encoder, chunk)
+        return declare + encoder._frame(b"aui-t:", [ref, chunk.text_delta])
+
+    def _reasoning_delta_frame(
+        self, encoder: "DataStreamEncoder", chunk: ReasoningDeltaChunk
+    ) -> bytes:
+        parent_id = getattr(chunk, "parent_id", None)
+        if not parent_id:
+            return _reasoning_delta_frame(encoder, chunk)
+        ref, declare = self._parent_ref(encoder, parent_id)
+        if ref is None:
+            return _reasoning_delta_frame(encoder, chunk)
+        return declare + encoder._frame(b"aui-g:", [ref, chunk.reasoning_delta])
+
+    def _tool_call_begin_frame(
+        self, encoder: "DataStreamEncoder", chunk: ToolCallBeginChunk
+    ) -> bytes:
+        parent_id = getattr(chunk, "parent_id", None)
+        if not parent_id:
+            return _tool_call_begin_frame(encoder, chunk)
+        ref, declare = self._parent_ref(encoder, parent_id)
+        if ref is None:
+            return _tool_call_begin_frame(encoder, chunk)
+        data = {
+            "toolCallId": chunk.tool_call_id,
+            "toolName": chunk.tool_name,
+            "parentRef": ref,
+        }
+        return declare + encoder._frame(b"b:", data)
+
+    def _update_state_frame(
+        self, encoder: "DataStreamEncoder", chunk: UpdateStateChunk
+    ) -> bytes:
+        if not all(op["type"] in _COMPACT_OPS for op in chunk.operations):
+            return _update_state_frame(encoder, chunk)
+        declared: list[bytes] = []
+        operations = [
+            [
+                _COMPACT_OPS[op["type"]],
+                self._path_ref(encoder, op["path"], declared),
+                op["value"],
+            ]
+            for op in chunk.operations
+        ]
+        return b"".join(declared) + encoder._frame(b"aui-s:", operations)
 
 
 class DataStreamEncoder(StreamEncoder):
+    # Class-level default so subclasses that skip `__init__` still serialize.
+    _serializer: JSONSerializer = StdlibJSONSerializer()
+
+    _offloader: FrameOffloader | None = None
+    _compact = False
+
+    def __init__(
+        self,
+        *,
+        serializer: JSONSerializer | JSONBackend | None = None,
+        offload: OffloadOption = False,
+        offload_stats: OffloadStats | None = None,
+        compact: bool = False,
+    ) -> None:
+        """
+        `serializer` selects the JSON backend: the stdlib (default, byte-exact
+        historical output), "orjson", "msgspec", "auto", or a JSONSerializer.
+
+        `offload` serializes frames whose payload is estimated above a size
+        in bytes in a worker thread: True for DEFAULT_OFFLOAD_THRESHOLD, an
+        int for a custom threshold. Usage is counted in `offload_stats`.
+        Serializers without a GIL-releasing `dumps_cooperative`, such as
+        orjson and msgspec, keep every frame inline.
+
+        `compact` streams the compact dialect, which sends parent ids and
+        repeated state paths once and refers to them by number. Only
+        DataStreamDecoder reads it. It applies to `encode_stream_bytes`;
+        `encode_chunk` has no stream to declare handles in and stays verbose,
+        as do subclasses that override `_encode_frame`.
+        """
+        self._serializer = resolve_json_serializer(serializer)
+        self._compact = compact
+        threshold = resolve_offload_threshold(offload)
+        if threshold is not None and has_cooperative_dumps(self._serializer):
+            self._offloader = FrameOffloader(threshold, offload_stats)
+
+    @property
+    def offload_stats(self) -> OffloadStats | None:
+        """Offload counters, or None when offloading is disabled."""
+        return None if self._offloader is None else self._offloader.stats
+
+    def _frame(self, prefix: bytes, value: Any) -> bytes:
+        return prefix + self._serializer.dumps(value) + b"\n"
+
     def encode_chunk(self, chunk: AssistantStreamChunk) -> str | None:
-        if chunk.type == "text-delta":
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                return f"aui-text-delta:{json.dumps({'textDelta': chunk.text_delta, 'parentId': chunk.parent_id}, cls=StateProxyJSONEncoder)}\n"
-            else:
-                return f"0:{json.dumps(chunk.text_delta, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "reasoning-part-start":
-            if chunk.unstable_summary is None:
+        encoded = DataStreamEncoder._encode_frame(self, chunk)
+        if encoded is None:
+            return None
+        return encoded.decode("utf-8")
+
+    def _encode_frame(self, chunk: AssistantStreamChunk) -> bytes | None:
+        encode = _FRAME_ENCODERS.get(chunk.__class__)
+        if encode is None:
+            # Subclassed or duck-typed chunks fall back to their type tag.
+            encode = _FRAME_ENCODERS_BY_TYPE.get(chunk.type)
+            if encode is None:
                 return None
-            # Reasoning otherwise reaches the wire only through its deltas,
-            # which cannot carry a summary and emit nothing at all for a part
-            # that never appends text.
-            value: dict[str, Any] = {"unstable_summary": chunk.unstable_summary}
-            if chunk.parent_id is not None:
-                value["parentId"] = chunk.parent_id
-            return f"aui-reasoning-part-start:{json.dumps(value, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "reasoning-delta":
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                return f"aui-reasoning-delta:{json.dumps({'reasoningDelta': chunk.reasoning_delta, 'parentId': chunk.parent_id}, cls=StateProxyJSONEncoder)}\n"
-            else:
-                return f"g:{json.dumps(chunk.reasoning_delta, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "tool-call-begin":
-            data = {"toolCallId": chunk.tool_call_id, "toolName": chunk.tool_name}
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                data["parentId"] = chunk.parent_id
-            return f'b:{json.dumps(data, cls=StateProxyJSONEncoder)}\n'
-        elif chunk.type == "tool-call-delta":
-            return f'c:{json.dumps({ "toolCallId": chunk.tool_call_id, "argsTextDelta": chunk.args_text_delta }, cls=StateProxyJSONEncoder)}\n'
-        elif chunk.type == "tool-call-args-text-finish":
-            return f'c:{json.dumps({ "toolCallId": chunk.tool_call_id, "argsTextDelta": chunk.args_text_delta, "isFinal": True }, cls=StateProxyJSONEncoder)}\n'
-        elif chunk.type == "tool-result":
-            res = {"toolCallId": chunk.tool_call_id, "result": chunk.result}
-            if chunk.artifact is not None:
-                res["artifact"] = chunk.artifact
-            if chunk.is_error:
-                res["isError"] = chunk.is_error
-            return f"a:{json.dumps(res, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "data":
-            return f"2:{json.dumps([chunk.data], cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "error":
-            return f"3:{json.dumps(chunk.error, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "source":
-            source_data = {
-                "sourceType": chunk.source_type,
-                "id": chunk.id,
-                "url": chunk.url
-            }
-            if chunk.title is not None:
-                source_data["title"] = chunk.title
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                source_data["parentId"] = chunk.parent_id
-            return f"h:{json.dumps(source_data, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "update-state":
-            return f"aui-state:{json.dumps(chunk.operations, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "annotations":
-            return f"8:{json.dumps(chunk.annotations, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "step-start":
-            return f"f:{json.dumps({'messageId': chunk.message_id}, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "step-finish":
-            payload = {
-                "finishReason": chunk.finish_reason,
-                "usage": {
-                    "inputTokens": chunk.input_tokens,
-                    "outputTokens": chunk.output_tokens,
-                },
-                "isContinued": chunk.is_continued,
-            }
-            return f"e:{json.dumps(payload, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "file":
-            file_data = {"data": chunk.data, "mimeType": chunk.mime_type}
-            return f"k:{json.dumps(file_data, cls=StateProxyJSONEncoder)}\n"
-        return None
+        return encode(self, chunk)
 
     def get_media_type(self) -> str:
         return "text/plain"
@@ -110,6 +404,20 @@ class DataStreamEncoder(StreamEncoder):
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
     ) -> AsyncGenerator[str, None]:
+        async for frame in self._native_bytes(stream):
+            yield frame.decode("utf-8")
+
+    def encode_stream_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        if _overrides(self, DataStreamEncoder, "encode_stream"):
+            # A subclass's `encode_stream` supplies the frames.
+            return StreamEncoder.encode_stream_bytes(self, stream)
+        return self._native_bytes(stream)
+
+    async def _native_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
         open_tool_call_args: dict[str, bool] = {}
         settled_tool_call_args: set[str] = set()
         warned_reasons: set[str] = set()
@@ -122,7 +430,7 @@ class DataStreamEncoder(StreamEncoder):
 
         def finish_tool_call_args(
             tool_call_id: str, args_text_delta: str = ""
-        ) -> list[str]:
+        ) -> list[bytes]:
             has_args_text = open_tool_call_args.pop(tool_call_id, None)
             if has_args_text is None:
                 return []
@@ -130,12 +438,12 @@ class DataStreamEncoder(StreamEncoder):
             if not args_text_delta and not has_args_text:
                 args_text_delta = "{}"
 
-            frames: list[str] = []
+            frames: list[bytes] = []
             # A decoder that predates `isFinal` appends this delta and settles
             # on what it has, and it skips its own empty-object default once
             # any delta has arrived. The frame therefore has to carry the
             # default itself rather than leave it to the decoder.
-            finish = self.encode_chunk(
+            finish = encode_frame(
                 ToolCallArgsTextFinishChunk(
                     tool_call_id=tool_call_id,
                     args_text_delta=args_text_delta,
@@ -145,53 +453,288 @@ class DataStreamEncoder(StreamEncoder):
                 frames.append(finish)
             return frames
 
-        def finish_open_tool_call_args() -> list[str]:
-            frames: list[str] = []
+        def finish_open_tool_call_args() -> list[bytes]:
+            frames: list[bytes] = []
             for tool_call_id in tuple(open_tool_call_args):
                 frames.extend(finish_tool_call_args(tool_call_id))
             return frames
 
+        encode_frame = _frame_encoder(self, DataStreamEncoder)
+        # Skip the `_encode_frame` hop unless a subclass customizes it.
+        frame_encoders = (
+            _FRAME_ENCODERS
+            if not _overrides(self, DataStreamEncoder, "_encode_frame")
+            and not _overrides(self, DataStreamEncoder, "encode_chunk")
+            else {}
+        )
+        if self._compact and frame_encoders:
+            frame_encoders = _CompactRefs().frame_encoders()
+        offloader = self._offloader
+        if offloader is not None:
+            # Offloaded frames are built by a copy of this encoder whose
+            # serializer lets the event loop run while it works.
+            worker = copy.copy(self)
+            worker._serializer = CooperativeSerializer(self._serializer)
+            worker_encode_frame = _frame_encoder(worker, DataStreamEncoder)
+
+        def encode_frames(chunk: AssistantStreamChunk) -> list[bytes]:
+            encoded = worker_encode_frame(chunk)
+            return [] if encoded is None else [encoded]
+
         async for chunk in stream:
-            if chunk.type in ("step-finish", "error"):
-                for finish in finish_open_tool_call_args():
-                    yield finish
-            if chunk.type == "tool-call-begin":
-                settled_tool_call_args.discard(chunk.tool_call_id)
-                open_tool_call_args[chunk.tool_call_id] = False
-            elif chunk.type == "tool-result":
-                settled_tool_call_args.add(chunk.tool_call_id)
-                open_tool_call_args.pop(chunk.tool_call_id, None)
-            elif chunk.type == "tool-call-delta":
-                if chunk.tool_call_id not in open_tool_call_args:
-                    warn_once(
-                        "settled-tool-call-id"
-                        if chunk.tool_call_id in settled_tool_call_args
-                        else "unknown-tool-call-id",
-                        f"tool-call-delta for {chunk.tool_call_id}",
-                    )
+            chunk_type = chunk.type
+            if chunk_type in _TOOL_CALL_TRACKED_TYPES:
+                if chunk_type in ("step-finish", "error"):
+                    for finish in finish_open_tool_call_args():
+                        yield finish
+                if chunk_type == "tool-call-begin":
+                    settled_tool_call_args.discard(chunk.tool_call_id)
+                    open_tool_call_args[chunk.tool_call_id] = False
+                elif chunk_type == "tool-result":
+                    settled_tool_call_args.add(chunk.tool_call_id)
+                    open_tool_call_args.pop(chunk.tool_call_id, None)
+                elif chunk_type == "tool-call-delta":
+                    if chunk.tool_call_id not in open_tool_call_args:
+                        warn_once(
+                            "settled-tool-call-id"
+                            if chunk.tool_call_id in settled_tool_call_args
+                            else "unknown-tool-call-id",
+                            f"tool-call-delta for {chunk.tool_call_id}",
+                        )
+                        continue
+                    open_tool_call_args[chunk.tool_call_id] = True
+                elif chunk_type == "tool-call-args-text-finish":
+                    for frame in finish_tool_call_args(
+                        chunk.tool_call_id, chunk.args_text_delta
+                    ):
+                        yield frame
                     continue
-                open_tool_call_args[chunk.tool_call_id] = True
-            elif chunk.type == "tool-call-args-text-finish":
-                frames = finish_tool_call_args(
-                    chunk.tool_call_id, chunk.args_text_delta
-                )
-                if not frames:
-                    continue
-                for frame in frames:
+            if offloader is not None and offloader.is_large(chunk):
+                chunk = offloader.snapshot(chunk)
+                for frame in await offloader.run(encode_frames, chunk):
                     yield frame
                 continue
-            encoded = self.encode_chunk(chunk)
-            if encoded is None:
-                continue
-            yield encoded
+            encode = frame_encoders.get(chunk.__class__)
+            encoded = (
+                encode_frame(chunk) if encode is None else encode(self, chunk)
+            )
+            if encoded is not None:
+                yield encoded
         for finish in finish_open_tool_call_args():
             yield finish
 
 
+def _decode_data_stream_value(
+    prefix: str, value: Any
+) -> list[AssistantStreamChunk] | None:
+    if prefix == "0":
+        return [TextDeltaChunk(text_delta=value)]
+    elif prefix == "aui-text-delta":
+        return [
+            TextDeltaChunk(
+                text_delta=value["textDelta"], parent_id=value.get("parentId")
+            )
+        ]
+    elif prefix == "aui-reasoning-part-start":
+        return [
+            ReasoningPartStartChunk(
+                unstable_summary=value.get("unstable_summary"),
+                parent_id=value.get("parentId"),
+            )
+        ]
+    elif prefix == "aui-reasoning-delta":
+        return [
+            ReasoningDeltaChunk(
+                reasoning_delta=value["reasoningDelta"],
+                parent_id=value.get("parentId"),
+            )
+        ]
+    elif prefix == "g":
+        return [ReasoningDeltaChunk(reasoning_delta=value)]
+    elif prefix == "b":
+        return [
+            ToolCallBeginChunk(
+                tool_call_id=value["toolCallId"],
+                tool_name=value["toolName"],
+                parent_id=value.get("parentId"),
+            )
+        ]
+    elif prefix == "c":
+        if value.get("isFinal"):
+            return [
+                ToolCallArgsTextFinishChunk(
+                    tool_call_id=value["toolCallId"],
+                    args_text_delta=value.get("argsTextDelta", ""),
+                )
+            ]
+        return [
+            ToolCallDeltaChunk(
+                tool_call_id=value["toolCallId"],
+                args_text_delta=value["argsTextDelta"],
+            )
+        ]
+    elif prefix == "a":
+        return [
+            ToolResultChunk(
+                tool_call_id=value["toolCallId"],
+                result=value.get("result"),
+                artifact=value.get("artifact"),
+                is_error=value.get("isError", False),
+            )
+        ]
+    elif prefix == "2":
+        if not isinstance(value, list):
+            raise TypeError("data must be an array")
+        return [DataChunk(data=item) for item in value]
+    elif prefix == "3":
+        return [ErrorChunk(error=value)]
+    elif prefix == "h":
+        return [
+            SourceChunk(
+                id=value["id"],
+                url=value["url"],
+                source_type=value.get("sourceType", "url"),
+                title=value.get("title"),
+                parent_id=value.get("parentId"),
+            )
+        ]
+    elif prefix == "aui-state":
+        return [UpdateStateChunk(operations=value)]
+    elif prefix == "8":
+        return [AnnotationsChunk(annotations=value)]
+    elif prefix == "f":
+        return [StepStartChunk(message_id=value["messageId"])]
+    elif prefix == "e":
+        usage = value.get("usage") or {}
+        return [
+            StepFinishChunk(
+                finish_reason=value["finishReason"],
+                input_tokens=usage.get("inputTokens", 0),
+                output_tokens=usage.get("outputTokens", 0),
+                is_continued=value.get("isContinued", False),
+            )
+        ]
+    elif prefix == "k":
+        return [FileChunk(data=value["data"], mime_type=value["mimeType"])]
+    return None
+
+
+class DataStreamDecoder(StreamDecoder):
+    """
+    Decodes the data-stream wire format produced by DataStreamEncoder, in
+    either dialect. Blank keepalive lines are skipped; lines that cannot be
+    decoded are dropped with a warning, like the TS DataStreamChunkDecoder.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._warned_reasons: set[str] = set()
+        # Handles declared by a compact-dialect stream.
+        self._parent_refs: dict[int, str] = {}
+        self._path_refs: dict[int, list[str]] = {}
+
+    def _warn_once(self, reason: str, line: bytes) -> None:
+        if reason in self._warned_reasons:
+            return
+        self._warned_reasons.add(reason)
+        logger.warning(
+            "Dropped invalid data-stream chunk (%s): %s",
+            reason,
+            line[:200].decode("utf-8", "replace"),
+        )
+
+    def _decode_line(self, line: bytes) -> list[AssistantStreamChunk]:
+        prefix, sep, payload = line.partition(b":")
+        if not sep:
+            if line.strip():
+                self._warn_once("missing-prefix", line)
+            return []
+        try:
+            value = json.loads(payload)
+        except ValueError:
+            self._warn_once("unparseable", line)
+            return []
+        name = prefix.decode("utf-8", "replace")[:40]
+        try:
+            if name in _COMPACT_PREFIXES:
+                chunks = self._decode_compact(name, value)
+            else:
+                if isinstance(value, dict) and "parentRef" in value:
+                    value["parentId"] = self._parent_refs[value.pop("parentRef")]
+                chunks = _decode_data_stream_value(name, value)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            self._warn_once(f"invalid-fields:{name}", line)
+            return []
+        if chunks is None:
+            self._warn_once(f"unknown-type:{name}", line)
+            return []
+        return chunks
+
+    def _decode_compact(self, prefix: str, value: Any) -> list[AssistantStreamChunk]:
+        if prefix == "aui-ref":
+            if "parentId" in value:
+                self._parent_refs[value["ref"]] = value["parentId"]
+            else:
+                self._path_refs[value["ref"]] = value["path"]
+            return []
+        if prefix == "aui-t":
+            ref, text_delta = value
+            return [
+                TextDeltaChunk(text_delta=text_delta, parent_id=self._parent_refs[ref])
+            ]
+        if prefix == "aui-g":
+            ref, reasoning_delta = value
+            return [
+                ReasoningDeltaChunk(
+                    reasoning_delta=reasoning_delta,
+                    parent_id=self._parent_refs[ref],
+                )
+            ]
+        operations: list[Any] = []
+        for code, path, op_value in value:
+            if not isinstance(path, list):
+                path = self._path_refs[path]
+            operations.append(
+                {"type": _VERBOSE_OPS[code], "path": path, "value": op_value}
+            )
+        return [UpdateStateChunk(operations=operations)]
+
+
 class DataStreamResponse(AssistantStreamResponse):
+    """
+    Streams the data-stream format. With `compact=True`, a request that
+    sends `X-Assistant-Stream-Dialect: compact` gets the compact dialect,
+    confirmed by the same response header; other requests get the verbose
+    one.
+    """
+
     def __init__(
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
         heartbeat: HeartbeatOption = False,
+        coalesce: CoalesceOption = False,
+        compression: CompressionOption = False,
+        compact: bool = False,
     ):
-        super().__init__(stream, DataStreamEncoder(), heartbeat=heartbeat)
+        self._encoder = DataStreamEncoder()
+        self._compact = compact
+        super().__init__(
+            stream,
+            self._encoder,
+            heartbeat=heartbeat,
+            coalesce=coalesce,
+            compression=compression,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._compact and scope["type"] == "http":
+            self.headers.add_vary_header(DIALECT_HEADER)
+            requested = Headers(scope=scope).get(DIALECT_HEADER, "")
+            if COMPACT_DIALECT in (
+                token.strip().lower() for token in requested.split(",")
+            ):
+                # The body has not started yet, so the encoder can still
+                # switch dialects.
+                self._encoder._compact = True
+                self.headers[DIALECT_HEADER] = COMPACT_DIALECT
+        await super().__call__(scope, receive, send)
@@ -1,6 +1,17 @@
 import asyncio
 import math
-from typing import AsyncGenerator, Optional, Union
+import weakref
+from collections import deque
+from typing import (
+    AsyncGenerator,
+    Deque,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 DEFAULT_HEARTBEAT_INTERVAL = 15.0
 
@@ -10,6 +21,14 @@ DATA_STREAM_KEEPALIVE_LINE = "\n"
 
 HeartbeatOption = Union[float, int, bool, None]
 
+Frame = TypeVar("Frame", str, bytes)
+
+# Keepalives fire between `interval` and `interval + 2 * resolution` after the
+# last write, where resolution is `min(MAX_HEARTBEAT_RESOLUTION, interval / 4)`.
+MAX_HEARTBEAT_RESOLUTION = 1.0
+
+_WHEEL_SLOTS = 256
+
 
 def resolve_heartbeat_interval(
     heartbeat: HeartbeatOption,
@@ -30,38 +49,197 @@ def resolve_heartbeat_interval(
     return interval
 
 
+class _TimerWheel:
+    """
+    Hashed timer wheel shared by every keepalive stream on an event loop
+    with the same resolution. One loop timer drives the whole wheel; streams
+    record their last write as a tick number and are only looked at when
+    their slot comes round, so frames never touch the wheel.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, resolution: float) -> None:
+        self._loop = loop
+        self._resolution = resolution
+        self._slots: List[List["_KeepaliveChannel"]] = [
+            [] for _ in range(_WHEEL_SLOTS)
+        ]
+        self._origin = loop.time()
+        self._size = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._advancing = False
+        self.tick = 0
+
+    def ticks_for(self, interval: float) -> int:
+        # One extra tick covers a last write recorded against a stale tick.
+        return math.ceil(interval / self._resolution - 1e-9) + 1
+
+    def now(self) -> int:
+        """The wheel's current tick, caught up to the clock if it is idle."""
+        if self._handle is None and not self._advancing:
+            # Only an idle wheel may jump to the current tick; while
+            # `_advance` runs, the overdue slots ahead are still to be walked.
+            self.tick = self._current_tick()
+        return self.tick
+
+    def schedule(self, channel: "_KeepaliveChannel", due_tick: int) -> None:
+        idle = self._handle is None and not self._advancing
+        due_tick = max(due_tick, self.now() + 1)
+        self._slots[due_tick % _WHEEL_SLOTS].append(channel)
+        self._size += 1
+        if idle:
+            self._arm()
+
+    def _current_tick(self) -> int:
+        return int((self._loop.time() - self._origin) / self._resolution)
+
+    def _arm(self) -> None:
+        self._handle = self._loop.call_at(
+            self._origin + (self.tick + 1) * self._resolution, self._advance
+        )
+
+    def _advance(self) -> None:
+        self._handle = None
+        self._advancing = True
+        try:
+            now_tick = self._current_tick()
+            while self.tick < now_tick:
+                self.tick += 1
+                index = self.tick % _WHEEL_SLOTS
+                slot = self._slots[index]
+                if not slot:
+                    continue
+                self._slots[index] = []
+                self._size -= len(slot)
+                for channel in slot:
+                    channel._on_tick(self)
+        finally:
+            self._advancing = False
+        if self._size:
+            self._arm()
+
+
+_wheels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[float, _TimerWheel]]"
+_wheels = weakref.WeakKeyDictionary()
+
+
+def _get_wheel(interval: float) -> _TimerWheel:
+    loop = asyncio.get_running_loop()
+    resolution = min(MAX_HEARTBEAT_RESOLUTION, interval / 4)
+    wheels = _wheels.setdefault(loop, {})
+    wheel = wheels.get(resolution)
+    if wheel is None:
+        wheel = wheels[resolution] = _TimerWheel(loop, resolution)
+    return wheel
+
+
+class _KeepaliveChannel(Generic[Frame]):
+    """Hands frames from a single pump task to the consumer one at a time,
+    substituting the keepalive token when the wheel finds the stream idle."""
+
+    def __init__(
+        self, stream: AsyncGenerator[Frame, None], interval: float, token: Frame
+    ) -> None:
+        self._stream = stream
+        self._token = token
+        self._loop = asyncio.get_running_loop()
+        self._frames: Deque[Frame] = deque()
+        self._done = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._keepalive_due = False
+        self._data_waiter: Optional[asyncio.Future[None]] = None
+        self._space_waiter: Optional[asyncio.Future[None]] = None
+        self._wheel = _get_wheel(interval)
+        self._interval_ticks = self._wheel.ticks_for(interval)
+        self._last_tick = self._wheel.now()
+        self._wheel.schedule(self, self._last_tick + self._interval_ticks)
+        self._task = self._loop.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for frame in self._stream:
+                self._frames.append(frame)
+                self._last_tick = self._wheel.tick
+                self._keepalive_due = False
+                _wake(self._data_waiter)
+                # Read at most one frame ahead, like awaiting the stream
+                # directly.
+                self._space_waiter = self._loop.create_future()
+                await self._space_waiter
+        except asyncio.CancelledError:
+            raise
+        except BaseException as err:
+            self._error = err
+        finally:
+            self._done = True
+            _wake(self._data_waiter)
+
+    def _on_tick(self, wheel: _TimerWheel) -> None:
+        if self._closed or self._done:
+            return
+        due_tick = self._last_tick + self._interval_ticks
+        if wheel.tick >= due_tick:
+            self._keepalive_due = True
+            self._last_tick = wheel.tick
+            _wake(self._data_waiter)
+            due_tick = wheel.tick + self._interval_ticks
+        wheel.schedule(self, due_tick)
+
+    async def next(self) -> Frame:
+        while True:
+            if self._frames:
+                frame = self._frames.popleft()
+                _wake(self._space_waiter)
+                return frame
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+            if self._keepalive_due:
+                self._keepalive_due = False
+                return self._token
+            self._data_waiter = self._loop.create_future()
+            try:
+                await self._data_waiter
+            finally:
+                self._data_waiter = None
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.wait({self._task})
+        await self._stream.aclose()
+
+
+def _wake(future: Optional["asyncio.Future[None]"]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
 async def add_keepalive(
-    stream: AsyncGenerator[str, None],
+    stream: AsyncGenerator[Frame, None],
     interval: float,
-    token: str,
-) -> AsyncGenerator[str, None]:
+    token: Frame,
+) -> AsyncGenerator[Frame, None]:
     """
     Yield `token` as a keepalive whenever the encoded stream is idle for
     `interval` seconds. Any real chunk resets the timer.
+
+    Idle detection runs on a timer wheel shared by all streams on the event
+    loop, ticking at `min(1s, interval / 4)`, so keepalives may arrive up to
+    two ticks late.
     """
-    task: Optional[asyncio.Task] = None
+    channel = _KeepaliveChannel(stream, interval, token)
     try:
         while True:
-            if task is None:
-                task = asyncio.create_task(stream.__anext__())
-            done, _ = await asyncio.wait({task}, timeout=interval)
-            if not done:
-                yield token
-                continue
             try:
-                item = task.result()
+                frame = await channel.next()
             except StopAsyncIteration:
-                task = None
                 return
-            task = None
-            yield item
+            yield frame
     finally:
-        if task is not None:
-            task.cancel()
-            await asyncio.wait({task})
-            if not task.cancelled():
-                task.exception()  # retrieve the outcome so asyncio does not log "Task exception was never retrieved"
-        await stream.aclose()
+        await channel.aclose()
 
 
 def add_sse_heartbeat(
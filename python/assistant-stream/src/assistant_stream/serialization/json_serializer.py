@@ -0,0 +1,158 @@
+"""JSON serializers used by the stream encoders.
+
+Encoders call `dumps` once per frame, so it dominates CPU for state-heavy
+streams. The stdlib serializer reproduces the historical wire bytes exactly
+(`", "`/`": "` separators) and stays the default. orjson and msgspec
+serializers are opt-in: their output is compact JSON that parses to the same
+values but is not byte-identical, so they are never picked implicitly.
+"""
+
+import dataclasses
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Literal, Union
+
+from assistant_stream.state import StateProxy
+
+JSONBackend = Literal["stdlib", "orjson", "msgspec", "auto"]
+
+
+def _unwrap(obj: Any) -> Any:
+    if isinstance(obj, StateProxy):
+        return obj._get_value()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class StateProxyJSONEncoder(json.JSONEncoder):
+    """Custom JSON encoder that can handle StateProxy objects."""
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, StateProxy):
+            return obj._get_value()
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return _unwrap(obj)
+        return super().default(obj)
+
+
+class JSONSerializer(ABC):
+    """Serializes a frame payload to UTF-8 JSON.
+
+    Implementations unwrap StateProxy values and serialize dataclass
+    instances as objects of their fields.
+    """
+
+    name: str
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+    def dumps_cooperative(self, value: Any) -> bytes:
+        """
+        Like `dumps`, for frames serialized in a worker thread: serializers
+        that can should periodically release the GIL so the event loop keeps
+        running. Defaults to `dumps`.
+        """
+        return self.dumps(value)
+
+
+class StdlibJSONSerializer(JSONSerializer):
+    name = "stdlib"
+
+    def __init__(self, *, ensure_ascii: bool = True, compact: bool = False) -> None:
+        # One encoder instance per serializer; `json.dumps(cls=...)` builds a
+        # fresh one for every frame.
+        self._encoder = StateProxyJSONEncoder(
+            ensure_ascii=ensure_ascii,
+            separators=(",", ":") if compact else None,
+        )
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value).encode("utf-8")
+
+    def dumps_cooperative(self, value: Any) -> bytes:
+        # The C encoder holds the GIL for the whole document. The pure-Python
+        # iterencode path yields it every switch interval and produces the
+        # same bytes, at roughly a quarter of the speed.
+        if isinstance(value, str):
+            return self.dumps(value)
+        return "".join(self._encoder.iterencode(value)).encode("utf-8")
+
+
+class OrjsonSerializer(JSONSerializer):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._fallback = StdlibJSONSerializer(ensure_ascii=False, compact=True)
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return self._dumps(value, default=_unwrap, option=self._option)
+        except TypeError:
+            # orjson rejects integers beyond 64 bits and some subclasses that
+            # the stdlib accepts; keep those frames on the wire.
+            return self._fallback.dumps(value)
+
+
+class MsgspecSerializer(JSONSerializer):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encode = msgspec.json.Encoder(enc_hook=_unwrap).encode
+        self._fallback = StdlibJSONSerializer(ensure_ascii=False, compact=True)
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return self._encode(value)
+        except (TypeError, OverflowError):
+            return self._fallback.dumps(value)
+
+
+def resolve_json_serializer(
+    serializer: Union[JSONSerializer, JSONBackend, None] = None,
+    *,
+    ensure_ascii: bool = True,
+) -> JSONSerializer:
+    """
+    Resolve an encoder's `serializer` option.
+
+    None and "stdlib" keep the byte-exact stdlib output; "orjson" and
+    "msgspec" require the package; "auto" picks the first one installed and
+    falls back to the stdlib. `ensure_ascii` only affects the stdlib serializer.
+    """
+    if isinstance(serializer, JSONSerializer):
+        return serializer
+    if serializer is None or serializer == "stdlib":
+        return StdlibJSONSerializer(ensure_ascii=ensure_ascii)
+    if serializer == "orjson":
+        return OrjsonSerializer()
+    if serializer == "msgspec":
+        return MsgspecSerializer()
+    if serializer == "auto":
+        for backend in (OrjsonSerializer, MsgspecSerializer):
+            try:
+                return backend()
+            except ImportError:
+                continue
+        return StdlibJSONSerializer(ensure_ascii=ensure_ascii)
+    raise ValueError(f"Unknown JSON serializer: {serializer!r}")
+
+
+def available_json_backends() -> list[str]:
+    """Names of the serializer backends importable in this environment."""
+    backends = ["stdlib"]
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        backends.append(name)
+    return backends
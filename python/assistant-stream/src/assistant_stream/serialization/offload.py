@@ -0,0 +1,269 @@
+"""Serializing large frames off the event loop.
+
+One `dumps` of a multi-megabyte state update or tool result blocks the loop,
+and every other connection on the worker, for tens of milliseconds.
+Encoders with an offload threshold estimate the payload of chunks that can
+carry large values and serialize those in a worker thread. The stream awaits
+each offloaded frame before reading on, so frame order is unchanged; small
+frames stay inline.
+
+The worker never sees values the loop can still change. Payloads, state
+update values included, can share objects with the caller, so they are
+snapshotted on the loop first, with state proxies resolved to their current
+values, and stay inline when copying them would cost more than encoding them.
+
+Offloading only helps a serializer whose `dumps_cooperative` releases the
+GIL while it works, as the stdlib one does. orjson and msgspec encode in one
+GIL-holding call, which would block the loop from a worker just as long, so
+encoders using them serialize every frame inline.
+"""
+
+import asyncio
+import copy
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from assistant_stream.assistant_stream_chunk import (
+    AnnotationsChunk,
+    AssistantStreamChunk,
+    DataChunk,
+    FileChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization.json_serializer import JSONSerializer
+from assistant_stream.state import StateProxy
+
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+
+OffloadOption = Union[int, bool, None]
+
+# Items of a container measured before the rest is extrapolated.
+_SAMPLE = 32
+
+# Offloading snapshots the payload on the loop, which costs about as much
+# per container as the C encoder spends on 40 bytes of output. Payloads
+# with fewer bytes per container than this serialize inline: copying them
+# would block the loop longer than encoding them there.
+_MIN_BYTES_PER_CONTAINER = 64
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+# Chunk classes whose fields can hold arbitrarily large values; text and
+# tool-call deltas are small by construction and never estimated.
+_PAYLOAD_FIELDS: Dict[type, Tuple[str, ...]] = {
+    UpdateStateChunk: ("operations",),
+    ToolResultChunk: ("result", "artifact"),
+    DataChunk: ("data",),
+    FileChunk: ("data",),
+    AnnotationsChunk: ("annotations",),
+}
+
+# _PAYLOAD_FIELDS resolved for each concrete chunk class seen, subclasses
+# included.
+_PAYLOAD_FIELDS_BY_CLASS: Dict[type, Optional[Tuple[str, ...]]] = dict(
+    _PAYLOAD_FIELDS
+)
+
+
+def _payload_fields(chunk_cls: type) -> Optional[Tuple[str, ...]]:
+    try:
+        return _PAYLOAD_FIELDS_BY_CLASS[chunk_cls]
+    except KeyError:
+        fields = next(
+            (
+                fields
+                for base, fields in _PAYLOAD_FIELDS.items()
+                if issubclass(chunk_cls, base)
+            ),
+            None,
+        )
+        _PAYLOAD_FIELDS_BY_CLASS[chunk_cls] = fields
+        return fields
+
+
+def resolve_offload_threshold(offload: OffloadOption) -> Optional[int]:
+    """
+    Normalize an offload option to a payload size in bytes.
+
+    True uses DEFAULT_OFFLOAD_THRESHOLD; a positive integer sets the
+    threshold; False and None keep every frame inline.
+    """
+    if offload is True:
+        return DEFAULT_OFFLOAD_THRESHOLD
+    if offload is False or offload is None:
+        return None
+    if not isinstance(offload, int) or offload <= 0:
+        raise ValueError(f"offload threshold must be a positive integer, got {offload!r}")
+    return offload
+
+
+@dataclass
+class OffloadStats:
+    """How often and how long an encoder serialized frames in a worker.
+
+    Pass one instance to several encoders to aggregate across streams.
+    """
+
+    offloaded_frames: int = 0
+    offloaded_bytes: int = 0
+    # Time spent serializing in worker threads, and the longest single frame.
+    offload_seconds: float = 0.0
+    max_offload_seconds: float = 0.0
+
+    def record(self, size: int, seconds: float) -> None:
+        self.offloaded_frames += 1
+        self.offloaded_bytes += size
+        self.offload_seconds += seconds
+        if seconds > self.max_offload_seconds:
+            self.max_offload_seconds = seconds
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the serialized size of a JSON-like value. Containers longer
+    than a few dozen items are extrapolated from their first items, so the
+    estimate costs about the same for a hundred rows as for a million.
+    """
+    return _estimate(value)[0]
+
+
+def _estimate(value: Any) -> Tuple[int, int]:
+    # (serialized size, number of containers), sampled like estimate_size.
+    if isinstance(value, str):
+        return len(value) + 2, 0
+    if isinstance(value, dict):
+        size = containers = 0
+        for key, item in islice(value.items(), _SAMPLE):
+            if isinstance(key, str):
+                item_size, item_containers = _estimate(item)
+                size += len(key) + 4 + item_size
+                containers += item_containers
+            else:
+                size += 12
+        length = len(value)
+        return 2 + _extrapolate(size, length), 1 + _extrapolate(containers, length)
+    if isinstance(value, (list, tuple)):
+        size = containers = 0
+        for item in islice(value, _SAMPLE):
+            item_size, item_containers = _estimate(item)
+            size += item_size + 2
+            containers += item_containers
+        length = len(value)
+        return 2 + _extrapolate(size, length), 1 + _extrapolate(containers, length)
+    if isinstance(value, StateProxy):
+        return _estimate(value._get_value())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value), 0
+    return 8, 0
+
+
+def _extrapolate(sample: int, length: int) -> int:
+    if length <= _SAMPLE:
+        return sample
+    return sample * length // _SAMPLE
+
+
+def snapshot(value: Any) -> Any:
+    """
+    Copy the containers of a JSON-like value, resolving state proxies to
+    their current values, so a worker can serialize it while the loop goes
+    on changing the original. Scalars and other objects are shared.
+    """
+    cls = value.__class__
+    # Exact types first: plain dicts and lists of scalars are the bulk of
+    # any payload, and skipping the call per scalar halves the copy.
+    if cls is dict:
+        return {
+            key: item if item.__class__ in _SCALARS else snapshot(item)
+            for key, item in value.items()
+        }
+    if cls is list:
+        return [item if item.__class__ in _SCALARS else snapshot(item) for item in value]
+    if cls in _SCALARS:
+        return value
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [snapshot(item) for item in value]
+    if isinstance(value, StateProxy):
+        return snapshot(value._get_value())
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+
+def has_cooperative_dumps(serializer: JSONSerializer) -> bool:
+    """Whether `serializer` overrides `dumps_cooperative`, so offloaded
+    frames let the event loop run while they are serialized."""
+    cls = type(serializer)
+    return cls.dumps_cooperative is not JSONSerializer.dumps_cooperative
+
+
+class CooperativeSerializer(JSONSerializer):
+    """Routes `dumps` to the wrapped serializer's `dumps_cooperative`, for
+    encoder code that runs in a worker thread."""
+
+    def __init__(self, serializer: JSONSerializer) -> None:
+        self.name = serializer.name
+        self._serializer = serializer
+
+    def dumps(self, value: Any) -> bytes:
+        return self._serializer.dumps_cooperative(value)
+
+
+class FrameOffloader:
+    """Decides which chunks to serialize off the loop and runs them."""
+
+    def __init__(
+        self,
+        threshold: int,
+        stats: Optional[OffloadStats] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.stats = stats if stats is not None else OffloadStats()
+        self._executor = executor
+
+    def is_large(self, chunk: AssistantStreamChunk) -> bool:
+        """Whether the chunk's payload is over the threshold and cheap
+        enough to snapshot that serializing it off the loop pays."""
+        fields = _payload_fields(chunk.__class__)
+        if fields is None:
+            return False
+        size = containers = 0
+        for field in fields:
+            field_size, field_containers = _estimate(getattr(chunk, field))
+            size += field_size
+            containers += field_containers
+        return (
+            size > self.threshold
+            and size >= containers * _MIN_BYTES_PER_CONTAINER
+        )
+
+    def snapshot(self, chunk: AssistantStreamChunk) -> AssistantStreamChunk:
+        """A copy of a large chunk whose payload the loop can no longer
+        change; call on the loop before handing the chunk to `run`."""
+        chunk = copy.copy(chunk)
+        for field in _payload_fields(chunk.__class__):
+            setattr(chunk, field, snapshot(getattr(chunk, field)))
+        return chunk
+
+    async def run(
+        self, encode: Callable[..., List[bytes]], *args: Any
+    ) -> List[bytes]:
+        """Run `encode(*args)` in a worker and record its time and output."""
+
+        def timed() -> Tuple[List[bytes], float]:
+            start = time.perf_counter()
+            frames = encode(*args)
+            return frames, time.perf_counter() - start
+
+        frames, seconds = await asyncio.get_running_loop().run_in_executor(
+            self._executor, timed
+        )
+        self.stats.record(sum(len(frame) for frame in frames), seconds)
+        return frames
@@ -1,17 +1,35 @@
-from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
-import json
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    ReasoningDeltaChunk,
+    StepFinishChunk,
+    TextDeltaChunk,
+    ToolCallArgsTextFinishChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+)
 import time
 import string
 import random
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Dict
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.coalesce import CoalesceOption
+from assistant_stream.serialization.compression import CompressionOption
 from assistant_stream.serialization.heartbeat import (
     SSE_HEARTBEAT_LINE,
     HeartbeatOption,
 )
-from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.json_serializer import (
+    JSONBackend,
+    JSONSerializer,
+    resolve_json_serializer,
+)
+from assistant_stream.serialization.stream_encoder import (
+    StreamEncoder,
+    _frame_encoder,
+    _overrides,
+)
 
 
 def generate_openai_style_id():
@@ -21,12 +39,55 @@ def generate_openai_style_id():
     return prefix + random_id
 
 
+# assistant-stream finish reasons mapped onto OpenAI's enum. Reasons it has
+# no value for ("error", "other", "unknown") are sent as "stop".
+_FINISH_REASONS = {
+    "stop": "stop",
+    "length": "length",
+    "tool-calls": "tool_calls",
+    "content-filter": "content_filter",
+}
+
+# Stands in for the delta while the constant envelope is serialized.
+_DELTA_SLOT = "\x00delta\x00"
+
+
 class OpenAIStreamEncoder(StreamEncoder):
-    def __init__(self, model="assistant_stream", system_fingerprint="fp_0000000000"):
+    """
+    Encodes an assistant stream as OpenAI `chat.completion.chunk` events.
+
+    Text, reasoning (as `reasoning_content`) and tool calls become deltas,
+    the last `StepFinishChunk` sets the final `finish_reason`, and with
+    `include_usage` (OpenAI's `stream_options.include_usage`) reported token
+    counts are sent as a usage chunk before `[DONE]`. The envelope
+    (id, model, fingerprint, `created`) is constant for the stream and
+    serialized once; each token only serializes its delta.
+    """
+
+    def __init__(
+        self,
+        model="assistant_stream",
+        system_fingerprint="fp_0000000000",
+        *,
+        serializer: JSONSerializer | JSONBackend | None = None,
+        include_usage: bool = False,
+    ):
         self.id = generate_openai_style_id()
         self.model = model
         self.system_fingerprint = system_fingerprint
-        pass
+        self.created = int(time.time())
+        self.include_usage = include_usage
+        self._serializer = resolve_json_serializer(serializer, ensure_ascii=False)
+        self._templates: dict[str | None, tuple[bytes, bytes]] = {}
+        self._reset_stream_state()
+
+    def _reset_stream_state(self) -> None:
+        # Tool-call indices, the finish reason and usage describe one
+        # stream; each stream starts from scratch.
+        self._tool_call_indices: dict[str, int] = {}
+        self._finish_reason = "stop"
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
 
     def get_media_type(self) -> str:
         return "text/event-stream"
@@ -34,34 +95,108 @@ class OpenAIStreamEncoder(StreamEncoder):
     def get_keepalive_token(self) -> str:
         return SSE_HEARTBEAT_LINE
 
-    def _create_chunk(self, delta={}, finish_reason=None):
-        response = {
+    def _envelope(self) -> dict:
+        return {
             "id": self.id,
             "object": "chat.completion.chunk",
-            "created": int(time.time()),
+            "created": self.created,
             "model": self.model,
             "system_fingerprint": self.system_fingerprint,
-            "choices": [
+        }
+
+    def _template(self, finish_reason: str | None) -> tuple[bytes, bytes]:
+        template = self._templates.get(finish_reason)
+        if template is None:
+            envelope = self._envelope()
+            envelope["choices"] = [
                 {
                     "index": 0,
-                    "delta": delta,
+                    "delta": _DELTA_SLOT,
                     "logprobs": None,
                     "finish_reason": finish_reason,
                 }
-            ],
+            ]
+            encoded = self._serializer.dumps(envelope)
+            prefix, suffix = encoded.split(self._serializer.dumps(_DELTA_SLOT))
+            template = self._templates[finish_reason] = (
+                b"data: " + prefix,
+                suffix + b"\n\n",
+            )
+        return template
+
+    def _create_chunk(self, delta={}, finish_reason=None) -> str:
+        return self._create_frame(delta, finish_reason).decode("utf-8")
+
+    def _create_frame(self, delta={}, finish_reason=None) -> bytes:
+        prefix, suffix = self._template(finish_reason)
+        return prefix + self._serializer.dumps(delta) + suffix
+
+    def _create_usage_frame(self) -> bytes:
+        response = self._envelope()
+        response["choices"] = []
+        response["usage"] = {
+            "prompt_tokens": self._prompt_tokens,
+            "completion_tokens": self._completion_tokens,
+            "total_tokens": self._prompt_tokens + self._completion_tokens,
         }
-        return f"data: {json.dumps(response, ensure_ascii=False)}\n\n"
+        return b"data: " + self._serializer.dumps(response) + b"\n\n"
+
+    def _tool_call_delta(self, tool_call_id: str, function: dict, **fields) -> dict:
+        index = self._tool_call_indices.get(tool_call_id)
+        if index is None:
+            index = self._tool_call_indices[tool_call_id] = len(
+                self._tool_call_indices
+            )
+        return {"tool_calls": [{"index": index, **fields, "function": function}]}
 
     def encode_chunk(self, chunk: AssistantStreamChunk) -> str:
         """
         Encodes the chunk into OpenAI's SSE format.
         """
-        if chunk.type == "text-delta":
-            # Construct the delta for text content
-            return self._create_chunk({"content": chunk.text_delta})
-        else:
-            # Handle unknown chunk types gracefully
-            return ""
+        return OpenAIStreamEncoder._encode_frame(self, chunk).decode("utf-8")
+
+    def _encode_frame(self, chunk: AssistantStreamChunk) -> bytes:
+        encode = _FRAME_ENCODERS.get(chunk.__class__)
+        if encode is None:
+            # Subclassed or duck-typed chunks fall back to their type tag.
+            encode = _FRAME_ENCODERS_BY_TYPE.get(chunk.type)
+            if encode is None:
+                # Chunk types without an OpenAI equivalent are dropped.
+                return b""
+        return encode(self, chunk)
+
+    def _content_frame(self, chunk: TextDeltaChunk) -> bytes:
+        return self._create_frame({"content": chunk.text_delta})
+
+    def _reasoning_frame(self, chunk: ReasoningDeltaChunk) -> bytes:
+        return self._create_frame({"reasoning_content": chunk.reasoning_delta})
+
+    def _tool_call_begin_frame(self, chunk: ToolCallBeginChunk) -> bytes:
+        return self._create_frame(
+            self._tool_call_delta(
+                chunk.tool_call_id,
+                {"name": chunk.tool_name, "arguments": ""},
+                id=chunk.tool_call_id,
+                type="function",
+            )
+        )
+
+    def _tool_call_args_frame(
+        self, chunk: ToolCallDeltaChunk | ToolCallArgsTextFinishChunk
+    ) -> bytes:
+        if not chunk.args_text_delta:
+            return b""
+        return self._create_frame(
+            self._tool_call_delta(
+                chunk.tool_call_id, {"arguments": chunk.args_text_delta}
+            )
+        )
+
+    def _step_finish(self, chunk: StepFinishChunk) -> bytes:
+        self._finish_reason = _FINISH_REASONS.get(chunk.finish_reason, "stop")
+        self._prompt_tokens += chunk.input_tokens
+        self._completion_tokens += chunk.output_tokens
+        return b""
 
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
@@ -69,13 +204,48 @@ class OpenAIStreamEncoder(StreamEncoder):
         """
         Asynchronously encodes chunks into SSE-formatted strings.
         """
+        async for frame in self._native_bytes(stream):
+            yield frame.decode("utf-8")
+
+    def encode_stream_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        if _overrides(self, OpenAIStreamEncoder, "encode_stream"):
+            # A subclass's `encode_stream` supplies the frames.
+            return StreamEncoder.encode_stream_bytes(self, stream)
+        return self._native_bytes(stream)
+
+    async def _native_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Asynchronously encodes chunks into SSE-formatted UTF-8 frames.
+        """
+        self._reset_stream_state()
+        encode_frame = _frame_encoder(self, OpenAIStreamEncoder)
         async for chunk in stream:
-            encoded_chunk = self.encode_chunk(chunk)
+            encoded_chunk = encode_frame(chunk)
             if encoded_chunk:
                 yield encoded_chunk
 
-        yield self._create_chunk(finish_reason="stop")
-        yield "data: [DONE]\n\n"
+        yield self._create_frame(finish_reason=self._finish_reason)
+        if self.include_usage and (self._prompt_tokens or self._completion_tokens):
+            yield self._create_usage_frame()
+        yield b"data: [DONE]\n\n"
+
+
+_FRAME_ENCODERS: Dict[type, Callable[[OpenAIStreamEncoder, Any], bytes]] = {
+    TextDeltaChunk: OpenAIStreamEncoder._content_frame,
+    ReasoningDeltaChunk: OpenAIStreamEncoder._reasoning_frame,
+    ToolCallBeginChunk: OpenAIStreamEncoder._tool_call_begin_frame,
+    ToolCallDeltaChunk: OpenAIStreamEncoder._tool_call_args_frame,
+    ToolCallArgsTextFinishChunk: OpenAIStreamEncoder._tool_call_args_frame,
+    StepFinishChunk: OpenAIStreamEncoder._step_finish,
+}
+
+_FRAME_ENCODERS_BY_TYPE = {
+    chunk_cls.TYPE: encode for chunk_cls, encode in _FRAME_ENCODERS.items()
+}
 
 
 class OpenAIStreamResponse(AssistantStreamResponse):
@@ -83,8 +253,16 @@ class OpenAIStreamResponse(AssistantStreamResponse):
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
         heartbeat: HeartbeatOption = True,
+        coalesce: CoalesceOption = False,
+        compression: CompressionOption = False,
     ):
         """
         Initializes the response with the OpenAI SSE encoder.
         """
-        super().__init__(stream, OpenAIStreamEncoder(), heartbeat=heartbeat)
+        super().__init__(
+            stream,
+            OpenAIStreamEncoder(),
+            heartbeat=heartbeat,
+            coalesce=coalesce,
+            compression=compression,
+        )
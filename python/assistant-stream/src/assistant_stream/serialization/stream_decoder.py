@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+from typing import AsyncGenerator, AsyncIterable, List, Union
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+
+class _LineBuffer:
+    """Splits a byte stream into lines. A partial line is kept as a list of
+    fragments and joined once when its newline arrives, so a long frame
+    split across many reads costs linear, not quadratic, copying."""
+
+    def __init__(self) -> None:
+        self._fragments: List[bytes] = []
+
+    def feed(self, data: bytes) -> List[bytes]:
+        lines: List[bytes] = []
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            line = data[start:end]
+            if self._fragments:
+                self._fragments.append(line)
+                line = b"".join(self._fragments)
+                self._fragments.clear()
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            lines.append(line)
+            start = end + 1
+        if start < len(data):
+            self._fragments.append(data[start:])
+        return lines
+
+    def close(self) -> List[bytes]:
+        if not self._fragments:
+            return []
+        line = b"".join(self._fragments)
+        self._fragments.clear()
+        return [line.removesuffix(b"\r")]
+
+
+class StreamDecoder(ABC):
+    """
+    Incrementally decodes an encoder's wire format back into
+    AssistantStreamChunks. Bytes may be fed in arbitrary pieces; frames split
+    across reads, including inside a UTF-8 sequence, are reassembled.
+
+    A decoder holds the state of one stream; create one per stream.
+    """
+
+    def __init__(self) -> None:
+        self._lines = _LineBuffer()
+
+    @abstractmethod
+    def _decode_line(self, line: bytes) -> List[AssistantStreamChunk]:
+        """Decode one complete line (without its newline)."""
+        pass
+
+    def _finish(self) -> List[AssistantStreamChunk]:
+        """Called once the input ends, after the last line was decoded."""
+        return []
+
+    def feed(self, data: Union[bytes, str]) -> List[AssistantStreamChunk]:
+        """Decode the chunks completed by `data`."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        chunks: List[AssistantStreamChunk] = []
+        for line in self._lines.feed(data):
+            chunks.extend(self._decode_line(line))
+        return chunks
+
+    def close(self) -> List[AssistantStreamChunk]:
+        """Decode whatever the input left unterminated and end the stream."""
+        chunks: List[AssistantStreamChunk] = []
+        for line in self._lines.close():
+            chunks.extend(self._decode_line(line))
+        chunks.extend(self._finish())
+        return chunks
+
+    async def decode_stream(
+        self, stream: AsyncIterable[Union[bytes, str]]
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        async for data in stream:
+            for chunk in self.feed(data):
+                yield chunk
+        for chunk in self.close():
+            yield chunk
+
+
+async def relay(
+    stream: AsyncIterable[Union[bytes, str]],
+    decoder: StreamDecoder,
+    encoder: StreamEncoder,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Re-encode a byte stream in another wire format, one chunk at a time.
+    Only the current partial frame is buffered, so memory stays constant
+    however long the stream runs.
+
+    To serve the result, pass `decoder.decode_stream(stream)` and the encoder
+    to AssistantStreamResponse instead, which adds keepalives.
+    """
+    async for frame in encoder.encode_stream_bytes(decoder.decode_stream(stream)):
+        yield frame
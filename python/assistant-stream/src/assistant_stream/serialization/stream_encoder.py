@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Optional
+from functools import partial
+from typing import AsyncGenerator, Callable, Optional, Union
 from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
 from assistant_stream.serialization.heartbeat import SSE_HEARTBEAT_LINE
 
@@ -7,6 +8,12 @@ from assistant_stream.serialization.heartbeat import SSE_HEARTBEAT_LINE
 class StreamEncoder(ABC):
     """
     Abstract base class for stream encoders, requiring an implementation of `encode_stream`.
+
+    Responses consume `encode_stream_bytes`. Third-party encoders only need to
+    implement `encode_stream`; the default `encode_stream_bytes` encodes their
+    frames as UTF-8. Built-in encoders produce bytes natively and derive
+    `encode_stream` from them; a subclass that overrides `encode_stream`
+    still has its frames used by `encode_stream_bytes`.
     """
 
     @abstractmethod
@@ -36,3 +43,48 @@ class StreamEncoder(ABC):
         This method must be implemented by subclasses.
         """
         pass
+
+    async def encode_stream_bytes(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Encode the stream into UTF-8 frames ready for the socket or a
+        resumable store. The default implementation adapts `encode_stream`;
+        frames that are already bytes pass through unchanged.
+        """
+        async for frame in self.encode_stream(stream):
+            yield _to_bytes(frame)
+
+
+def _overrides(encoder: StreamEncoder, base: type, name: str) -> bool:
+    """Whether the class of `encoder` replaces `base`'s attribute `name`."""
+    return getattr(type(encoder), name) is not getattr(base, name)
+
+
+def _frame_encoder(
+    encoder: StreamEncoder, base: type
+) -> Callable[[AssistantStreamChunk], Optional[bytes]]:
+    """The per-chunk frame builder of a built-in encoder: its `_encode_frame`,
+    unless a subclass customizes only the str-returning `encode_chunk`."""
+    if _overrides(encoder, base, "encode_chunk") and not _overrides(
+        encoder, base, "_encode_frame"
+    ):
+        return partial(_encode_frame_from_chunk, encoder)
+    return encoder._encode_frame
+
+
+def _encode_frame_from_chunk(
+    self: StreamEncoder, chunk: AssistantStreamChunk
+) -> Optional[bytes]:
+    encoded = self.encode_chunk(chunk)
+    if encoded is None:
+        return None
+    return _to_bytes(encoded)
+
+
+def _to_bytes(frame: Union[str, bytes, bytearray, memoryview]) -> bytes:
+    if isinstance(frame, bytes):
+        return frame
+    if isinstance(frame, str):
+        return frame.encode("utf-8")
+    return bytes(frame)
@@ -0,0 +1,251 @@
+"""Many runs over one WebSocket.
+
+Client messages are JSON text:
+
+    {"type": "start", "runId": "r1", "payload": ..., "window": 65536}
+    {"type": "ack", "runId": "r1", "bytes": 4096}
+    {"type": "cancel", "runId": "r1"}
+
+`start` calls the multiplexer's `start_run(payload)` and streams the run it
+returns. With `window` set, at most that many bytes of the run's frames are
+unacknowledged at a time; the client returns credit with `ack` as it
+consumes them, and other runs keep streaming while one waits. `cancel`
+closes the run's stream, which sets its RunController's cancellation signal.
+
+The server sends each run's frames as `<runId>\\n<frames>`, a text message
+or, with `binary=True`, a binary one; frames ready at the same time share a
+message. Control messages are JSON text objects:
+
+    {"type": "end", "runId": "r1"}
+    {"type": "cancelled", "runId": "r1"}
+    {"type": "error", "runId": "r1", "error": "..."}
+
+A run id is a non-empty string without newlines that does not start with
+"{", so data and control messages never look alike.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+from starlette.types import Receive, Scope, Send
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.coalesce import (
+    DEFAULT_COALESCE_MAX_BYTES,
+    coalesce_frames,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RUNS = 64
+
+_MAX_RUN_ID_LENGTH = 256
+
+StartRun = Callable[[Any], AsyncGenerator[AssistantStreamChunk, None]]
+
+
+def _wake(future: Optional["asyncio.Future[None]"]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+class _RunChannel:
+    """Credit accounting for one run on the connection."""
+
+    def __init__(self, window: Optional[int]) -> None:
+        self.window = window
+        self.unacked = 0
+        self.cancelled = False
+        self.task: Optional["asyncio.Task[None]"] = None
+        self._credit_waiter: Optional["asyncio.Future[None]"] = None
+
+    async def reserve(self, size: int) -> None:
+        # A message is always allowed when nothing is outstanding, so one
+        # frame larger than the window cannot stall the run.
+        while (
+            self.window is not None
+            and self.unacked
+            and self.unacked + size > self.window
+        ):
+            self._credit_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._credit_waiter
+            finally:
+                self._credit_waiter = None
+        self.unacked += size
+
+    def ack(self, size: int) -> None:
+        self.unacked = max(0, self.unacked - size)
+        _wake(self._credit_waiter)
+
+
+class WebSocketMultiplexer:
+    """
+    Serves many runs over one WebSocket connection; see the module
+    docstring for the protocol.
+
+    Mount an instance as an ASGI WebSocket endpoint, or call `serve` from
+    your own endpoint. `start_run` receives the payload of a start message
+    and returns the run's chunk stream, typically from `create_run`.
+    """
+
+    def __init__(
+        self,
+        start_run: StartRun,
+        *,
+        encoder_factory: Callable[[], StreamEncoder] = DataStreamEncoder,
+        binary: bool = False,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        max_message_bytes: int = DEFAULT_COALESCE_MAX_BYTES,
+    ) -> None:
+        if max_runs <= 0:
+            raise ValueError(f"max_runs must be positive, got {max_runs!r}")
+        self._start_run = start_run
+        self._encoder_factory = encoder_factory
+        self._binary = binary
+        self._max_runs = max_runs
+        self._max_message_bytes = max_message_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.serve(WebSocket(scope, receive, send))
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Serve one connection until the client disconnects."""
+        if websocket.client_state == WebSocketState.CONNECTING:
+            await websocket.accept()
+        connection = _Connection(self, websocket)
+        try:
+            await connection.receive_loop()
+        finally:
+            await connection.close()
+
+
+class _Connection:
+    def __init__(self, multiplexer: WebSocketMultiplexer, websocket: WebSocket):
+        self._multiplexer = multiplexer
+        self._websocket = websocket
+        self._runs: Dict[str, _RunChannel] = {}
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    async def receive_loop(self) -> None:
+        while True:
+            received = await self._websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                return
+            try:
+                message = json.loads(received.get("text") or received.get("bytes"))
+                kind = message["type"]
+                run_id = message["runId"]
+            except (ValueError, TypeError, KeyError):
+                run_id = None
+            if not isinstance(run_id, str):
+                # Run ids key `self._runs`, so anything else is malformed.
+                await self._send_control({"type": "error", "error": "Invalid message"})
+                continue
+            if kind == "start":
+                await self._start(run_id, message)
+            elif kind == "ack":
+                channel = self._runs.get(run_id)
+                size = message.get("bytes")
+                if channel is not None and isinstance(size, int):
+                    channel.ack(size)
+            elif kind == "cancel":
+                channel = self._runs.get(run_id)
+                if channel is not None and not channel.cancelled:
+                    channel.cancelled = True
+                    channel.task.cancel()
+            else:
+                await self._send_control(
+                    {"type": "error", "runId": run_id, "error": f"Unknown type {kind!r}"}
+                )
+
+    async def _start(self, run_id: str, message: Dict[str, Any]) -> None:
+        error = None
+        window = message.get("window")
+        if (
+            not run_id
+            or len(run_id) > _MAX_RUN_ID_LENGTH
+            or "\n" in run_id
+            or run_id.startswith("{")
+        ):
+            error = "Invalid run id"
+        elif run_id in self._runs:
+            error = "Run id is already streaming"
+        elif len(self._runs) >= self._multiplexer._max_runs:
+            error = "Too many concurrent runs"
+        elif window is not None and (not isinstance(window, int) or window <= 0):
+            error = "window must be a positive integer"
+        if error is not None:
+            await self._send_control({"type": "error", "runId": run_id, "error": error})
+            return
+        channel = self._runs[run_id] = _RunChannel(window)
+        channel.task = asyncio.create_task(
+            self._pump(run_id, channel, message.get("payload"))
+        )
+
+    async def _pump(self, run_id: str, channel: _RunChannel, payload: Any) -> None:
+        body = None
+        cancelled = False
+        try:
+            stream = self._multiplexer._start_run(payload)
+            encoder = self._multiplexer._encoder_factory()
+            max_bytes = self._multiplexer._max_message_bytes
+            if channel.window is not None:
+                max_bytes = min(max_bytes, channel.window)
+            body = coalesce_frames(encoder.encode_stream_bytes(stream), 0.0, max_bytes)
+            header = run_id.encode("utf-8") + b"\n"
+            async for data in body:
+                await channel.reserve(len(data))
+                await self._send_data(header + data)
+            await self._send_control({"type": "end", "runId": run_id})
+        except asyncio.CancelledError:
+            if not channel.cancelled or self._closed:
+                raise
+            cancelled = True
+        except Exception as e:
+            if self._closed:
+                return
+            logger.warning("Run %s failed", run_id, exc_info=True)
+            await self._send_control({"type": "error", "runId": run_id, "error": str(e)})
+        finally:
+            if body is not None:
+                await body.aclose()
+            self._runs.pop(run_id, None)
+        if cancelled:
+            # Sent once the run's stream is closed and its callback stopped.
+            await self._send_control({"type": "cancelled", "runId": run_id})
+
+    async def _send_data(self, data: bytes) -> None:
+        async with self._send_lock:
+            try:
+                if self._multiplexer._binary:
+                    await self._websocket.send_bytes(data)
+                else:
+                    await self._websocket.send_text(data.decode("utf-8"))
+            except (WebSocketDisconnect, RuntimeError):
+                self._closed = True
+                raise
+
+    async def _send_control(self, message: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            if self._closed:
+                return
+            try:
+                await self._websocket.send_text(json.dumps(message))
+            except (WebSocketDisconnect, RuntimeError):
+                self._closed = True
+
+    async def close(self) -> None:
+        """Cancel every run once the client is gone."""
+        self._closed = True
+        tasks = [channel.task for channel in self._runs.values()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
@@ -5,6 +5,7 @@ operations (deep_apply/lookup path semantics) batched for emission. Only the
 server side of the wire is implemented (ops-only, no ack).
 """
 
+import gc
 import threading
 from typing import Any, Callable, List, Optional, Protocol, Sequence, Union
 
@@ -84,6 +85,114 @@ def deep_apply(target: Any, path: Sequence[str], op: StateOperation) -> Any:
     return {**obj, head: deep_apply(obj.get(head), rest, op)}
 
 
+class _UngroupableBatch(Exception):
+    pass
+
+
+def deep_apply_batch(target: Any, operations: Sequence[StateOperation]) -> Any:
+    """Apply operations in order, returning the updated value.
+
+    Equivalent to folding deep_apply over the operations, but operations that
+    share a path prefix are grouped so each prefix is descended and copied
+    once per batch instead of once per operation. On any error the batch is
+    replayed through deep_apply so the raised exception matches sequential
+    application.
+    """
+    if len(operations) == 1:
+        op = operations[0]
+        return deep_apply(target, op["path"], op)
+    try:
+        return _apply_grouped(target, operations, 0)
+    except (KeyError, TypeError, _UngroupableBatch):
+        for op in operations:
+            target = deep_apply(target, op["path"], op)
+        return target
+
+
+def _apply_grouped(target: Any, operations: Sequence[StateOperation], depth: int) -> Any:
+    # Every operation shares path[:depth]. Operations ending at this depth
+    # replace the node itself, so they split the batch into runs; within a
+    # run, operations are grouped by their next key in first-seen order,
+    # which keeps list appends and dict key insertion order sequential.
+    i = 0
+    count = len(operations)
+    while i < count:
+        op = operations[i]
+        path = op["path"]
+        if len(path) == depth:
+            if op["type"] == "append-text" and (target is None or isinstance(target, str)):
+                # Join a run of text deltas instead of concatenating per delta.
+                values = [op["value"]]
+                i += 1
+                while (
+                    i < count
+                    and operations[i]["type"] == "append-text"
+                    and len(operations[i]["path"]) == depth
+                ):
+                    values.append(operations[i]["value"])
+                    i += 1
+                target = (target or "") + "".join(values)
+                continue
+            target = deep_apply(target, (), op)
+            i += 1
+            continue
+        children: dict[str, list[StateOperation]] = {}
+        # For a list, groups are keyed by index: "0" and "00" name the same
+        # element, so their operations share one group.
+        indexed: Optional[dict[int, list[StateOperation]]] = (
+            {} if isinstance(target, list) else None
+        )
+        while i < count:
+            path = operations[i]["path"]
+            if len(path) == depth:
+                break
+            key = path[depth]
+            if type(key) is not str:
+                raise _UngroupableBatch()
+            group = children.get(key)
+            if group is None:
+                group = []
+                if indexed is not None:
+                    try:
+                        group = indexed.setdefault(int(key), group)
+                    except ValueError:
+                        raise KeyError(key)
+                children[key] = group
+            group.append(operations[i])
+            i += 1
+        target = _apply_children(
+            target, children if indexed is None else indexed, depth
+        )
+    return target
+
+
+def _apply_children(
+    target: Any, children: dict[Union[str, int], list[StateOperation]], depth: int
+) -> Any:
+    if len(children) == 1:
+        ((key, group),) = children.items()
+        if len(group) == 1:
+            op = group[0]
+            return deep_apply(target, op["path"][depth:], op)
+
+    next_depth = depth + 1
+    if isinstance(target, list):
+        copy = list(target)
+        for idx, group in children.items():
+            if idx < 0 or idx > len(copy):
+                raise KeyError(group[0]["path"][depth])
+            if idx == len(copy):
+                copy.append(_apply_grouped(None, group, next_depth))
+            else:
+                copy[idx] = _apply_grouped(copy[idx], group, next_depth)
+        return copy
+
+    copy = dict(target) if isinstance(target, dict) else {}
+    for key, group in children.items():
+        copy[key] = _apply_grouped(copy.get(key), group, next_depth)
+    return copy
+
+
 class AssistantState:
     """Authoritative state container. Applies ops; hands out mutation proxies."""
 
@@ -95,6 +204,16 @@ class AssistantState:
         return self._state
 
     def apply(self, operations: Sequence[StateOperation]) -> None:
+        if not operations:
+            return
+        if len(operations) > 1:
+            try:
+                self._state = _apply_grouped(self._state, operations, 0)
+                return
+            except (KeyError, TypeError, _UngroupableBatch):
+                pass
+        # Replayed once, sequentially, so the ops preceding a failing one
+        # are kept and its error is raised.
         for op in operations:
             self._state = deep_apply(self._state, op["path"], op)
 
@@ -185,17 +304,53 @@ class Flusher:
             self._emit(operations)
 
 
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+_CONTAINER_TYPES = frozenset((dict, list, tuple))
+_MAX_DEPTH = 1000
+_PROXY_IN_STATE = "Cannot store a StateProxy in state; assign a plain value instead"
+
+
 def _ensure_no_proxy(value: Any) -> None:
+    """Reject a value with a StateProxy anywhere in its dicts, lists and
+    tuples. Walks one nesting level at a time, collecting each level's items
+    with a single gc.get_referents call instead of a Python call per
+    container. Containers reached twice, through sharing or a cycle, are
+    walked once."""
     if isinstance(value, StateProxy):
-        raise ValueError(
-            "Cannot store a StateProxy in state; assign a plain value instead"
-        )
-    if isinstance(value, dict):
-        for item in value.values():
-            _ensure_no_proxy(item)
-    elif isinstance(value, list):
-        for item in value:
-            _ensure_no_proxy(item)
+        raise ValueError(_PROXY_IN_STATE)
+    if not isinstance(value, (dict, list, tuple)):
+        return
+    level = [value]
+    seen = {id(value)}
+    depth = 0
+    while level:
+        depth += 1
+        if depth > _MAX_DEPTH:
+            # Deeper than any encoder recurses; it could not be sent anyway.
+            raise ValueError("Cannot store a value nested this deeply in state")
+        items = [
+            item
+            for item in gc.get_referents(*level)
+            if item.__class__ not in _SCALAR_TYPES
+        ]
+        level = [item for item in items if item.__class__ in _CONTAINER_TYPES]
+        if len(level) != len(items):
+            for item in items:
+                if item.__class__ in _CONTAINER_TYPES:
+                    continue
+                if isinstance(item, StateProxy):
+                    raise ValueError(_PROXY_IN_STATE)
+                if isinstance(item, (dict, list, tuple)):
+                    level.append(item)
+        ids = set(map(id, level))
+        if len(ids) != len(level) or not ids.isdisjoint(seen):
+            # Shared or cyclic: drop the containers already walked.
+            fresh = {id(item): item for item in level}
+            for key in fresh.keys() & seen:
+                del fresh[key]
+            level = list(fresh.values())
+            ids = fresh.keys()
+        seen.update(ids)
 
 
 class StateProxy:
@@ -0,0 +1,232 @@
+"""In-process stand-ins for the RedisLikeClient protocol, for tests and
+benchmarks that cannot reach a Redis server. Stream ids, exclusive ranges,
+XREAD blocking and the store's scripts follow Redis; TTLs count down but
+keys never expire."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from bisect import bisect_right
+from collections import Counter
+from typing import Any
+
+from assistant_stream.resumable.stores.redis import RedisScript
+
+
+def _parse_id(entry_id: str) -> tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _text(value: str | bytes | int) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class PollingRedisStandIn:
+    """Implements RedisLikeClient without blocking reads or scripts.
+
+    `round_trip_ms` delays every call, as a network hop to the server would,
+    and `pool_size` bounds the calls in flight like a connection pool.
+    """
+
+    def __init__(
+        self, round_trip_ms: float = 0.0, pool_size: int | None = None
+    ) -> None:
+        # Commands as Redis would count them; a pipeline counts each of its
+        # commands once.
+        self.commands: Counter[str] = Counter()
+        self.round_trips = 0
+        self.strings: dict[str, str] = {}
+        self.streams: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        # Parsed ids of each stream, for bisecting.
+        self._ids: dict[str, list[tuple[int, int]]] = {}
+        self.expires_at: dict[str, float] = {}
+        self._round_trip = round_trip_ms / 1000
+        self._pool = asyncio.Semaphore(pool_size) if pool_size else None
+        self._last_id = 0
+        self._changed: dict[str, asyncio.Event] = {}
+
+    async def _call(self, *names: str) -> None:
+        self.round_trips += 1
+        self.commands.update(names)
+        if not self._round_trip:
+            return
+        if self._pool is None:
+            await asyncio.sleep(self._round_trip)
+            return
+        async with self._pool:
+            await asyncio.sleep(self._round_trip)
+
+    def _notify(self, key: str) -> None:
+        event = self._changed.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _after(self, key: str, last_id: str, count: int | None = None) -> list:
+        stream = self.streams.get(key, [])
+        start = bisect_right(self._ids.get(key, []), _parse_id(last_id))
+        end = len(stream) if count is None else start + count
+        return [
+            {"id": entry_id, "fields": dict(fields)}
+            for entry_id, fields in stream[start:end]
+        ]
+
+    def _exists(self, key: str) -> bool:
+        return key in self.strings or key in self.streams
+
+    def _expire(self, key: str, ttl_sec: int) -> None:
+        if self._exists(key):
+            self.expires_at[key] = time.monotonic() + ttl_sec
+
+    def pttl(self, key: str) -> int:
+        """Remaining TTL in ms, -1 without one and -2 for a missing key."""
+        if not self._exists(key):
+            return -2
+        if key not in self.expires_at:
+            return -1
+        return max(0, int((self.expires_at[key] - time.monotonic()) * 1000))
+
+    def _xadd(self, key: str, fields: dict[str, Any]) -> None:
+        self._last_id += 1
+        entry_id = f"1-{self._last_id}"
+        self.streams.setdefault(key, []).append((entry_id, dict(fields)))
+        self._ids.setdefault(key, []).append(_parse_id(entry_id))
+        self._notify(key)
+
+    def _set(self, key: str, value: str, ttl_sec: int) -> None:
+        self.strings[key] = value
+        self.expires_at[key] = time.monotonic() + ttl_sec
+
+    def _delete(self, key: str) -> None:
+        self.strings.pop(key, None)
+        self.streams.pop(key, None)
+        self._ids.pop(key, None)
+        self.expires_at.pop(key, None)
+        self._notify(key)
+
+    async def set_nx(self, key: str, value: str, ttl_sec: int) -> bool:
+        await self._call("set")
+        if key in self.strings:
+            return False
+        self._set(key, value, ttl_sec)
+        return True
+
+    async def get(self, key: str) -> str | None:
+        await self._call("get")
+        return self.strings.get(key)
+
+    async def exists(self, key: str) -> bool:
+        await self._call("exists")
+        return self._exists(key)
+
+    async def delete(self, keys: list[str]) -> None:
+        await self._call("del")
+        for key in keys:
+            self._delete(key)
+
+    async def xrange(self, key: str, start: str, end: str) -> list[dict[str, Any]]:
+        await self._call("xrange")
+        if start == "-":
+            return self._after(key, "0-0")
+        if start.startswith("("):
+            return self._after(key, start[1:])
+        entries = self._after(key, "0-0")
+        return [e for e in entries if _parse_id(e["id"]) >= _parse_id(start)]
+
+    async def pipeline(self, commands: list[dict[str, Any]]) -> None:
+        await self._call(*(command["type"] for command in commands))
+        for command in commands:
+            key = command["key"]
+            if command["type"] == "xAdd":
+                self._xadd(key, command["fields"])
+            elif command["type"] == "expire":
+                self._expire(key, command["ttlSec"])
+            elif command["type"] == "set":
+                self._set(key, command["value"], command["ttlSec"])
+
+
+class RedisStandIn(PollingRedisStandIn):
+    """Implements BlockingRedisLikeClient and CombiningRedisLikeClient. The
+    scripts are Python ports of the store's Lua, run as one command."""
+
+    async def xread(
+        self, key: str, last_id: str, count: int, block_ms: int | None
+    ) -> list[dict[str, Any]]:
+        await self._call("xread")
+        entries = self._after(key, last_id, count)
+        if entries or block_ms is None:
+            return entries
+        event = self._changed.setdefault(key, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), block_ms / 1000)
+        except asyncio.TimeoutError:
+            return []
+        return self._after(key, last_id, count)
+
+    async def run_script(
+        self, script: RedisScript, keys: list[str], args: list[str | bytes | int]
+    ) -> Any:
+        await self._call("evalsha")
+        return getattr(self, f"_{script.name}_script")(keys, args)
+
+    async def run_scripts(
+        self, calls: list[tuple[RedisScript, list[str], list[str | bytes | int]]]
+    ) -> list[Any]:
+        await self._call(*["evalsha"] * len(calls))
+        results: list[Any] = []
+        for script, keys, args in calls:
+            try:
+                results.append(getattr(self, f"_{script.name}_script")(keys, args))
+            except Exception as err:
+                results.append(err)
+        return results
+
+    def _meta(self, key: str) -> dict[str, Any] | None:
+        try:
+            meta = json.loads(self.strings[key])
+        except (KeyError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+
+    def _acquire_script(self, keys: list[str], args: list) -> int:
+        meta_key, data_key = keys
+        if meta_key in self.strings:
+            return 0
+        self._set(meta_key, _text(args[0]), int(args[1]))
+        self._delete(data_key)
+        return 1
+
+    def _append_script(self, keys: list[str], args: list) -> str:
+        meta_key, data_key = keys
+        meta = self._meta(meta_key)
+        if meta is None:
+            return "missing"
+        if meta.get("status") != "streaming":
+            return "finalized"
+        ttl = meta.get("ttlSec") or int(args[1])
+        self._xadd(data_key, {"c": args[0]})
+        if self.pttl(data_key) < ttl * 500:
+            self._expire(data_key, ttl)
+            self._expire(meta_key, ttl)
+        return "ok"
+
+    def _finalize_script(self, keys: list[str], args: list) -> str:
+        meta_key, data_key = keys
+        meta = self._meta(meta_key)
+        if meta is None:
+            return "missing"
+        if meta.get("status") != "streaming":
+            return "ok"
+        ttl = meta.get("ttlSec") or int(args[2])
+        status = _text(args[0])
+        final: dict[str, Any] = {"status": status, "ttlSec": ttl}
+        if status == "error":
+            final["error"] = _text(args[1])
+            self._xadd(data_key, {"fin": "error", "error": final["error"]})
+        else:
+            self._xadd(data_key, {"fin": "done"})
+        self._set(meta_key, json.dumps(final), ttl)
+        self._expire(data_key, ttl)
+        return "ok"
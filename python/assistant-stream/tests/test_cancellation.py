@@ -176,3 +176,38 @@ async def test_early_stream_close_does_not_swallow_close_task_cancellation():
         await asyncio.wait_for(callback_finished.wait(), timeout=2)
         if not close_task.done():
             await asyncio.wait({close_task}, timeout=1)
+
+
+@pytest.mark.parametrize("spec_version", ["2.0", "2.4"])
+@pytest.mark.anyio
+async def test_client_disconnect_cancels_a_silent_run(spec_version):
+    from assistant_stream.serialization.data_stream import DataStreamResponse
+
+    loop = asyncio.get_running_loop()
+    observed: dict[str, float] = {}
+    disconnected = asyncio.Event()
+    sent = []
+
+    async def run_callback(controller: RunController):
+        controller.append_text("start")
+        # A long tool call that writes nothing until it finishes.
+        await asyncio.wait_for(controller.cancelled_event.wait(), timeout=5)
+        observed["cancelled_at"] = loop.time()
+
+    async def receive():
+        await disconnected.wait()
+        observed["disconnected_at"] = loop.time()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if disconnected.is_set():
+            raise OSError("client went away")
+        sent.append(message)
+        if message.get("body"):
+            disconnected.set()
+
+    scope = {"type": "http", "asgi": {"spec_version": spec_version}, "headers": []}
+    await DataStreamResponse(create_run(run_callback))(scope, receive, send)
+
+    assert sent[1]["body"] == b'0:"start"\n'
+    assert observed["cancelled_at"] - observed["disconnected_at"] < 0.05
@@ -0,0 +1,192 @@
+import asyncio
+import base64
+import os
+import time
+
+import pytest
+
+from assistant_stream import LocalBlobStore, create_run
+from assistant_stream.chunked_transfer import split_state_operations
+from assistant_stream.state import AssistantState
+
+
+def _apply(chunks, initial=None):
+    state = AssistantState(initial)
+    for chunk in chunks:
+        if chunk.type == "update-state":
+            state.apply(chunk.operations)
+    return state.state
+
+
+def test_split_keeps_shape_and_order():
+    big = "x" * 25
+    operations = [
+        {"type": "set", "path": ["doc"], "value": {"body": big, "items": ["s", big]}},
+        {"type": "set", "path": ["doc", "title"], "value": "t"},
+        {"type": "append-text", "path": ["log"], "value": "y" * 12},
+    ]
+
+    batches = split_state_operations(operations, 10)
+
+    assert batches[0] == [
+        {"type": "set", "path": ["doc"], "value": {"body": "", "items": ["s", ""]}}
+    ]
+    assert [op["value"] for batch in batches[1:4] for op in batch] == [
+        "x" * 10,
+        "x" * 10,
+        "x" * 5,
+    ]
+    assert batches[4][0]["path"] == ["doc", "items", "1"]
+    assert batches[7] == [{"type": "set", "path": ["doc", "title"], "value": "t"}]
+    assert all(len(op["value"]) <= 10 for batch in batches[1:] for op in batch)
+    # The original value is shared with local state and must stay intact.
+    assert operations[0]["value"]["body"] == big
+
+    reassembled = AssistantState({"log": ""})
+    for batch in batches:
+        reassembled.apply(batch)
+    expected = AssistantState({"log": ""})
+    expected.apply(operations)
+    assert reassembled.state == expected.state
+
+
+def test_small_operations_are_untouched():
+    operations = [{"type": "set", "path": ["a"], "value": {"b": "short"}}]
+    assert split_state_operations(operations, 10) == [operations]
+
+
+@pytest.mark.anyio
+async def test_text_deltas_interleave_with_large_state():
+    document = "".join(f"{i:04d}" for i in range(1000))
+
+    async def run(controller):
+        controller.state["document"] = document
+        controller.flush()
+        for i in range(5):
+            controller.append_text(f"t{i}")
+        controller.state["done"] = True
+
+    chunks = [
+        chunk
+        async for chunk in create_run(run, state={}, max_payload_size=500)
+    ]
+
+    types = [chunk.type for chunk in chunks]
+    # Pieces alternate with text instead of blocking it.
+    assert types.index("text-delta") < 3
+    assert _apply(chunks, {}) == {"document": document, "done": True}
+    assert chunks[-1].type == "update-state"
+    assert chunks[-1].operations == [
+        {"type": "set", "path": ["done"], "value": True}
+    ]
+
+
+@pytest.mark.anyio
+async def test_large_files_are_offloaded(tmp_path):
+    store = LocalBlobStore(str(tmp_path), url_prefix="https://app.test/blobs/")
+    payload = bytes(range(256)) * 64
+
+    async def run(controller):
+        controller.add_file(base64.b64encode(payload).decode(), "image/png")
+        controller.add_file("aGk=", "text/plain")
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run, max_payload_size=1024, blob_store=store
+        )
+    ]
+
+    url = chunks[0].data
+    assert url.startswith("https://app.test/blobs/")
+    blob_id = url.rsplit("/", 1)[1]
+    path, mime_type = store.path(blob_id)
+    assert mime_type == "image/png"
+    with open(path, "rb") as file:
+        assert file.read() == payload
+    assert chunks[1].data == "aGk="
+
+    assert store.path("../" + blob_id) is None
+    assert store.response("0" * 32).status_code == 404
+    store.delete(blob_id)
+    assert store.path(blob_id) is None
+
+
+@pytest.mark.anyio
+async def test_invalid_base64_is_sent_inline(tmp_path, caplog):
+    store = LocalBlobStore(str(tmp_path))
+    data = "not base64!" * 200
+
+    async def run(controller):
+        controller.add_file(data, "image/png")
+
+    chunks = [
+        chunk
+        async for chunk in create_run(run, max_payload_size=100, blob_store=store)
+    ]
+
+    assert chunks[0].data == data
+    assert "Could not offload" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_chunked_transfer_options_are_validated(tmp_path):
+    async def run(controller):
+        pass
+
+    with pytest.raises(ValueError, match="requires max_payload_size"):
+        await create_run(run, blob_store=LocalBlobStore(str(tmp_path))).__anext__()
+    with pytest.raises(ValueError, match="must be positive"):
+        await create_run(run, max_payload_size=0).__anext__()
+
+
+@pytest.mark.anyio
+async def test_file_offload_runs_off_the_event_loop(tmp_path):
+    class SlowStore(LocalBlobStore):
+        def write(self, pieces, mime_type):
+            time.sleep(0.2)
+            return super().write(pieces, mime_type)
+
+    store = SlowStore(str(tmp_path))
+    payload = base64.b64encode(b"x" * 4096).decode()
+
+    async def run(controller):
+        controller.add_file(payload, "image/png")
+        controller.append_text("after")
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    try:
+        chunks = [
+            chunk
+            async for chunk in create_run(run, max_payload_size=1024, blob_store=store)
+        ]
+    finally:
+        ticking.cancel()
+
+    assert ticks >= 10
+    assert [chunk.type for chunk in chunks] == ["file", "text-delta"]
+    assert chunks[0].data.startswith("/blobs/")
+
+
+def test_local_blob_store_expires_blobs_after_max_age(tmp_path):
+    store = LocalBlobStore(str(tmp_path), max_age=0.05)
+    url = store.write(iter([b"old"]), "text/plain")
+    blob_id = url.rsplit("/", 1)[1]
+    assert store.path(blob_id) is not None
+
+    time.sleep(0.06)
+    assert store.path(blob_id) is None
+    store.write(iter([b"new"]), "text/plain")
+    assert blob_id not in os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+
+    with pytest.raises(ValueError, match="max_age"):
+        LocalBlobStore(str(tmp_path), max_age=0)
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.coalesce import (
+    coalesce_frames,
+    resolve_coalesce_delay,
+)
+from assistant_stream.serialization.data_stream import (
+    DataStreamEncoder,
+    DataStreamResponse,
+)
+from assistant_stream.serialization.heartbeat import DATA_STREAM_KEEPALIVE_LINE
+
+
+def test_resolve_coalesce_delay():
+    assert resolve_coalesce_delay(True) == 0.0
+    assert resolve_coalesce_delay(False) is None
+    assert resolve_coalesce_delay(None) is None
+    assert resolve_coalesce_delay(0) == 0.0
+    assert resolve_coalesce_delay(0.005) == 0.005
+    for invalid in (-1, float("inf"), float("nan")):
+        with pytest.raises(ValueError):
+            resolve_coalesce_delay(invalid)
+
+
+@pytest.mark.anyio
+async def test_ready_frames_are_joined_into_one_batch():
+    async def frames():
+        yield b"a"
+        await asyncio.sleep(0.05)
+        for i in range(100):
+            yield b"%d," % i
+
+    batches = [batch async for batch in coalesce_frames(frames())]
+
+    assert b"".join(batches) == b"a" + b"".join(b"%d," % i for i in range(100))
+    assert len(batches) < 10
+
+
+@pytest.mark.anyio
+async def test_first_batch_is_not_delayed():
+    async def frames():
+        yield b"first"
+        await asyncio.sleep(0.3)
+        yield b"second"
+
+    start = time.perf_counter()
+    stream = coalesce_frames(frames(), max_delay=1.0)
+    assert await stream.__anext__() == b"first"
+    assert time.perf_counter() - start < 0.2
+    assert [batch async for batch in stream] == [b"second"]
+
+
+@pytest.mark.anyio
+async def test_max_delay_collects_later_frames():
+    async def frames():
+        yield b"a"
+        await asyncio.sleep(0)
+        for i in range(5):
+            await asyncio.sleep(0.01)
+            yield b"b"
+
+    batches = [batch async for batch in coalesce_frames(frames(), max_delay=0.5)]
+
+    assert batches == [b"a", b"bbbbb"]
+
+
+@pytest.mark.anyio
+async def test_batches_respect_max_bytes():
+    async def frames():
+        for _ in range(10):
+            yield b"x" * 4
+        yield b"y" * 20
+
+    batches = [batch async for batch in coalesce_frames(frames(), max_bytes=10)]
+
+    assert b"".join(batches) == b"x" * 40 + b"y" * 20
+    # Only a single oversized frame may exceed the cap.
+    assert all(len(batch) <= 10 or batch == b"y" * 20 for batch in batches)
+
+
+@pytest.mark.anyio
+async def test_upstream_error_raised_after_buffered_frames():
+    async def frames():
+        yield b"a"
+        yield b"b"
+        raise RuntimeError("boom")
+
+    received = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for batch in coalesce_frames(frames()):
+            received.append(batch)
+
+    assert b"".join(received) == b"ab"
+
+
+@pytest.mark.anyio
+async def test_closing_early_closes_upstream():
+    closed = asyncio.Event()
+
+    async def frames():
+        try:
+            yield b"a"
+            await asyncio.sleep(10)
+            yield b"b"
+        finally:
+            closed.set()
+
+    stream = coalesce_frames(frames())
+    assert await stream.__anext__() == b"a"
+    await stream.aclose()
+
+    assert closed.is_set()
+
+
+@pytest.mark.anyio
+async def test_response_coalesces_with_keepalives():
+    async def stream():
+        yield TextDeltaChunk(text_delta="hello")
+        await asyncio.sleep(0.18)
+        for word in ("a", "b", "c"):
+            yield TextDeltaChunk(text_delta=word)
+
+    response = AssistantStreamResponse(
+        stream(), DataStreamEncoder(), heartbeat=0.05, coalesce=True
+    )
+    batches = [batch async for batch in response.body_iterator]
+    body = b"".join(batches).decode("utf-8")
+
+    assert batches[0] == b'0:"hello"\n'
+    lines = body.splitlines(keepends=True)
+    assert lines.count(DATA_STREAM_KEEPALIVE_LINE) >= 2
+    assert [line for line in lines if line != DATA_STREAM_KEEPALIVE_LINE] == [
+        '0:"hello"\n',
+        '0:"a"\n',
+        '0:"b"\n',
+        '0:"c"\n',
+    ]
+
+
+@pytest.mark.anyio
+async def test_subclass_forwards_coalesce_kwarg():
+    async def stream():
+        for word in ("a", "b", "c"):
+            yield TextDeltaChunk(text_delta=word)
+
+    response = DataStreamResponse(stream(), coalesce=True)
+    batches = [batch async for batch in response.body_iterator]
+
+    assert batches == [b'0:"a"\n0:"b"\n0:"c"\n']
@@ -0,0 +1,210 @@
+import asyncio
+import zlib
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.compression import (
+    GzipStreamCompressor,
+    available_encodings,
+    compress_frames,
+    create_compressor,
+    negotiate_encoding,
+    resolve_compression,
+)
+from assistant_stream.serialization.data_stream import (
+    DataStreamEncoder,
+    DataStreamResponse,
+)
+
+
+def test_negotiate_encoding():
+    offered = ("zstd", "br", "gzip")
+    assert negotiate_encoding("gzip, deflate, br", offered) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", offered) == "gzip"
+    assert negotiate_encoding("br;q=0, *", offered) == "zstd"
+    assert negotiate_encoding("*;q=0.1, zstd;q=0", offered) == "br"
+    assert negotiate_encoding("identity", offered) is None
+    assert negotiate_encoding("", offered) is None
+    assert negotiate_encoding("GZIP;Q=0.8", ("gzip",)) == "gzip"
+    assert negotiate_encoding("gzip;q=oops", ("gzip",)) is None
+
+
+def test_resolve_compression():
+    assert resolve_compression(False) == ()
+    assert resolve_compression(None) == ()
+    assert resolve_compression(True) == available_encodings()
+    assert "gzip" in available_encodings()
+    assert resolve_compression("gzip") == ("gzip",)
+    with pytest.raises(ValueError):
+        resolve_compression(["deflate"])
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_each_flush_decodes_to_frames_so_far(encoding):
+    if encoding not in available_encodings():
+        pytest.skip(f"{encoding} compressor not installed")
+    compressor = create_compressor(encoding)
+    decompress = _decompressor(encoding)
+
+    received = b""
+    for i in range(20):
+        frame = f'0:"tok{i}"\n'.encode()
+        out = compressor.compress(frame) + compressor.flush()
+        received += decompress(out)
+        assert received.endswith(frame)
+    received += decompress(compressor.finish())
+    assert received == b"".join(f'0:"tok{i}"\n'.encode() for i in range(20))
+
+
+def test_compression_level_mapping():
+    fast = create_compressor("gzip", {"gzip": 1})
+    best = create_compressor("gzip", 9)
+    data = b'{"type":"text-delta","textDelta":"hello"}\n' * 200
+    assert isinstance(fast, GzipStreamCompressor)
+    assert len(best.compress(data) + best.finish()) <= len(
+        fast.compress(data) + fast.finish()
+    )
+
+
+@pytest.mark.anyio
+async def test_min_flush_holds_back_small_writes():
+    async def frames():
+        for _ in range(10):
+            yield b"x" * 10
+
+    compressor = GzipStreamCompressor()
+    out = [
+        chunk
+        async for chunk in compress_frames(frames(), compressor, min_flush_size=50)
+    ]
+
+    # The first frame, one flush at 50 bytes, then the rest with the trailer.
+    assert len(out) == 3
+    assert zlib.decompress(b"".join(out), 31) == b"x" * 100
+
+
+@pytest.mark.anyio
+async def test_min_flush_never_strands_keepalives_or_quiet_writes():
+    arrived = []
+    resume = asyncio.Event()
+
+    async def frames():
+        yield b"delta"
+        yield b": keepalive\n\n"
+        yield b"small"
+        await resume.wait()
+
+    async def consume():
+        decompressor = zlib.decompressobj(31)
+        async for chunk in compress_frames(
+            frames(),
+            GzipStreamCompressor(),
+            min_flush_size=1024,
+            keepalive=b": keepalive\n\n",
+            max_flush_delay=0.05,
+        ):
+            arrived.append(decompressor.decompress(chunk))
+
+    consumer = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.3)
+    # Nothing more was written, yet every frame has reached the client.
+    assert b"".join(arrived) == b"delta: keepalive\n\nsmall"
+    assert arrived[:2] == [b"delta", b": keepalive\n\n"]
+    resume.set()
+    await consumer
+
+
+@pytest.mark.anyio
+async def test_max_flush_delay_must_be_positive():
+    async def frames():
+        yield b"x"
+
+    for invalid in (0, -1, float("inf"), float("nan")):
+        with pytest.raises(ValueError):
+            await compress_frames(
+                frames(), GzipStreamCompressor(), max_flush_delay=invalid
+            ).__anext__()
+
+
+async def _serve(response, accept_encoding=None):
+    headers = []
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"spec_version": "2.4"},
+        "headers": headers,
+    }
+    messages = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await response(scope, receive, send)
+    start = messages[0]
+    body_chunks = [m["body"] for m in messages[1:] if m["body"]]
+    return dict(start["headers"]), body_chunks
+
+
+@pytest.mark.anyio
+async def test_response_compresses_when_accepted():
+    async def stream():
+        for word in ("hello", "world"):
+            yield TextDeltaChunk(text_delta=word)
+            await asyncio.sleep(0)
+
+    response = AssistantStreamResponse(
+        stream(), DataStreamEncoder(), heartbeat=False, compression=["gzip"]
+    )
+    headers, chunks = await _serve(response, "gzip, deflate")
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    decompress = _decompressor("gzip")
+    assert decompress(chunks[0]) == b'0:"hello"\n'
+    assert b"".join(decompress(chunk) for chunk in chunks[1:]) == b'0:"world"\n'
+
+
+@pytest.mark.anyio
+async def test_response_sends_identity_without_accept_encoding():
+    async def stream():
+        yield TextDeltaChunk(text_delta="hello")
+
+    response = DataStreamResponse(stream(), compression=True)
+    headers, chunks = await _serve(response)
+
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert chunks == [b'0:"hello"\n']
+
+
+@pytest.mark.anyio
+async def test_compression_off_by_default():
+    async def stream():
+        yield TextDeltaChunk(text_delta="hello")
+
+    response = DataStreamResponse(stream())
+    headers, chunks = await _serve(response, "gzip")
+
+    assert b"content-encoding" not in headers
+    assert b"vary" not in headers
+    assert chunks == [b'0:"hello"\n']
+
+
+def _decompressor(encoding):
+    if encoding == "gzip":
+        return zlib.decompressobj(31).decompress
+    if encoding == "br":
+        import brotli
+
+        return brotli.Decompressor().process
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj().decompress
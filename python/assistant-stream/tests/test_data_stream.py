@@ -1,3 +1,4 @@
+import dataclasses
 import json
 import logging
 
@@ -6,6 +7,7 @@ from assistant_stream import create_run, RunController
 
 from assistant_stream.assistant_stream_chunk import (
     AnnotationsChunk,
+    DataChunk,
     ErrorChunk,
     FileChunk,
     StepFinishChunk,
@@ -325,3 +327,131 @@ async def test_run_controller_add_reasoning_part_carries_the_parent():
     assert lines == [
         'aui-reasoning-part-start:{"unstable_summary": "Planning", "parentId": "p1"}\n'
     ]
+
+
+@pytest.mark.anyio
+async def test_encode_chunk_override_applies_to_bytes_stream() -> None:
+    class UpperEncoder(DataStreamEncoder):
+        def encode_chunk(self, chunk):
+            encoded = super().encode_chunk(chunk)
+            return encoded.upper() if encoded else encoded
+
+    async def stream():
+        yield TextDeltaChunk(text_delta="hi")
+
+    frames = [frame async for frame in UpperEncoder().encode_stream_bytes(stream())]
+
+    assert frames == [b'0:"HI"\n']
+
+
+def test_chunks_are_slotted_and_keep_type_as_a_field() -> None:
+    chunk = TextDeltaChunk("hi", "text-delta", "p1")
+
+    assert chunk.parent_id == "p1"
+    assert chunk.type == TextDeltaChunk.TYPE == "text-delta"
+    assert not hasattr(chunk, "__dict__")
+    assert TextDeltaChunk(text_delta="hi", type="text-delta", parent_id="p1") == chunk
+    assert dataclasses.asdict(chunk) == {
+        "text_delta": "hi",
+        "type": "text-delta",
+        "parent_id": "p1",
+    }
+    assert DataStreamEncoder().encode_chunk(DataChunk(data=TextDeltaChunk("hi"))) == (
+        '2:[{"text_delta": "hi", "type": "text-delta", "parent_id": null}]\n'
+    )
+
+
+def test_data_stream_encoder_dispatches_subclassed_and_duck_typed_chunks() -> None:
+    class TaggedTextDeltaChunk(TextDeltaChunk):
+        __slots__ = ("tag",)
+
+    class DuckStepStart:
+        type = "step-start"
+        message_id = "m1"
+
+    encoder = DataStreamEncoder()
+
+    assert encoder.encode_chunk(TaggedTextDeltaChunk(text_delta="hi")) == '0:"hi"\n'
+    assert encoder.encode_chunk(DuckStepStart()) == 'f:{"messageId": "m1"}\n'
+
+
+@pytest.mark.anyio
+async def test_compact_dialect_declares_handles_once() -> None:
+    path = ["messages", "0", "parts", "1", "text"]
+
+    async def stream():
+        yield TextDeltaChunk(text_delta="a", parent_id="p1")
+        yield TextDeltaChunk(text_delta="b", parent_id="p1")
+        yield ToolCallBeginChunk(tool_call_id="c1", tool_name="t", parent_id="p1")
+        for value in ("x", "y", "z"):
+            yield UpdateStateChunk(
+                operations=[{"type": "append-text", "path": path, "value": value}]
+            )
+        yield TextDeltaChunk(text_delta="plain")
+
+    encoder = DataStreamEncoder(compact=True)
+    frames = [frame async for frame in encoder.encode_stream_bytes(stream())]
+
+    assert b"".join(frames).decode().splitlines() == [
+        'aui-ref:{"parentId": "p1", "ref": 0}',
+        'aui-t:[0, "a"]',
+        'aui-t:[0, "b"]',
+        'b:{"toolCallId": "c1", "toolName": "t", "parentRef": 0}',
+        'aui-s:[["a", ["messages", "0", "parts", "1", "text"], "x"]]',
+        'aui-ref:{"path": ["messages", "0", "parts", "1", "text"], "ref": 0}',
+        'aui-s:[["a", 0, "y"]]',
+        'aui-s:[["a", 0, "z"]]',
+        '0:"plain"',
+        'c:{"toolCallId": "c1", "argsTextDelta": "{}", "isFinal": true}',
+    ]
+
+
+@pytest.mark.anyio
+async def test_data_stream_response_negotiates_the_compact_dialect() -> None:
+    from assistant_stream.serialization.data_stream import DataStreamResponse
+
+    async def serve(response, dialect):
+        messages = []
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        headers = [(b"x-assistant-stream-dialect", dialect)] if dialect else []
+        await response({"type": "http", "headers": headers}, receive, send)
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        return dict(messages[0]["headers"]), body
+
+    async def stream():
+        yield TextDeltaChunk(text_delta="hi", parent_id="p1")
+
+    headers, body = await serve(DataStreamResponse(stream(), compact=True), b"compact")
+    assert headers[b"x-assistant-stream-dialect"] == b"compact"
+    assert body.startswith(b"aui-ref:")
+
+    headers, body = await serve(DataStreamResponse(stream(), compact=True), None)
+    assert b"x-assistant-stream-dialect" not in headers
+    assert headers[b"vary"] == b"x-assistant-stream-dialect"
+    assert body.startswith(b"aui-text-delta:")
+
+    headers, body = await serve(DataStreamResponse(stream()), b"compact")
+    assert body.startswith(b"aui-text-delta:")
+
+
+@pytest.mark.anyio
+async def test_encode_stream_override_wrapping_super_is_used_for_bytes() -> None:
+    class Wrap(DataStreamEncoder):
+        async def encode_stream(self, stream):
+            async for frame in super().encode_stream(stream):
+                yield frame.upper()
+
+    async def stream():
+        yield TextDeltaChunk(text_delta="hi")
+
+    encoder = Wrap()
+    assert [frame async for frame in encoder.encode_stream(stream())] == ['0:"HI"\n']
+    assert [frame async for frame in encoder.encode_stream_bytes(stream())] == [
+        b'0:"HI"\n'
+    ]
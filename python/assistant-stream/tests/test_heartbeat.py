@@ -1,5 +1,6 @@
 import asyncio
 import json
+import time
 
 import pytest
 
@@ -15,6 +16,7 @@ from assistant_stream.serialization.data_stream import (
     DataStreamEncoder,
     DataStreamResponse,
 )
+from assistant_stream.serialization import heartbeat
 from assistant_stream.serialization.heartbeat import (
     DATA_STREAM_KEEPALIVE_LINE,
     DEFAULT_HEARTBEAT_INTERVAL,
@@ -49,7 +51,7 @@ async def test_heartbeat_emitted_when_idle():
     response = AssistantStreamResponse(
         stream(), AssistantTransportEncoder(), heartbeat=0.05
     )
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     heartbeats = [line for line in lines if line == SSE_HEARTBEAT_LINE]
     assert len(heartbeats) >= 2
@@ -73,7 +75,7 @@ async def test_heartbeat_false_disables():
     response = AssistantStreamResponse(
         stream(), AssistantTransportEncoder(), heartbeat=False
     )
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert all(not line.startswith(":") for line in lines)
     assert lines[-1] == "data: [DONE]\n\n"
@@ -87,7 +89,7 @@ async def test_subclass_forwards_heartbeat_kwarg():
         yield TextDeltaChunk(text_delta="world")
 
     response = AssistantTransportResponse(stream(), heartbeat=False)
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert all(not line.startswith(":") for line in lines)
     assert lines[-1] == "data: [DONE]\n\n"
@@ -101,7 +103,7 @@ async def test_data_stream_emits_blank_line_keepalives_when_idle():
         yield TextDeltaChunk(text_delta="world")
 
     response = AssistantStreamResponse(stream(), DataStreamEncoder(), heartbeat=0.05)
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     keepalives = [line for line in lines if line == DATA_STREAM_KEEPALIVE_LINE]
     assert len(keepalives) >= 2
@@ -119,7 +121,7 @@ async def test_data_stream_response_defaults_to_no_keepalives():
         yield TextDeltaChunk(text_delta="world")
 
     response = DataStreamResponse(stream())
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert lines == ['0:"hello"\n', '0:"world"\n']
 
@@ -132,7 +134,7 @@ async def test_data_stream_response_heartbeat_opt_in():
         yield TextDeltaChunk(text_delta="world")
 
     response = DataStreamResponse(stream(), heartbeat=0.05)
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert DATA_STREAM_KEEPALIVE_LINE in lines
 
@@ -167,7 +169,7 @@ async def test_custom_sse_encoder_inherits_comment_heartbeats():
     response = AssistantStreamResponse(
         stream(), _PassthroughEncoder("text/event-stream"), heartbeat=0.05
     )
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert SSE_HEARTBEAT_LINE in lines
 
@@ -182,7 +184,7 @@ async def test_tokenless_encoder_never_emits_keepalives():
     response = AssistantStreamResponse(
         stream(), _PassthroughEncoder("application/json"), heartbeat=0.05
     )
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert lines == ["data: hello\n\n", "data: world\n\n"]
 
@@ -195,7 +197,7 @@ async def test_openai_stream_response_emits_comment_heartbeats():
         yield TextDeltaChunk(text_delta="world")
 
     response = OpenAIStreamResponse(stream(), heartbeat=0.05)
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert SSE_HEARTBEAT_LINE in lines
     assert lines[-1] == "data: [DONE]\n\n"
@@ -227,7 +229,7 @@ async def test_real_chunk_resets_heartbeat_timer():
     response = AssistantStreamResponse(
         stream(), AssistantTransportEncoder(), heartbeat=0.5
     )
-    lines = [line async for line in response.body_iterator]
+    lines = [line.decode("utf-8") async for line in response.body_iterator]
 
     assert SSE_HEARTBEAT_LINE not in lines
 
@@ -266,3 +268,106 @@ async def test_add_keepalive_closes_upstream_when_no_read_pending():
     assert await gen.__anext__() == "data: 1\n\n"
     await gen.aclose()
     assert closed.is_set()
+
+
+@pytest.mark.anyio
+async def test_response_body_carries_encoder_bytes():
+    async def stream():
+        yield TextDeltaChunk(text_delta="hello")
+
+    response = AssistantStreamResponse(
+        stream(), _PassthroughEncoder("application/json")
+    )
+    frames = [frame async for frame in response.body_iterator]
+
+    assert frames == [b"data: hello\n\n"]
+
+
+@pytest.mark.anyio
+async def test_add_keepalive_creates_no_task_per_frame():
+    loop = asyncio.get_running_loop()
+    created = 0
+    previous_factory = loop.get_task_factory()
+
+    def counting_factory(loop, coro, **kwargs):
+        nonlocal created
+        created += 1
+        if previous_factory is not None:
+            return previous_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def stream():
+        for i in range(500):
+            yield f"data: {i}\n\n"
+
+    loop.set_task_factory(counting_factory)
+    try:
+        lines = [line async for line in add_keepalive(stream(), 5, SSE_HEARTBEAT_LINE)]
+    finally:
+        loop.set_task_factory(previous_factory)
+
+    assert lines == [f"data: {i}\n\n" for i in range(500)]
+    assert created <= 1
+
+
+@pytest.mark.anyio
+async def test_idle_streams_share_one_wheel_timer():
+    async def idle():
+        yield "data: 1\n\n"
+        await asyncio.sleep(0.3)
+
+    async def consume(gen):
+        return [line async for line in gen]
+
+    gens = [add_keepalive(idle(), 0.05, SSE_HEARTBEAT_LINE) for _ in range(50)]
+    results = await asyncio.gather(*(consume(gen) for gen in gens))
+
+    wheels = heartbeat._wheels[asyncio.get_running_loop()]
+    assert len(wheels) == 1
+    for lines in results:
+        assert lines[0] == "data: 1\n\n"
+        assert 2 <= lines.count(SSE_HEARTBEAT_LINE) <= 6
+
+
+@pytest.mark.anyio
+async def test_wheel_catches_up_every_slot_after_a_loop_stall():
+    async def idle():
+        yield "data: 1\n\n"
+        await asyncio.sleep(1.5)
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [line async for line in add_keepalive(idle(), 0.2, SSE_HEARTBEAT_LINE)]
+
+    async def stall():
+        # Blocks the loop for three ticks at a few different phases.
+        for pause in (0.35, 0.32, 0.29):
+            await asyncio.sleep(pause)
+            time.sleep(0.15)
+
+    # Streams started a tick apart land in different wheel slots.
+    *results, _ = await asyncio.gather(
+        *(consume(i * 0.05) for i in range(4)), stall()
+    )
+
+    for lines in results:
+        assert lines.count(SSE_HEARTBEAT_LINE) >= 4
+
+
+@pytest.mark.anyio
+async def test_stream_opened_on_an_idle_wheel_waits_a_full_interval():
+    async def quick():
+        yield "data: 1\n\n"
+
+    async def slow_first_frame():
+        await asyncio.sleep(0.3)
+        yield "data: 1\n\n"
+
+    # The first stream creates the wheel, which then sits idle for several
+    # intervals before the second stream is scheduled on it.
+    assert [line async for line in add_keepalive(quick(), 0.4, SSE_HEARTBEAT_LINE)]
+    await asyncio.sleep(2)
+
+    stream = add_keepalive(slow_first_frame(), 0.4, SSE_HEARTBEAT_LINE)
+    lines = [line async for line in stream]
+    assert lines == ["data: 1\n\n"]
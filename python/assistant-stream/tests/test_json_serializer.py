@@ -0,0 +1,125 @@
+import json
+from dataclasses import dataclass
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import DataChunk, UpdateStateChunk
+from assistant_stream.serialization.assistant_transport import AssistantTransportEncoder
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+from assistant_stream.serialization.json_serializer import (
+    JSONSerializer,
+    StdlibJSONSerializer,
+    available_json_backends,
+    resolve_json_serializer,
+)
+from assistant_stream.serialization.openai_stream import OpenAIStreamEncoder
+from assistant_stream.state import AssistantState
+from tests.generate_interop_fixture import CHUNKS
+
+
+async def _frames(encoder, chunks) -> list[bytes]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [frame async for frame in encoder.encode_stream_bytes(stream())]
+
+
+def _sse_payloads(frames: list[bytes]) -> list:
+    bodies = [frame[len(b"data: ") :].strip() for frame in frames]
+    return [body if body == b"[DONE]" else json.loads(body) for body in bodies]
+
+
+def _data_stream_payloads(frames: list[bytes]) -> list:
+    out = []
+    for frame in frames:
+        kind, _, body = frame.partition(b":")
+        out.append((kind, json.loads(body)))
+    return out
+
+
+def test_resolve_defaults_to_stdlib() -> None:
+    assert isinstance(resolve_json_serializer(None), StdlibJSONSerializer)
+    assert isinstance(resolve_json_serializer("stdlib"), StdlibJSONSerializer)
+    custom = StdlibJSONSerializer()
+    assert resolve_json_serializer(custom) is custom
+    with pytest.raises(ValueError):
+        resolve_json_serializer("simdjson")
+
+
+def test_auto_prefers_an_installed_fast_backend() -> None:
+    backends = available_json_backends()
+    resolved = resolve_json_serializer("auto")
+    expected = backends[1] if len(backends) > 1 else "stdlib"
+    assert resolved.name == expected
+
+
+def test_stdlib_serializer_matches_json_dumps() -> None:
+    value = {"text": "héllo", "items": [1, 2.5, None, True], "nested": {"a": "b"}}
+    assert StdlibJSONSerializer().dumps(value) == json.dumps(value).encode("utf-8")
+    assert StdlibJSONSerializer(ensure_ascii=False).dumps(value) == json.dumps(
+        value, ensure_ascii=False
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize("backend", available_json_backends())
+@pytest.mark.anyio
+async def test_backends_match_stdlib_on_interop_chunks(backend: str) -> None:
+    expected = await _frames(AssistantTransportEncoder(), CHUNKS)
+    actual = await _frames(AssistantTransportEncoder(serializer=backend), CHUNKS)
+    assert _sse_payloads(actual) == _sse_payloads(expected)
+
+    expected = await _frames(DataStreamEncoder(), CHUNKS)
+    actual = await _frames(DataStreamEncoder(serializer=backend), CHUNKS)
+    assert _data_stream_payloads(actual) == _data_stream_payloads(expected)
+
+
+@pytest.mark.parametrize("backend", available_json_backends())
+def test_backends_unwrap_state_proxies_and_dataclasses(backend: str) -> None:
+    @dataclass
+    class Point:
+        x: int
+        y: int
+
+    state = AssistantState({"user": {"name": "John"}})
+    proxy = state.draft(lambda _ops: None)["user"]
+    serializer = resolve_json_serializer(backend)
+
+    encoded = serializer.dumps({"user": proxy, "point": Point(1, 2), "big": 2**70})
+
+    assert json.loads(encoded) == {
+        "user": {"name": "John"},
+        "point": {"x": 1, "y": 2},
+        "big": 2**70,
+    }
+
+
+@pytest.mark.parametrize("backend", available_json_backends())
+@pytest.mark.anyio
+async def test_openai_encoder_accepts_serializer(backend: str) -> None:
+    from assistant_stream.assistant_stream_chunk import TextDeltaChunk
+
+    frames = await _frames(
+        OpenAIStreamEncoder(serializer=backend), [TextDeltaChunk(text_delta="héllo")]
+    )
+    payload = json.loads(frames[0][len(b"data: ") :])
+    assert payload["choices"][0]["delta"] == {"content": "héllo"}
+    assert "héllo".encode("utf-8") in frames[0]
+
+
+def test_custom_serializer_is_used_for_every_frame() -> None:
+    class CountingSerializer(JSONSerializer):
+        name = "counting"
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def dumps(self, value):
+            self.calls += 1
+            return json.dumps(value).encode("utf-8")
+
+    serializer = CountingSerializer()
+    encoder = DataStreamEncoder(serializer=serializer)
+    encoder.encode_chunk(DataChunk(data={"a": 1}))
+    encoder.encode_chunk(UpdateStateChunk(operations=[]))
+    assert serializer.calls == 2
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import (
+    DataChunk,
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization import OffloadStats
+from assistant_stream.serialization.assistant_transport import (
+    AssistantTransportEncoder,
+)
+from assistant_stream.serialization.data_stream import DataStreamEncoder
+from assistant_stream.serialization.json_serializer import (
+    JSONSerializer,
+    StdlibJSONSerializer,
+)
+from assistant_stream.serialization.offload import (
+    DEFAULT_OFFLOAD_THRESHOLD,
+    FrameOffloader,
+    estimate_size,
+    resolve_offload_threshold,
+)
+from assistant_stream.state import AssistantState
+
+BIG = "x" * 5_000
+
+CHUNKS = [
+    TextDeltaChunk(text_delta="before"),
+    UpdateStateChunk(operations=[{"type": "set", "path": ["doc"], "value": BIG}]),
+    TextDeltaChunk(text_delta="between"),
+    ToolCallBeginChunk(tool_call_id="call_1", tool_name="fetch"),
+    ToolResultChunk(tool_call_id="call_1", result={"body": [BIG, BIG]}),
+    DataChunk(data={"small": True}),
+    TextDeltaChunk(text_delta="after"),
+]
+
+
+class ThreadRecordingSerializer(StdlibJSONSerializer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = []
+
+    def dumps(self, value):
+        self.threads.append(threading.get_ident())
+        return super().dumps(value)
+
+    def dumps_cooperative(self, value):
+        self.threads.append(threading.get_ident())
+        return super().dumps_cooperative(value)
+
+
+class GatedSerializer(StdlibJSONSerializer):
+    """Holds worker-thread serialization until the test releases it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def dumps_cooperative(self, value):
+        self.entered.set()
+        self.release.wait(5)
+        return super().dumps_cooperative(value)
+
+
+async def _encode(encoder, chunks=CHUNKS) -> list:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [frame async for frame in encoder.encode_stream_bytes(stream())]
+
+
+@pytest.mark.parametrize("encoder_cls", [DataStreamEncoder, AssistantTransportEncoder])
+@pytest.mark.anyio
+async def test_offloaded_frames_keep_bytes_and_order(encoder_cls):
+    serializer = ThreadRecordingSerializer()
+    stats = OffloadStats()
+    encoder = encoder_cls(serializer=serializer, offload=1_000, offload_stats=stats)
+
+    frames = await _encode(encoder)
+
+    assert frames == await _encode(encoder_cls())
+    assert encoder.offload_stats is stats
+    assert stats.offloaded_frames == 2
+    assert stats.offloaded_bytes > 15_000
+    assert 0 < stats.max_offload_seconds <= stats.offload_seconds
+    loop_thread = threading.get_ident()
+    assert 0 < sum(thread != loop_thread for thread in serializer.threads) < len(
+        serializer.threads
+    )
+
+
+@pytest.mark.anyio
+async def test_offload_is_off_by_default():
+    encoder = DataStreamEncoder()
+    assert encoder.offload_stats is None
+    assert await _encode(encoder) == await _encode(DataStreamEncoder(offload=False))
+
+
+def test_resolve_offload_threshold():
+    assert resolve_offload_threshold(True) == DEFAULT_OFFLOAD_THRESHOLD
+    assert resolve_offload_threshold(False) is None
+    assert resolve_offload_threshold(None) is None
+    assert resolve_offload_threshold(10) == 10
+    with pytest.raises(ValueError):
+        resolve_offload_threshold(0)
+    with pytest.raises(ValueError):
+        resolve_offload_threshold(1.5)
+
+
+def test_estimate_size_extrapolates_large_containers():
+    small = {"a": "bc", "n": [1, 2.5, None]}
+    rows = {"rows": [{"id": i, "name": f"row {i}"} for i in range(100_000)]}
+
+    for value in (small, rows):
+        actual = len(json.dumps(value))
+        assert actual // 2 <= estimate_size(value) <= actual * 2
+
+
+@pytest.mark.parametrize("encoder_cls", [DataStreamEncoder, AssistantTransportEncoder])
+@pytest.mark.anyio
+async def test_offloaded_payload_is_snapshotted_on_the_loop(encoder_cls):
+    rows = [{"id": i, "name": BIG} for i in range(3)]
+    chunks = [DataChunk(data={"rows": rows})]
+    expected = await _encode(encoder_cls(), [DataChunk(data={"rows": list(rows)})])
+    serializer = GatedSerializer()
+
+    async def mutate():
+        await asyncio.to_thread(serializer.entered.wait, 5)
+        # The loop keeps running while the worker serializes.
+        rows.clear()
+        serializer.release.set()
+
+    mutation = asyncio.create_task(mutate())
+    frames = await _encode(encoder_cls(serializer=serializer, offload=1_000), chunks)
+    await mutation
+
+    assert not rows
+    assert frames == expected
+
+
+def test_chunk_subclasses_are_offloaded():
+    class TaggedDataChunk(DataChunk):
+        __slots__ = ("tag",)
+
+    offloader = FrameOffloader(1_000)
+
+    assert offloader.is_large(TaggedDataChunk(data=BIG))
+    assert not offloader.is_large(TaggedDataChunk(data="small"))
+
+
+def test_snapshot_resolves_state_proxies():
+    state = AssistantState({"doc": {"rows": [BIG]}})
+    proxy = state.draft(lambda operations: None)
+    chunk = ToolResultChunk(tool_call_id="call_1", result={"doc": proxy["doc"]})
+
+    copied = FrameOffloader(1_000).snapshot(chunk)
+
+    assert copied is not chunk
+    assert copied.result == {"doc": {"rows": [BIG]}}
+    assert type(copied.result["doc"]) is dict
+    assert copied.tool_call_id == "call_1"
+
+
+def test_container_dense_payloads_serialize_inline():
+    rows = [{"id": i, "tags": ["a"]} for i in range(10_000)]
+    offloader = FrameOffloader(1_000)
+    update = UpdateStateChunk(operations=[{"type": "set", "path": ["rows"], "value": rows}])
+
+    # Copying the rows would block the loop longer than encoding them.
+    assert not offloader.is_large(ToolResultChunk(tool_call_id="call_1", result=rows))
+    assert not offloader.is_large(update)
+
+
+def test_state_update_values_are_snapshotted():
+    rows = [{"id": i, "name": BIG} for i in range(3)]
+    update = UpdateStateChunk(operations=[{"type": "set", "path": ["rows"], "value": rows}])
+
+    copied = FrameOffloader(1_000).snapshot(update)
+
+    # Set ops hold the caller's objects, which it may go on changing.
+    assert copied.operations == update.operations
+    assert copied.operations[0]["value"] is not rows
+    assert copied.operations[0]["value"][0] is not rows[0]
+
+
+@pytest.mark.parametrize("encoder_cls", [DataStreamEncoder, AssistantTransportEncoder])
+@pytest.mark.anyio
+async def test_serializers_without_cooperative_dumps_stay_inline(encoder_cls):
+    class OneShotSerializer(JSONSerializer):
+        name = "one-shot"
+
+        def dumps(self, value):
+            return StdlibJSONSerializer().dumps(value)
+
+    encoder = encoder_cls(serializer=OneShotSerializer(), offload=1_000)
+
+    assert encoder.offload_stats is None
+    assert await _encode(encoder) == await _encode(encoder_cls())
@@ -0,0 +1,192 @@
+import json
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import (
+    DataChunk,
+    ReasoningDeltaChunk,
+    StepFinishChunk,
+    TextDeltaChunk,
+    ToolCallArgsTextFinishChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+)
+from assistant_stream.serialization.json_serializer import StdlibJSONSerializer
+from assistant_stream.serialization.openai_stream import OpenAIStreamEncoder
+
+
+async def _events(encoder, chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    frames = [frame async for frame in encoder.encode_stream_bytes(stream())]
+    assert frames[-1] == b"data: [DONE]\n\n"
+    return frames[:-1], [json.loads(frame[len(b"data: ") :]) for frame in frames[:-1]]
+
+
+@pytest.mark.anyio
+async def test_text_frames_keep_envelope_layout():
+    encoder = OpenAIStreamEncoder(model="m", system_fingerprint="fp")
+    frames, events = await _events(encoder, [TextDeltaChunk(text_delta="hi")])
+
+    expected = {
+        "id": encoder.id,
+        "object": "chat.completion.chunk",
+        "created": encoder.created,
+        "model": "m",
+        "system_fingerprint": "fp",
+        "choices": [
+            {
+                "index": 0,
+                "delta": {"content": "hi"},
+                "logprobs": None,
+                "finish_reason": None,
+            }
+        ],
+    }
+    assert frames[0] == b"data: " + json.dumps(expected).encode() + b"\n\n"
+    assert events[1]["choices"][0] == {
+        "index": 0,
+        "delta": {},
+        "logprobs": None,
+        "finish_reason": "stop",
+    }
+    assert {event["created"] for event in events} == {encoder.created}
+
+
+@pytest.mark.anyio
+async def test_tool_calls_and_reasoning_are_mapped():
+    _, events = await _events(
+        OpenAIStreamEncoder(),
+        [
+            ReasoningDeltaChunk(reasoning_delta="thinking"),
+            ToolCallBeginChunk(tool_call_id="call_a", tool_name="search"),
+            ToolCallDeltaChunk(tool_call_id="call_a", args_text_delta='{"q":'),
+            ToolCallBeginChunk(tool_call_id="call_b", tool_name="fetch"),
+            ToolCallDeltaChunk(tool_call_id="call_a", args_text_delta='"x"}'),
+            ToolCallArgsTextFinishChunk(tool_call_id="call_b", args_text_delta="{}"),
+            ToolCallArgsTextFinishChunk(tool_call_id="call_a"),
+            DataChunk(data={"ignored": True}),
+            StepFinishChunk(finish_reason="tool-calls"),
+        ],
+    )
+
+    deltas = [event["choices"][0]["delta"] for event in events]
+    assert deltas[0] == {"reasoning_content": "thinking"}
+    assert deltas[1:6] == [
+        {
+            "tool_calls": [
+                {
+                    "index": 0,
+                    "id": "call_a",
+                    "type": "function",
+                    "function": {"name": "search", "arguments": ""},
+                }
+            ]
+        },
+        {"tool_calls": [{"index": 0, "function": {"arguments": '{"q":'}}]},
+        {
+            "tool_calls": [
+                {
+                    "index": 1,
+                    "id": "call_b",
+                    "type": "function",
+                    "function": {"name": "fetch", "arguments": ""},
+                }
+            ]
+        },
+        {"tool_calls": [{"index": 0, "function": {"arguments": '"x"}'}}]},
+        {"tool_calls": [{"index": 1, "function": {"arguments": "{}"}}]},
+    ]
+    assert len(events) == 7
+    assert events[-1]["choices"][0]["finish_reason"] == "tool_calls"
+
+
+@pytest.mark.anyio
+async def test_usage_chunk_sums_steps():
+    _, events = await _events(
+        OpenAIStreamEncoder(include_usage=True),
+        [
+            TextDeltaChunk(text_delta="a"),
+            StepFinishChunk(
+                finish_reason="tool-calls", input_tokens=10, output_tokens=2
+            ),
+            TextDeltaChunk(text_delta="b"),
+            StepFinishChunk(finish_reason="length", input_tokens=15, output_tokens=3),
+        ],
+    )
+
+    assert events[-2]["choices"][0]["finish_reason"] == "length"
+    assert events[-1]["choices"] == []
+    assert events[-1]["usage"] == {
+        "prompt_tokens": 25,
+        "completion_tokens": 5,
+        "total_tokens": 30,
+    }
+
+
+@pytest.mark.anyio
+async def test_usage_chunk_is_opt_in():
+    _, events = await _events(
+        OpenAIStreamEncoder(),
+        [StepFinishChunk(finish_reason="stop", input_tokens=1, output_tokens=1)],
+    )
+
+    assert all("usage" not in event for event in events)
+    assert all(event["choices"] for event in events)
+
+
+@pytest.mark.anyio
+async def test_reused_encoder_starts_each_stream_fresh():
+    encoder = OpenAIStreamEncoder(include_usage=True)
+    chunks = [
+        ToolCallBeginChunk(tool_call_id="call_1", tool_name="search"),
+        StepFinishChunk(finish_reason="tool-calls", input_tokens=3, output_tokens=1),
+    ]
+    await _events(encoder, chunks)
+    _, events = await _events(
+        encoder,
+        [
+            ToolCallBeginChunk(tool_call_id="call_2", tool_name="lookup"),
+            StepFinishChunk(finish_reason="stop", input_tokens=5, output_tokens=2),
+        ],
+    )
+
+    assert events[0]["choices"][0]["delta"]["tool_calls"][0]["index"] == 0
+    assert events[-2]["choices"][0]["finish_reason"] == "stop"
+    assert events[-1]["usage"]["prompt_tokens"] == 5
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("reason", ["error", "other", "unknown"])
+async def test_finish_reasons_without_an_openai_value_become_stop(reason):
+    _, events = await _events(
+        OpenAIStreamEncoder(), [StepFinishChunk(finish_reason=reason)]
+    )
+
+    assert events[-1]["choices"][0]["finish_reason"] == "stop"
+
+
+@pytest.mark.anyio
+async def test_token_frames_only_serialize_the_delta():
+    class RecordingSerializer(StdlibJSONSerializer):
+        def __init__(self) -> None:
+            super().__init__(ensure_ascii=False)
+            self.values = []
+
+        def dumps(self, value):
+            self.values.append(value)
+            return super().dumps(value)
+
+    serializer = RecordingSerializer()
+    encoder = OpenAIStreamEncoder(serializer=serializer)
+    await _events(encoder, [TextDeltaChunk(text_delta=str(i)) for i in range(50)])
+
+    envelopes = [
+        value
+        for value in serializer.values
+        if isinstance(value, dict) and "id" in value
+    ]
+    # One envelope per finish reason (None for tokens, "stop" at the end).
+    assert len(envelopes) == 2
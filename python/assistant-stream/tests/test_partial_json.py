@@ -0,0 +1,290 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from assistant_stream import create_run
+from assistant_stream.modules.partial_json import IncrementalJSONParser
+
+DOCUMENTS = [
+    {"url": "https://example.com", "depth": 2, "follow": True, "tags": ["a", "b"]},
+    {"nested": {"list": [1, -2.5, 3e2, None, {"x": []}], "empty": {}}, "n": 0},
+    {"text": 'quote " backslash \\ newline \n tab \t slash /', "u": "naïve 日本 🎉"},
+    [[], [[]], "", 0, False],
+    "plain string",
+    {"escaped": "\u0001\u001f", "surrogate": "🎉"},
+]
+
+
+def _split(rng: random.Random, text: str) -> list:
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = start + rng.randint(1, 7)
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_matches_json_loads_in_any_split(document):
+    rng = random.Random(1)
+    for text in (
+        json.dumps(document),
+        json.dumps(document, indent=2),
+        json.dumps(document, ensure_ascii=False),
+    ):
+        for _ in range(50):
+            parser = IncrementalJSONParser()
+            events = []
+            for piece in _split(rng, text):
+                events += parser.feed(piece)
+            events += parser.close()
+            assert parser.done
+            assert parser.value == json.loads(text)
+            assert events[-1] == ((), json.loads(text))
+
+
+def test_partial_value_and_field_events():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"url": "https://exa') == []
+    assert parser.value == {"url": "https://exa"}
+
+    assert parser.feed('mple.com", "opts": {"depth": 1') == [
+        (("url",), "https://example.com")
+    ]
+    # Numbers appear only once they are complete.
+    assert parser.value == {"url": "https://example.com", "opts": {}}
+
+    assert parser.feed(', "tags": ["a"') == [
+        (("opts", "depth"), 1),
+        (("opts", "tags", 0), "a"),
+    ]
+    assert parser.feed("]}}  ") == [
+        (("opts", "tags"), ["a"]),
+        (("opts",), {"depth": 1, "tags": ["a"]}),
+        ((), {"url": "https://example.com", "opts": {"depth": 1, "tags": ["a"]}}),
+    ]
+    assert parser.done
+
+
+def test_partial_string_is_rebuilt_only_after_new_text():
+    parser = IncrementalJSONParser()
+    parser.feed('{"text": "ab')
+
+    first = parser.value["text"]
+    assert parser.value["text"] is first
+    parser.feed("cd")
+    assert parser.value == {"text": "abcd"}
+    parser.feed('"}')
+    assert parser.value == {"text": "abcd"}
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"a" 1}', '{"a": 1,}', "[1 2]", '{"a": tru}', '"\\x"', "01", '{} {}', "{,}"],
+)
+def test_invalid_documents_raise(text):
+    parser = IncrementalJSONParser()
+    with pytest.raises(ValueError):
+        parser.feed(text)
+        parser.close()
+    with pytest.raises(ValueError):
+        parser.feed("")
+
+
+def test_incomplete_document_raises_on_close():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": [1')
+    with pytest.raises(ValueError, match="Incomplete"):
+        parser.close()
+
+    number = IncrementalJSONParser()
+    number.feed("12")
+    assert number.close() == [((), 12)]
+
+
+@pytest.mark.anyio
+async def test_tool_call_exposes_partial_args_and_field_events():
+    seen = []
+
+    async def run(controller):
+        tool = await controller.add_tool_call("fetch", "call_1")
+        tool.append_args_text('{"url": "https://ex')
+        # Text sent before the parser was requested is parsed on first use.
+        assert tool.partial_args == {"url": "https://ex"}
+        tool.on_args_field(lambda path, value: seen.append((path, value)))
+        tool.append_args_text('ample.com", "n": 2}')
+        assert tool.args_complete
+        assert await tool.wait_for_args() == {"url": "https://example.com", "n": 2}
+        tool.set_response("ok")
+
+    chunks = [chunk async for chunk in create_run(run)]
+
+    assert seen == [
+        (("url",), "https://example.com"),
+        (("n",), 2),
+        ((), {"url": "https://example.com", "n": 2}),
+    ]
+    assert [chunk.type for chunk in chunks][-2:] == [
+        "tool-result",
+        "tool-call-args-text-finish",
+    ]
+
+
+@pytest.mark.anyio
+async def test_handler_starts_when_args_close():
+    started = asyncio.Event()
+    order = []
+
+    async def fetch(args):
+        order.append(("handler", args["url"]))
+        started.set()
+        await asyncio.sleep(0)
+        return {"status": 200}
+
+    async def run(controller):
+        tool = await controller.add_tool_call("fetch", "call_1", handler=fetch)
+        tool.append_args_text('{"url": "https://example.com"}')
+        await started.wait()
+        # The handler overlaps with the rest of the generation.
+        controller.append_text("still generating")
+        order.append(("text",))
+
+    chunks = [chunk async for chunk in create_run(run)]
+
+    assert order == [("handler", "https://example.com"), ("text",)]
+    results = [chunk for chunk in chunks if chunk.type == "tool-result"]
+    assert results[0].result == {"status": 200}
+    assert not results[0].is_error
+
+
+@pytest.mark.anyio
+async def test_run_end_waits_for_handler_and_reports_errors():
+    def broken(args):
+        raise RuntimeError("boom")
+
+    async def slow(args):
+        await asyncio.sleep(0.01)
+        return args["q"]
+
+    async def run(controller):
+        tool = await controller.add_tool_call("search", "call_slow", handler=slow)
+        tool.append_args_text('{"q": "x"}')
+        tool = await controller.add_tool_call("broken", "call_broken", handler=broken)
+        tool.append_args_text("{}")
+        tool = await controller.add_tool_call("bad", "call_bad", handler=slow)
+        tool.append_args_text("{oops")
+        # Returning right away closes every tool call.
+
+    chunks = [chunk async for chunk in create_run(run)]
+
+    results = {
+        chunk.tool_call_id: chunk for chunk in chunks if chunk.type == "tool-result"
+    }
+    assert results["call_slow"].result == "x"
+    assert results["call_broken"].result == "boom"
+    assert results["call_broken"].is_error
+    assert results["call_bad"].is_error
+
+
+@pytest.mark.anyio
+async def test_close_is_deferred_until_handler_responds():
+    release = asyncio.Event()
+
+    async def slow(args):
+        await release.wait()
+        return "done"
+
+    async def run(controller):
+        tool = await controller.add_tool_call("search", "call_1", handler=slow)
+        tool.append_args_text("{}")
+        await asyncio.sleep(0)
+        tool.close()
+        controller.append_text("after close")
+        release.set()
+
+    chunks = [chunk async for chunk in create_run(run)]
+
+    types = [chunk.type for chunk in chunks if chunk.type.startswith("tool")]
+    assert types == [
+        "tool-call-begin",
+        "tool-call-delta",
+        "tool-result",
+        "tool-call-args-text-finish",
+    ]
+    assert [chunk for chunk in chunks if chunk.type == "tool-result"][0].result == "done"
+
+
+@pytest.mark.anyio
+async def test_cancel_handler_closes_without_a_response():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def hang(args):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run(controller):
+        tool = await controller.add_tool_call("search", "call_1", handler=hang)
+        tool.append_args_text("{}")
+        await started.wait()
+        tool.cancel_handler()
+
+    chunks = await asyncio.wait_for(_collect(create_run(run)), timeout=1)
+
+    assert cancelled.is_set()
+    assert "tool-result" not in [chunk.type for chunk in chunks]
+    assert chunks[-1].type == "tool-call-args-text-finish"
+
+
+@pytest.mark.anyio
+async def test_early_stream_close_cancels_pending_handler():
+    cancelled = asyncio.Event()
+
+    async def hang(args):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run(controller):
+        tool = await controller.add_tool_call("search", "call_1", handler=hang)
+        tool.append_args_text("{}")
+
+    stream = create_run(run)
+    async for chunk in stream:
+        if chunk.type == "tool-call-delta":
+            break
+    await asyncio.wait_for(stream.aclose(), timeout=1)
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.anyio
+async def test_second_handler_is_rejected():
+    calls = []
+
+    async def run(controller):
+        tool = await controller.add_tool_call(
+            "search", "call_1", handler=lambda args: calls.append(args)
+        )
+        with pytest.raises(RuntimeError, match="already has a handler"):
+            tool.set_handler(lambda args: calls.append(args))
+        tool.append_args_text("{}")
+
+    chunks = await asyncio.wait_for(_collect(create_run(run)), timeout=1)
+
+    assert calls == [{}]
+    assert [chunk for chunk in chunks if chunk.type == "tool-result"][0].result is None
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
@@ -296,3 +296,200 @@ async def test_raising_on_error_still_finalizes_error_status() -> None:
     with pytest.raises(Exception, match="producer-failed"):
         await _collect(stream)
     assert await ctx.status("a") == "error"
+
+
+@pytest.mark.anyio
+async def test_batching_appends_fewer_entries_with_identical_bytes() -> None:
+    sizes: list[int] = []
+    ctx = create_resumable_stream_context(
+        store=create_in_memory_resumable_stream_store(),
+        on_append=lambda _id, n: sizes.append(n),
+        batch_ms=20,
+        batch_max_bytes=40,
+    )
+    parts = [f"token-{i} " for i in range(30)]
+    producer = await ctx.run("a", lambda: _make_string_stream(parts))
+    consumer = await ctx.run("a", lambda: _make_string_stream(["unused"]))
+
+    a, b = await asyncio.gather(_collect(producer), _collect(consumer))
+    assert a == b == "".join(parts)
+    assert len(sizes) < len(parts) / 3
+    assert max(sizes) <= 40
+    assert sum(sizes) == len("".join(parts).encode())
+
+
+@pytest.mark.anyio
+async def test_batching_flushes_buffered_frames_before_an_error() -> None:
+    ctx = create_resumable_stream_context(
+        store=create_in_memory_resumable_stream_store(), batch_ms=1_000
+    )
+
+    async def failing() -> AsyncIterator[bytes]:
+        yield b"partial "
+        yield b"answer"
+        raise Exception("boom")
+
+    stream = await ctx.run("a", lambda: failing())
+    received = bytearray()
+    with pytest.raises(Exception, match="boom"):
+        async for chunk in stream:
+            received.extend(chunk)
+    assert received == b"partial answer"
+    assert await ctx.status("a") == "error"
+
+
+
+@pytest.mark.anyio
+async def test_batching_accepts_a_plain_async_iterator() -> None:
+    class Frames:
+        def __init__(self) -> None:
+            self._parts = iter([b"hello ", b"world"])
+
+        def __aiter__(self) -> Frames:
+            return self
+
+        async def __anext__(self) -> bytes:
+            try:
+                return next(self._parts)
+            except StopIteration:
+                raise StopAsyncIteration from None
+
+    ctx = create_resumable_stream_context(
+        store=create_in_memory_resumable_stream_store(), batch_ms=5
+    )
+    stream = await ctx.run("a", Frames)
+    assert await _collect(stream) == "hello world"
+    assert await ctx.status("a") == "done"
+
+def test_rejects_invalid_batch_options() -> None:
+    store = create_in_memory_resumable_stream_store()
+    with pytest.raises(ValueError, match="batch_ms"):
+        create_resumable_stream_context(store=store, batch_ms=-1)
+    with pytest.raises(ValueError, match="batch_max_bytes"):
+        create_resumable_stream_context(store=store, batch_max_bytes=0)
+
+
+class _GatedStore:
+    """Holds every append until `opened` is set; optionally fails them."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self._inner = create_in_memory_resumable_stream_store()
+        self.opened = asyncio.Event()
+        self._fail = fail
+
+    async def append(self, stream_id: str, chunk: bytes) -> None:
+        await self.opened.wait()
+        if self._fail:
+            raise RuntimeError("store-down")
+        await self._inner.append(stream_id, chunk)
+
+    def __getattr__(self, name: str):
+        return getattr(self._inner, name)
+
+
+async def _until_status(ctx, stream_id: str, wanted: str) -> None:
+    while await ctx.status(stream_id) != wanted:
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.anyio
+async def test_write_behind_serves_local_readers_before_the_store() -> None:
+    store = _GatedStore()
+    ctx = create_resumable_stream_context(store=store, write_behind_bytes=1024)
+    parts = [f"token-{i} " for i in range(20)]
+    producer = await ctx.run("a", lambda: _make_string_stream(parts))
+    local = await ctx.resume("a")
+    assert local is not None
+
+    a, b = await asyncio.gather(_collect(producer), _collect(local))
+    assert a == b == "".join(parts)
+    assert await ctx.status("a") == "streaming"
+
+    store.opened.set()
+    await _until_status(ctx, "a", "done")
+    remote = create_resumable_stream_context(store=store)
+    assert await _collect(await remote.require_resume("a")) == "".join(parts)
+
+
+@pytest.mark.anyio
+async def test_write_behind_block_holds_the_run_until_the_store_catches_up() -> None:
+    store = _GatedStore()
+    ctx = create_resumable_stream_context(
+        store=store, write_behind_bytes=16, write_behind_overflow="block"
+    )
+    parts = [f"token-{i} " for i in range(20)]
+    producer = await ctx.run("a", lambda: _make_string_stream(parts))
+    received = bytearray()
+
+    async def read() -> None:
+        async for chunk in producer:
+            received.extend(chunk)
+
+    reader = asyncio.create_task(read())
+    await asyncio.sleep(0.02)
+    assert 0 < len(received) < len("".join(parts))
+
+    store.opened.set()
+    await reader
+    assert received.decode() == "".join(parts)
+    await _until_status(ctx, "a", "done")
+
+
+@pytest.mark.anyio
+async def test_write_behind_fail_keeps_the_run_and_errors_the_stored_copy() -> None:
+    errors: list[object] = []
+    store = _GatedStore()
+    ctx = create_resumable_stream_context(
+        store=store,
+        write_behind_bytes=16,
+        write_behind_overflow="fail",
+        on_error=lambda _id, err: errors.append(err),
+    )
+    parts = [f"token-{i} " for i in range(20)]
+    producer = await ctx.run("a", lambda: _make_string_stream(parts))
+    assert await _collect(producer) == "".join(parts)
+
+    store.opened.set()
+    await _until_status(ctx, "a", "error")
+    assert "overflowed" in str(errors[0])
+
+
+@pytest.mark.anyio
+async def test_write_behind_append_failure_leaves_the_run_intact() -> None:
+    store = _GatedStore(fail=True)
+    store.opened.set()
+    ctx = create_resumable_stream_context(store=store, write_behind_bytes=16)
+    parts = [f"token-{i} " for i in range(20)]
+    producer = await ctx.run("a", lambda: _make_string_stream(parts))
+    assert await _collect(producer) == "".join(parts)
+    await _until_status(ctx, "a", "error")
+    with pytest.raises(Exception, match="store-down"):
+        await _collect(await ctx.require_resume("a"))
+
+
+@pytest.mark.anyio
+async def test_write_behind_propagates_producer_errors_to_local_readers() -> None:
+    ctx = create_resumable_stream_context(
+        store=create_in_memory_resumable_stream_store(), write_behind_bytes=1024
+    )
+
+    async def failing() -> AsyncIterator[bytes]:
+        yield b"partial"
+        raise Exception("boom")
+
+    stream = await ctx.run("a", lambda: failing())
+    with pytest.raises(Exception, match="boom"):
+        await _collect(stream)
+    await _until_status(ctx, "a", "error")
+    with pytest.raises(Exception, match="boom"):
+        await _collect(await ctx.require_resume("a"))
+
+
+def test_rejects_invalid_write_behind_options() -> None:
+    store = create_in_memory_resumable_stream_store()
+    with pytest.raises(ValueError, match="write_behind_bytes"):
+        create_resumable_stream_context(store=store, write_behind_bytes=0)
+    with pytest.raises(ValueError, match="write_behind_overflow"):
+        create_resumable_stream_context(
+            store=store, write_behind_bytes=16, write_behind_overflow="drop"
+        )
@@ -0,0 +1,207 @@
+"""What only the segment-file store does: tailing a growing segment, keeping
+segments on disk, and restart recovery. The store contract it shares with the
+in-memory store is covered in test_resumable_in_memory.py."""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import time
+
+import pytest
+
+from assistant_stream.resumable import create_file_resumable_stream_store
+
+
+def _bytes(s: str) -> bytes:
+    return s.encode("utf-8")
+
+
+async def _drain(iter_) -> list[str]:
+    out: list[str] = []
+    async for entry in iter_:
+        out.append(entry.chunk.decode("utf-8"))
+    return out
+
+
+@pytest.fixture(params=["always", "finalize", "never"])
+def store(request, tmp_path):
+    store = create_file_resumable_stream_store(tmp_path, fsync=request.param)
+    yield store
+    store.dispose()
+
+
+@pytest.mark.anyio
+async def test_multiple_consumers_tail_a_growing_segment(store) -> None:
+    await store.acquire("a")
+    signal = asyncio.Event()
+    readers = [
+        asyncio.create_task(_drain(store.read("a", "", signal))) for _ in range(3)
+    ]
+    parts = [f"part-{i}" for i in range(50)]
+    for part in parts:
+        await store.append("a", _bytes(part))
+        await asyncio.sleep(0)
+    await store.finalize("a", "done")
+    assert await asyncio.gather(*readers) == [parts] * 3
+
+
+@pytest.mark.anyio
+async def test_tailing_reads_new_chunks_without_remapping(store, monkeypatch) -> None:
+    maps = 0
+    real_mmap = mmap.mmap
+
+    def counting_mmap(*args, **kwargs):
+        nonlocal maps
+        maps += 1
+        return real_mmap(*args, **kwargs)
+
+    monkeypatch.setattr(mmap, "mmap", counting_mmap)
+    await store.acquire("a")
+    await store.append("a", _bytes("backlog"))
+    reading = asyncio.create_task(_drain(store.read("a", "", asyncio.Event())))
+    parts = [f"part-{i}" for i in range(20)]
+    for part in parts:
+        await asyncio.sleep(0)
+        await store.append("a", _bytes(part))
+    await store.finalize("a", "done")
+
+    assert await reading == ["backlog", *parts]
+    # One map for the backlog; the tail is read with positioned reads.
+    assert maps == 1
+
+
+@pytest.mark.anyio
+async def test_delete_ends_reads_and_removes_the_segment(store, tmp_path) -> None:
+    await store.acquire("a")
+    reading = asyncio.create_task(_drain(store.read("a", "", asyncio.Event())))
+    await store.append("a", _bytes("x"))
+    await asyncio.sleep(0)
+    await store.delete("a")
+    assert await reading == ["x"]
+    assert await store.status("a") == "missing"
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.anyio
+async def test_expired_streams_are_evicted_and_deleted(tmp_path) -> None:
+    now = time.time() * 1000
+
+    def clock() -> float:
+        return now
+
+    store = create_file_resumable_stream_store(
+        tmp_path, default_ttl_ms=100, now=clock, max_chunk_bytes=4
+    )
+    await store.acquire("a")
+    with pytest.raises(Exception, match="Chunk exceeds maxChunkBytes: 5"):
+        await store.append("a", _bytes("hello"))
+    now += 80
+    await store.append("a", _bytes("hi"))
+    now += 80
+    assert await store.status("a") == "streaming"
+    now += 200
+    assert await store.status("a") == "missing"
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.anyio
+async def test_restart_recovers_finalized_streams(tmp_path) -> None:
+    store = create_file_resumable_stream_store(tmp_path)
+    await store.acquire("done")
+    await store.append("done", _bytes("hello "))
+    await store.append("done", _bytes("world"))
+    await store.finalize("done", "done")
+    await store.acquire("failed")
+    await store.append("failed", _bytes("partial"))
+    await store.finalize("failed", "error", "boom")
+    store.dispose()
+
+    restarted = create_file_resumable_stream_store(tmp_path)
+    assert await restarted.acquire("done") == "consumer"
+    entries = [e async for e in restarted.read("done", "", asyncio.Event())]
+    assert [e.chunk for e in entries] == [b"hello ", b"world"]
+    assert await _drain(
+        restarted.read("done", entries[0].cursor, asyncio.Event())
+    ) == ["world"]
+    assert await restarted.status("failed") == "error"
+    with pytest.raises(RuntimeError, match="boom"):
+        await _drain(restarted.read("failed", "", asyncio.Event()))
+
+
+@pytest.mark.anyio
+async def test_restart_finalizes_interrupted_streams_and_drops_torn_records(
+    tmp_path,
+) -> None:
+    store = create_file_resumable_stream_store(tmp_path)
+    await store.acquire("a")
+    await store.append("a", _bytes("kept"))
+    await store.append("a", _bytes("torn"))
+    store.dispose()
+    (path,) = tmp_path.iterdir()
+    os.truncate(path, path.stat().st_size - 2)
+    path.with_name("junk.seg").write_bytes(b"not a segment")
+
+    restarted = create_file_resumable_stream_store(tmp_path)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    # The repaired segment reads the same after another restart.
+    for recovered in (restarted, create_file_resumable_stream_store(tmp_path)):
+        assert await recovered.status("a") == "error"
+        seen: list[str] = []
+        with pytest.raises(RuntimeError, match="interrupted"):
+            async for entry in recovered.read("a", "", asyncio.Event()):
+                seen.append(entry.chunk.decode())
+        assert seen == ["kept"]
+
+
+@pytest.mark.anyio
+async def test_restart_deletes_expired_segments(tmp_path) -> None:
+    store = create_file_resumable_stream_store(tmp_path, default_ttl_ms=50)
+    await store.acquire("a")
+    await store.finalize("a", "done")
+    store.dispose()
+    await asyncio.sleep(0.1)
+
+    restarted = create_file_resumable_stream_store(tmp_path)
+    assert await restarted.status("a") == "missing"
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd"
+)
+async def test_streaming_segments_share_a_bounded_set_of_descriptors(
+    tmp_path,
+) -> None:
+    store = create_file_resumable_stream_store(tmp_path, max_open_files=2)
+    baseline = len(os.listdir("/proc/self/fd"))
+    ids = [f"s{i}" for i in range(6)]
+    for stream_id in ids:
+        await store.acquire(stream_id)
+    for part in range(3):
+        for stream_id in ids:
+            await store.append(stream_id, _bytes(f"{stream_id}-{part}"))
+        assert len(os.listdir("/proc/self/fd")) <= baseline + 2
+    for stream_id in ids:
+        await store.finalize(stream_id, "done")
+    assert len(os.listdir("/proc/self/fd")) <= baseline
+
+    restarted = create_file_resumable_stream_store(tmp_path)
+    for stream_id in ids:
+        assert await _drain(restarted.read(stream_id, "", asyncio.Event())) == [
+            f"{stream_id}-{part}" for part in range(3)
+        ]
+    store.dispose()
+
+
+def test_rejects_unknown_fsync_policy(tmp_path) -> None:
+    with pytest.raises(ValueError, match="fsync"):
+        create_file_resumable_stream_store(tmp_path, fsync="sometimes")
+
+
+def test_rejects_non_positive_max_open_files(tmp_path) -> None:
+    for invalid in (0, -1, 1.5):
+        with pytest.raises(ValueError, match="max_open_files"):
+            create_file_resumable_stream_store(tmp_path, max_open_files=invalid)
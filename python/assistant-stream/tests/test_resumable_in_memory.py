@@ -1,3 +1,7 @@
+"""The resumable stream store contract, run against the in-memory store and
+the segment-file store under each fsync policy, followed by the options only
+the in-memory store has."""
+
 from __future__ import annotations
 
 import asyncio
@@ -6,6 +10,7 @@ import pytest
 
 from assistant_stream.resumable import (
     ResumableStreamError,
+    create_file_resumable_stream_store,
     create_in_memory_resumable_stream_store,
 )
 from assistant_stream.resumable.types import ResumableStreamEntry
@@ -26,9 +31,29 @@ async def _drain(iter_) -> list[str]:
     return out
 
 
+@pytest.fixture(params=["memory", "file-always", "file-finalize", "file-never"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(**options):
+        if request.param == "memory":
+            store = create_in_memory_resumable_stream_store(**options)
+        else:
+            fsync = request.param.removeprefix("file-")
+            store = create_file_resumable_stream_store(
+                tmp_path, fsync=fsync, **options
+            )
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.dispose()
+
+
 @pytest.mark.anyio
-async def test_elects_exactly_one_producer_per_stream_id() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_elects_exactly_one_producer_per_stream_id(make_store) -> None:
+    store = make_store()
     first = await store.acquire("a")
     second = await store.acquire("a")
     third = await store.acquire("a")
@@ -38,31 +63,31 @@ async def test_elects_exactly_one_producer_per_stream_id() -> None:
 
 
 @pytest.mark.anyio
-async def test_stream_id_with_trailing_newline_is_invalid() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_stream_id_with_trailing_newline_is_invalid(make_store) -> None:
+    store = make_store()
     with pytest.raises(ResumableStreamError) as exc:
         await store.acquire("valid-id\n")
     assert exc.value.code == "invalid-id"
 
 
 @pytest.mark.anyio
-async def test_post_finalize_acquire_is_consumer() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_post_finalize_acquire_is_consumer(make_store) -> None:
+    store = make_store()
     assert await store.acquire("a") == "producer"
     await store.finalize("a", "done")
     assert await store.acquire("a") == "consumer"
 
 
 @pytest.mark.anyio
-async def test_isolates_streams_by_id() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_isolates_streams_by_id(make_store) -> None:
+    store = make_store()
     assert await store.acquire("a") == "producer"
     assert await store.acquire("b") == "producer"
 
 
 @pytest.mark.anyio
-async def test_replays_buffered_entries_and_tails_until_finalize() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_replays_buffered_entries_and_tails_until_finalize(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.append("a", _bytes("hello "))
     await store.append("a", _bytes("world"))
@@ -83,8 +108,8 @@ async def test_replays_buffered_entries_and_tails_until_finalize() -> None:
 
 
 @pytest.mark.anyio
-async def test_status_transitions_missing_streaming_done() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_status_transitions_missing_streaming_done(make_store) -> None:
+    store = make_store()
     assert await store.status("a") == "missing"
     await store.acquire("a")
     assert await store.status("a") == "streaming"
@@ -93,16 +118,16 @@ async def test_status_transitions_missing_streaming_done() -> None:
 
 
 @pytest.mark.anyio
-async def test_status_reports_error_after_error_finalize() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_status_reports_error_after_error_finalize(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.finalize("a", "error", "boom")
     assert await store.status("a") == "error"
 
 
 @pytest.mark.anyio
-async def test_read_throws_after_error_finalize_after_draining() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_read_throws_after_error_finalize_after_draining(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.append("a", _bytes("partial"))
     await store.finalize("a", "error", "boom")
@@ -116,8 +141,8 @@ async def test_read_throws_after_error_finalize_after_draining() -> None:
 
 
 @pytest.mark.anyio
-async def test_late_consumer_after_done_replays_everything() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_late_consumer_after_done_replays_everything(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.append("a", _bytes("a"))
     await store.append("a", _bytes("b"))
@@ -129,8 +154,8 @@ async def test_late_consumer_after_done_replays_everything() -> None:
 
 
 @pytest.mark.anyio
-async def test_cursor_advances_and_skips_already_seen() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_cursor_advances_and_skips_already_seen(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.append("a", _bytes("1"))
     await store.append("a", _bytes("2"))
@@ -148,8 +173,18 @@ async def test_cursor_advances_and_skips_already_seen() -> None:
 
 
 @pytest.mark.anyio
-async def test_signal_set_terminates_read_without_raising() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_cursor_past_the_end_reads_only_new_entries(make_store) -> None:
+    store = make_store()
+    await store.acquire("a")
+    await store.append("a", _bytes("x"))
+    await store.finalize("a", "done")
+    assert await _drain(store.read("a", "zz", asyncio.Event())) == []
+    assert await _drain(store.read("a", "not-a-cursor", asyncio.Event())) == ["x"]
+
+
+@pytest.mark.anyio
+async def test_signal_set_terminates_read_without_raising(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     signal = asyncio.Event()
     collected: list[str] = []
@@ -167,8 +202,8 @@ async def test_signal_set_terminates_read_without_raising() -> None:
 
 
 @pytest.mark.anyio
-async def test_multiple_consumers_read_concurrently() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_multiple_consumers_read_concurrently(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     signal = asyncio.Event()
     a = asyncio.create_task(_drain(store.read("a", "", signal)))
@@ -181,8 +216,54 @@ async def test_multiple_consumers_read_concurrently() -> None:
 
 
 @pytest.mark.anyio
-async def test_delete_ends_in_flight_reads_and_status_missing() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_tailing_readers_share_one_wake_up_without_new_tasks(
+    make_store, monkeypatch
+) -> None:
+    store = make_store()
+    await store.acquire("a")
+    signal = asyncio.Event()
+    readers = [
+        asyncio.create_task(_drain(store.read("a", "", signal))) for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+
+    created = 0
+    timers = 0
+    loop = asyncio.get_running_loop()
+
+    def counting_factory(loop, coro, **kwargs):
+        nonlocal created
+        created += 1
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    call_later = loop.call_later
+
+    def counting_call_later(*args, **kwargs):
+        nonlocal timers
+        timers += 1
+        return call_later(*args, **kwargs)
+
+    loop.set_task_factory(counting_factory)
+    monkeypatch.setattr(loop, "call_later", counting_call_later)
+    try:
+        for part in ("x", "y", "z"):
+            await store.append("a", _bytes(part))
+            for _ in range(5):
+                await asyncio.sleep(0)
+    finally:
+        loop.set_task_factory(None)
+        monkeypatch.undo()
+
+    # The stream's one expiry timer was armed by the first wait.
+    assert created == 0
+    assert timers == 0
+    await store.finalize("a", "done")
+    assert await asyncio.gather(*readers) == [["x", "y", "z"]] * 5
+
+
+@pytest.mark.anyio
+async def test_delete_ends_in_flight_reads_and_status_missing(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     signal = asyncio.Event()
     reading = asyncio.create_task(_drain(store.read("a", "", signal)))
@@ -194,13 +275,13 @@ async def test_delete_ends_in_flight_reads_and_status_missing() -> None:
 
 
 @pytest.mark.anyio
-async def test_expired_streams_evicted_on_next_access() -> None:
+async def test_expired_streams_evicted_on_next_access(make_store) -> None:
     now = 1_000.0
 
     def clock() -> float:
         return now
 
-    store = create_in_memory_resumable_stream_store(default_ttl_ms=100, now=clock)
+    store = make_store(default_ttl_ms=100, now=clock)
     await store.acquire("a")
     await store.append("a", _bytes("hi"))
     assert await store.status("a") == "streaming"
@@ -209,13 +290,13 @@ async def test_expired_streams_evicted_on_next_access() -> None:
 
 
 @pytest.mark.anyio
-async def test_appending_refreshes_ttl() -> None:
+async def test_appending_refreshes_ttl(make_store) -> None:
     now = 1_000.0
 
     def clock() -> float:
         return now
 
-    store = create_in_memory_resumable_stream_store(default_ttl_ms=100, now=clock)
+    store = make_store(default_ttl_ms=100, now=clock)
     await store.acquire("a")
     now += 80
     await store.append("a", _bytes("x"))
@@ -224,8 +305,19 @@ async def test_appending_refreshes_ttl() -> None:
 
 
 @pytest.mark.anyio
-async def test_rejects_append_on_finalized_stream() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_read_raises_when_a_stream_expires_while_tailing(make_store) -> None:
+    store = make_store(default_ttl_ms=50)
+    await store.acquire("a")
+    await store.append("a", _bytes("hi"))
+
+    with pytest.raises(RuntimeError, match="Stream expired"):
+        await asyncio.wait_for(_drain(store.read("a", "", asyncio.Event())), 1)
+    assert await store.status("a") == "missing"
+
+
+@pytest.mark.anyio
+async def test_rejects_append_on_finalized_stream(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.finalize("a", "done")
     with pytest.raises(ResumableStreamError, match="already finalized") as exc:
@@ -234,15 +326,15 @@ async def test_rejects_append_on_finalized_stream() -> None:
 
 
 @pytest.mark.anyio
-async def test_rejects_append_on_missing_stream() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_rejects_append_on_missing_stream(make_store) -> None:
+    store = make_store()
     with pytest.raises(Exception, match="Stream not found"):
         await store.append("a", _bytes("x"))
 
 
 @pytest.mark.anyio
-async def test_finalize_is_idempotent() -> None:
-    store = create_in_memory_resumable_stream_store()
+async def test_finalize_is_idempotent(make_store) -> None:
+    store = make_store()
     await store.acquire("a")
     await store.finalize("a", "done")
     await store.finalize("a", "done")
@@ -250,8 +342,8 @@ async def test_finalize_is_idempotent() -> None:
 
 
 @pytest.mark.anyio
-async def test_rejects_append_when_chunk_exceeds_max_chunk_bytes() -> None:
-    store = create_in_memory_resumable_stream_store(max_chunk_bytes=4)
+async def test_rejects_append_when_chunk_exceeds_max_chunk_bytes(make_store) -> None:
+    store = make_store(max_chunk_bytes=4)
     await store.acquire("a")
     with pytest.raises(Exception, match="Chunk exceeds maxChunkBytes: 5"):
         await store.append("a", _bytes("hello"))
@@ -259,6 +351,33 @@ async def test_rejects_append_when_chunk_exceeds_max_chunk_bytes() -> None:
     assert await store.status("a") == "streaming"
 
 
+# Options only the in-memory store has.
+
+
+@pytest.mark.anyio
+async def test_refreshed_streams_survive_their_original_deadline() -> None:
+    now = 1_000.0
+
+    def clock() -> float:
+        return now
+
+    store = create_in_memory_resumable_stream_store(
+        default_ttl_ms=100, max_streams=2, now=clock
+    )
+    await store.acquire("a")
+    await store.acquire("b")
+    now += 80
+    await store.append("a", _bytes("x"))
+    now += 80
+    # "b" expired and is swept by the acquire; "a" was refreshed.
+    assert await store.acquire("c") == "producer"
+    assert await store.status("a") == "streaming"
+    assert await store.status("b") == "missing"
+    now += 200
+    assert await store.acquire("d") == "producer"
+    assert await store.acquire("e") == "producer"
+
+
 @pytest.mark.anyio
 async def test_rejects_append_when_stream_reaches_max_entries() -> None:
     store = create_in_memory_resumable_stream_store(max_entries_per_stream=2)
@@ -279,6 +398,46 @@ async def test_rejects_acquire_when_max_streams_exceeded() -> None:
     assert await store.acquire("a") == "consumer"
 
 
+@pytest.mark.anyio
+async def test_max_total_bytes_evicts_least_recently_used_finalized_first() -> None:
+    store = create_in_memory_resumable_stream_store(max_total_bytes=12)
+    for stream_id in ("old", "live", "recent"):
+        await store.acquire(stream_id)
+        await store.append(stream_id, _bytes("1234"))
+    await store.finalize("old", "done")
+    await store.finalize("recent", "done")
+    await store.acquire("new")
+
+    await store.append("new", _bytes("abcd"))
+    assert await store.status("old") == "missing"
+    assert await store.status("live") == "streaming"
+    assert await store.status("recent") == "done"
+
+    await store.append("new", _bytes("efgh"))
+    assert await store.status("recent") == "missing"
+    assert await store.status("live") == "streaming"
+
+
+@pytest.mark.anyio
+async def test_max_total_bytes_evicts_idle_streaming_streams_last() -> None:
+    store = create_in_memory_resumable_stream_store(max_total_bytes=8)
+    await store.acquire("idle")
+    await store.append("idle", _bytes("1234"))
+    reader = asyncio.create_task(_drain(store.read("idle", "", asyncio.Event())))
+    await store.acquire("busy")
+    await store.append("busy", _bytes("1234"))
+    await asyncio.sleep(0)
+
+    await store.append("busy", _bytes("5678"))
+    assert await store.status("idle") == "missing"
+    with pytest.raises(RuntimeError, match="Stream evicted"):
+        await reader
+    with pytest.raises(RuntimeError, match="maxTotalBytes"):
+        await store.append("busy", _bytes("9"))
+    await store.finalize("busy", "done")
+    assert await _drain(store.read("busy", "", asyncio.Event())) == ["1234", "5678"]
+
+
 @pytest.mark.anyio
 async def test_gc_sweeper_evicts_expired_streams() -> None:
     now = 1_000.0
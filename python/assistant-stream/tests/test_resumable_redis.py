@@ -26,8 +26,8 @@ def _decode(chunk: bytes) -> str:
     return chunk.decode("utf-8")
 
 
-@pytest.fixture
-async def redis_store():
+@pytest.fixture(params=[True, False], ids=["scripts", "commands"])
+async def redis_store(request):
     import redis.asyncio as redis
 
     from assistant_stream.resumable import create_redis_resumable_stream_store
@@ -38,6 +38,7 @@ async def redis_store():
         client,
         key_prefix=key_prefix,
         poll_interval_ms=25,
+        scripts=request.param,
     )
     try:
         yield store, client, key_prefix
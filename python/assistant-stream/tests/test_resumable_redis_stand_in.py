@@ -0,0 +1,248 @@
+"""RedisResumableStreamStore against in-process Redis stand-ins, covering
+both the XREAD BLOCK and the XRANGE polling read paths, and scripted and
+pipelined writes, without a server."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from assistant_stream.resumable.errors import ResumableStreamError
+from assistant_stream.resumable.stores.redis import RedisResumableStreamStore
+from tests.redis_stand_in import PollingRedisStandIn, RedisStandIn
+
+
+@pytest.fixture(params=[RedisStandIn, PollingRedisStandIn])
+def client(request):
+    return request.param()
+
+
+def _store(client, **kwargs) -> RedisResumableStreamStore:
+    return RedisResumableStreamStore(
+        client, poll_interval_ms=10, block_ms=50, **kwargs
+    )
+
+
+@pytest.mark.anyio
+async def test_replays_and_tails_until_done(client) -> None:
+    store = _store(client, read_count=2)
+    await store.acquire("a")
+    for piece in ("one ", "two ", "three "):
+        await store.append("a", piece.encode())
+
+    signal = asyncio.Event()
+    collected: list[str] = []
+
+    async def reading() -> None:
+        async for entry in store.read("a", "", signal):
+            collected.append(entry.chunk.decode())
+
+    task = asyncio.create_task(reading())
+    await asyncio.sleep(0.02)
+    await store.append("a", b"four")
+    await store.finalize("a", "done")
+    await asyncio.wait_for(task, 1)
+
+    assert collected == ["one ", "two ", "three ", "four"]
+
+
+@pytest.mark.anyio
+async def test_catch_up_is_paged(client) -> None:
+    store = _store(client, read_count=2)
+    await store.acquire("a")
+    for i in range(5):
+        await store.append("a", str(i).encode())
+    await store.finalize("a", "done")
+
+    entries = [entry async for entry in store.read("a", "", asyncio.Event())]
+
+    assert [entry.chunk for entry in entries] == [b"0", b"1", b"2", b"3", b"4"]
+    if isinstance(client, RedisStandIn):
+        # Pages of 2, 2, then the last entry with the fin marker.
+        assert client.commands["xread"] == 3
+
+
+@pytest.mark.anyio
+async def test_error_is_raised_after_draining_from_a_cursor(client) -> None:
+    store = _store(client)
+    await store.acquire("a")
+    await store.append("a", b"1")
+    await store.append("a", b"2")
+    await store.finalize("a", "error", "boom")
+
+    first = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for entry in store.read("a", "", asyncio.Event()):
+            first.append(entry)
+    seen = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for entry in store.read("a", first[0].cursor, asyncio.Event()):
+            seen.append(entry.chunk)
+
+    assert seen == [b"2"]
+
+
+@pytest.mark.anyio
+async def test_signal_ends_a_waiting_read_promptly(client) -> None:
+    store = RedisResumableStreamStore(client, poll_interval_ms=5_000, block_ms=5_000)
+    await store.acquire("a")
+    signal = asyncio.Event()
+
+    async def reading() -> list:
+        return [entry async for entry in store.read("a", "", signal)]
+
+    task = asyncio.create_task(reading())
+    await asyncio.sleep(0.01)
+    signal.set()
+
+    assert await asyncio.wait_for(task, 0.5) == []
+
+
+@pytest.mark.anyio
+async def test_idle_tailing_reader_issues_few_commands() -> None:
+    client = RedisStandIn()
+    store = RedisResumableStreamStore(client, block_ms=100)
+    await store.acquire("a")
+    signal = asyncio.Event()
+
+    async def reading() -> None:
+        async for _ in store.read("a", "", signal):
+            pass
+
+    task = asyncio.create_task(reading())
+    await asyncio.sleep(0.35)
+    signal.set()
+    await task
+
+    # One blocking XREAD and one EXISTS per block_ms, not per poll.
+    assert client.commands["xread"] <= 5
+    assert client.commands["exists"] <= 4
+    assert "xrange" not in client.commands
+
+
+@pytest.mark.anyio
+async def test_scripted_writes_take_one_round_trip_each() -> None:
+    scripted, pipelined = RedisStandIn(), RedisStandIn()
+    for client, scripts in ((scripted, True), (pipelined, False)):
+        store = RedisResumableStreamStore(client, scripts=scripts)
+        await store.acquire("a")
+        for _ in range(10):
+            await store.append("a", b"x")
+        await store.finalize("a", "done")
+
+    assert scripted.round_trips == 12
+    assert pipelined.round_trips == 2 + 10 * 2 + 2
+    assert scripted.streams == pipelined.streams
+
+
+@pytest.mark.anyio
+async def test_append_rejects_missing_and_finalized_streams(client) -> None:
+    store = _store(client)
+    with pytest.raises(RuntimeError, match="Stream not found"):
+        await store.append("a", b"x")
+    with pytest.raises(RuntimeError, match="Stream not found"):
+        await store.finalize("a", "done")
+
+    assert await store.acquire("a") == "producer"
+    assert await store.acquire("a") == "consumer"
+    await store.finalize("a", "error", "boom")
+    await store.finalize("a", "done")
+    with pytest.raises(ResumableStreamError):
+        await store.append("a", b"x")
+    assert await store.status("a") == "error"
+
+
+@pytest.mark.anyio
+async def test_scripted_append_refreshes_ttls_lazily() -> None:
+    client = RedisStandIn()
+    store = RedisResumableStreamStore(client, default_ttl_ms=60_000)
+    await store.acquire("a")
+    data_key, meta_key = store._data_key("a"), store._meta_key("a")
+
+    await store.append("a", b"1")
+    deadline = client.expires_at[data_key]
+    await store.append("a", b"2")
+    assert client.expires_at[data_key] == deadline
+
+    # Past half the TTL, the next append extends both keys again.
+    client.expires_at[data_key] = client.expires_at[meta_key] = time.monotonic() + 20
+    await store.append("a", b"3")
+    assert client.pttl(data_key) > 50_000
+    assert client.pttl(meta_key) > 50_000
+
+
+@pytest.mark.anyio
+async def test_combined_appends_share_round_trips_and_keep_order() -> None:
+    client = RedisStandIn()
+    store = RedisResumableStreamStore(client, combine_ms=5)
+    stream_ids = [f"s{i}" for i in range(50)]
+    for stream_id in stream_ids:
+        await store.acquire(stream_id)
+    client.round_trips = 0
+
+    async def produce(stream_id: str) -> None:
+        for i in range(4):
+            await store.append(stream_id, str(i).encode())
+
+    await asyncio.gather(*(produce(stream_id) for stream_id in stream_ids))
+
+    assert client.round_trips == 4
+    assert client.commands["evalsha"] >= 200
+    for stream_id in stream_ids:
+        chunks = [fields["c"] for _, fields in client.streams[store._data_key(stream_id)]]
+        assert chunks == [b"0", b"1", b"2", b"3"]
+
+
+@pytest.mark.anyio
+async def test_combined_append_errors_reach_only_their_caller() -> None:
+    store = RedisResumableStreamStore(RedisStandIn(), combine_ms=0)
+    await store.acquire("open")
+    await store.acquire("closed")
+    await store.finalize("closed", "done")
+
+    results = await asyncio.gather(
+        store.append("open", b"x"),
+        store.append("closed", b"x"),
+        store.append("missing", b"x"),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], ResumableStreamError)
+    assert isinstance(results[2], RuntimeError)
+    assert "Stream not found" in str(results[2])
+
+
+@pytest.mark.anyio
+async def test_failed_combined_pipeline_fails_every_caller() -> None:
+    class Unreachable(RedisStandIn):
+        async def run_scripts(self, calls):
+            raise ConnectionError("connection refused")
+
+    store = RedisResumableStreamStore(Unreachable(), combine_ms=0)
+    await store.acquire("a")
+    await store.acquire("b")
+
+    results = await asyncio.gather(
+        store.append("a", b"x"), store.append("b", b"x"), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_rejects_invalid_combine_options() -> None:
+    with pytest.raises(ValueError, match="combine_ms"):
+        RedisResumableStreamStore(RedisStandIn(), combine_ms=-1)
+    with pytest.raises(ValueError, match="run_scripts"):
+        RedisResumableStreamStore(PollingRedisStandIn(), combine_ms=1)
+    with pytest.raises(ValueError, match="run_scripts"):
+        RedisResumableStreamStore(RedisStandIn(), combine_ms=1, scripts=False)
+
+
+def test_rejects_invalid_read_options() -> None:
+    with pytest.raises(ValueError, match="block_ms"):
+        RedisResumableStreamStore(RedisStandIn(), block_ms=0)
+    with pytest.raises(ValueError, match="read_count"):
+        RedisResumableStreamStore(RedisStandIn(), read_count=0)
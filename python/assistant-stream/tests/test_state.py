@@ -1,13 +1,17 @@
+import copy
+import random
 from typing import Any
 
 import pytest
 
+from assistant_stream import state as state_module
 from assistant_stream.state import (
     Flusher,
     AssistantState,
     StateDraft,
     StateProxy,
     deep_apply,
+    deep_apply_batch,
     lookup_state,
 )
 
@@ -74,6 +78,116 @@ def test_deep_apply_append_text_to_non_string_raises() -> None:
         deep_apply({"text": 42}, op["path"], op)
 
 
+def _random_path(rng: random.Random) -> list[str]:
+    keys = ["messages", "0", "00", "1", "01", "2", "3", "parts", "text", "x"]
+    return [rng.choice(keys) for _ in range(rng.randint(0, 5))]
+
+
+def _random_operation(rng: random.Random) -> dict[str, Any]:
+    path = _random_path(rng)
+    if rng.random() < 0.5:
+        return {"type": "append-text", "path": path, "value": rng.choice("abc")}
+    value = rng.choice(["s", 1, None, [], ["a"], {}, {"text": "t"}])
+    return {"type": "set", "path": path, "value": copy.deepcopy(value)}
+
+
+def _sequential_outcome(state: Any, operations: list[dict[str, Any]]) -> Any:
+    try:
+        for op in operations:
+            state = deep_apply(state, op["path"], op)
+    except (KeyError, TypeError) as err:
+        return type(err)
+    return state
+
+
+def test_deep_apply_batch_matches_sequential_deep_apply() -> None:
+    rng = random.Random(1234)
+    for _ in range(3000):
+        initial = rng.choice(
+            [
+                None,
+                {},
+                {"messages": [{"parts": [{"text": "a"}]}]},
+                {"messages": [], "x": "s"},
+                ["a", {"text": ""}],
+            ]
+        )
+        operations = [_random_operation(rng) for _ in range(rng.randint(1, 12))]
+        snapshot = copy.deepcopy(initial)
+        expected = _sequential_outcome(initial, operations)
+        try:
+            actual = deep_apply_batch(initial, operations)
+        except (KeyError, TypeError) as err:
+            actual = type(err)
+        assert actual == expected, operations
+        assert initial == snapshot
+
+
+def test_deep_apply_batch_copies_each_shared_prefix_once() -> None:
+    state = {"messages": [{"parts": [{"text": ""}]}], "other": {"kept": True}}
+    operations = [
+        {"type": "append-text", "path": ["messages", "0", "parts", "0", "text"], "value": c}
+        for c in "hello"
+    ]
+    operations.append(
+        {"type": "set", "path": ["messages", "0", "parts", "1"], "value": {"text": "!"}}
+    )
+
+    result = deep_apply_batch(state, operations)
+
+    assert result == {
+        "messages": [{"parts": [{"text": "hello"}, {"text": "!"}]}],
+        "other": {"kept": True},
+    }
+    assert result["other"] is state["other"]
+    assert state["messages"][0]["parts"] == [{"text": ""}]
+
+
+def test_state_apply_keeps_ops_before_failure() -> None:
+    state = AssistantState({"items": [], "text": 1})
+    with pytest.raises(TypeError):
+        state.apply(
+            [
+                {"type": "set", "path": ["items", "0"], "value": "a"},
+                {"type": "append-text", "path": ["text"], "value": "x"},
+                {"type": "set", "path": ["items", "1"], "value": "b"},
+            ]
+        )
+    assert state.state == {"items": ["a"], "text": 1}
+
+
+def test_state_apply_replays_a_failing_batch_once(monkeypatch) -> None:
+    replayed = []
+
+    def counting_deep_apply(target, path, op):
+        if path is op["path"]:
+            replayed.append(op)
+        return deep_apply(target, path, op)
+
+    monkeypatch.setattr(state_module, "deep_apply", counting_deep_apply)
+    operations = [
+        {"type": "set", "path": ["items", "0"], "value": "a"},
+        {"type": "append-text", "path": ["text"], "value": "x"},
+        {"type": "set", "path": ["items", "1"], "value": "b"},
+    ]
+    state = AssistantState({"items": [], "text": 1})
+    with pytest.raises(TypeError):
+        state.apply(operations)
+    assert replayed == operations[:2]
+
+
+def test_batched_list_keys_are_grouped_by_index() -> None:
+    state = AssistantState({"items": [{"x": 0}]})
+    state.apply(
+        [
+            {"type": "set", "path": ["items", "00", "x"], "value": 1},
+            {"type": "set", "path": ["items", "0", "x"], "value": 2},
+            {"type": "set", "path": ["items", "00", "x"], "value": 3},
+        ]
+    )
+    assert state.state == {"items": [{"x": 3}]}
+
+
 def test_lookup_state_resolves_nested_paths() -> None:
     state = {"messages": [{"text": "hi"}]}
     assert lookup_state(state, []) is state
@@ -187,6 +301,41 @@ def test_draft_rejects_storing_proxy_in_state() -> None:
     assert state.state == {"orig": {"a": 1}, "copy": None, "items": []}
 
 
+def test_draft_rejects_proxies_nested_deep_in_large_values() -> None:
+    ops: list[dict[str, Any]] = []
+    state = AssistantState({"orig": {"a": 1}, "result": None})
+    draft = state.draft(ops.extend)
+    rows = [{"id": i, "tags": ["x"]} for i in range(5000)]
+    rows.append({"ref": (draft["orig"],)})
+
+    with pytest.raises(ValueError):
+        draft["result"] = rows
+
+    rows.pop()
+    draft["result"] = rows
+
+    assert ops[0]["value"] is rows
+    assert state.state["result"] is rows
+
+
+def test_draft_walks_shared_and_cyclic_values_once() -> None:
+    state = AssistantState({"orig": {"a": 1}, "result": None})
+    draft = state.draft(lambda _ops: None)
+    cycle: list[Any] = []
+    cycle.append(cycle)
+    cycle.append(cycle)
+    # 2**60 paths lead to the bottom of this value but only 60 lists.
+    shared: list[Any] = [draft["orig"]]
+    for _ in range(60):
+        shared = [shared, shared]
+
+    draft["result"] = cycle
+    with pytest.raises(ValueError):
+        draft["result"] = shared
+
+    assert state.state["result"] is cycle
+
+
 def test_draft_list_iadd_plain_values_emits_indexed_sets() -> None:
     ops: list[dict[str, Any]] = []
     state = AssistantState({"items": ["a"]})
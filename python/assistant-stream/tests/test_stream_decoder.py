@@ -0,0 +1,281 @@
+import random
+
+import pytest
+
+from assistant_stream.assistant_stream_chunk import (
+    AnnotationsChunk,
+    DataChunk,
+    ErrorChunk,
+    FileChunk,
+    ReasoningDeltaChunk,
+    ReasoningPartStartChunk,
+    SourceChunk,
+    StepFinishChunk,
+    StepStartChunk,
+    TextDeltaChunk,
+    ToolCallArgsTextFinishChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization.assistant_transport import (
+    AssistantTransportDecoder,
+    AssistantTransportEncoder,
+)
+from assistant_stream.serialization.data_stream import (
+    DataStreamDecoder,
+    DataStreamEncoder,
+)
+from assistant_stream.serialization.stream_decoder import _LineBuffer, relay
+from tests.generate_interop_fixture import CHUNKS, FIXTURE_PATH
+
+FORMATS = [
+    (DataStreamEncoder, DataStreamDecoder),
+    (AssistantTransportEncoder, AssistantTransportDecoder),
+]
+
+TEXTS = ["", "a", "hello ", "naïve ", "日本語", "emoji 🎉", 'quote "x"\n', "\\"]
+
+
+def _random_chunks(rng: random.Random) -> list:
+    chunks = []
+    open_tools: list[str] = []
+    settled_tools: list[str] = []
+    tool_counter = 0
+    parents = [None, None, "p1", "p2"]
+    for _ in range(rng.randint(1, 40)):
+        roll = rng.random()
+        if roll < 0.3:
+            chunks.append(
+                TextDeltaChunk(
+                    text_delta=rng.choice(TEXTS), parent_id=rng.choice(parents)
+                )
+            )
+        elif roll < 0.38:
+            chunks.append(
+                ReasoningDeltaChunk(
+                    reasoning_delta=rng.choice(TEXTS), parent_id=rng.choice(parents)
+                )
+            )
+        elif roll < 0.41:
+            chunks.append(
+                ReasoningPartStartChunk(
+                    unstable_summary=rng.choice([None, "summary"]),
+                    parent_id=rng.choice(parents),
+                )
+            )
+        elif roll < 0.48:
+            tool_counter += 1
+            tool_call_id = f"call_{tool_counter}"
+            open_tools.append(tool_call_id)
+            chunks.append(
+                ToolCallBeginChunk(
+                    tool_call_id=tool_call_id,
+                    tool_name=rng.choice(["search", "fetch"]),
+                    parent_id=rng.choice(parents),
+                )
+            )
+        elif roll < 0.58 and open_tools:
+            chunks.append(
+                ToolCallDeltaChunk(
+                    tool_call_id=rng.choice(open_tools),
+                    args_text_delta=rng.choice(['{"q": ', '"x"', "}", "日"]),
+                )
+            )
+        elif roll < 0.62 and open_tools:
+            tool_call_id = open_tools.pop(rng.randrange(len(open_tools)))
+            settled_tools.append(tool_call_id)
+            chunks.append(
+                ToolCallArgsTextFinishChunk(
+                    tool_call_id=tool_call_id, args_text_delta=rng.choice(["", "}"])
+                )
+            )
+        elif roll < 0.67 and (open_tools or settled_tools):
+            pool = rng.choice([pool for pool in (open_tools, settled_tools) if pool])
+            tool_call_id = pool.pop(rng.randrange(len(pool)))
+            chunks.append(
+                ToolResultChunk(
+                    tool_call_id=tool_call_id,
+                    result=rng.choice([{"temp": 70}, "ok", [1, 2], None]),
+                    artifact=rng.choice([None, {"a": 1}]),
+                    is_error=rng.random() < 0.2,
+                )
+            )
+        elif roll < 0.72:
+            chunks.append(DataChunk(data=rng.choice([{"progress": 1}, [1], "x", 3])))
+        elif roll < 0.75:
+            chunks.append(AnnotationsChunk(annotations=[{"id": rng.randint(0, 9)}]))
+        elif roll < 0.8:
+            chunks.append(StepStartChunk(message_id=f"msg_{rng.randint(0, 9)}"))
+        elif roll < 0.85:
+            chunks.append(
+                StepFinishChunk(
+                    finish_reason=rng.choice(["stop", "tool-calls"]),
+                    input_tokens=rng.randint(0, 100),
+                    output_tokens=rng.randint(0, 100),
+                    is_continued=rng.random() < 0.5,
+                )
+            )
+        elif roll < 0.9:
+            chunks.append(
+                UpdateStateChunk(
+                    operations=[
+                        {
+                            "type": rng.choice(["set", "append-text"]),
+                            "path": ["messages", str(rng.randint(0, 3))],
+                            "value": rng.choice(TEXTS),
+                        }
+                    ]
+                )
+            )
+        elif roll < 0.93:
+            chunks.append(
+                SourceChunk(
+                    id="s1",
+                    url="https://example.com",
+                    title=rng.choice([None, "Example"]),
+                    parent_id=rng.choice(parents),
+                )
+            )
+        elif roll < 0.96:
+            chunks.append(FileChunk(data="aGVsbG8=", mime_type="image/png"))
+        else:
+            chunks.append(ErrorChunk(error=rng.choice(TEXTS)))
+    return chunks
+
+
+async def _encode(encoder, chunks) -> bytes:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return b"".join([frame async for frame in encoder.encode_stream_bytes(stream())])
+
+
+def _split(rng: random.Random, data: bytes) -> list[bytes]:
+    pieces = []
+    start = 0
+    while start < len(data):
+        end = start + rng.randint(1, 24)
+        pieces.append(data[start:end])
+        start = end
+    return pieces
+
+
+def _decode(decoder, pieces) -> list:
+    chunks = []
+    for piece in pieces:
+        chunks.extend(decoder.feed(piece))
+    chunks.extend(decoder.close())
+    return chunks
+
+
+@pytest.mark.parametrize("encoder_cls,decoder_cls", FORMATS)
+@pytest.mark.anyio
+async def test_round_trip_fuzz(encoder_cls, decoder_cls):
+    rng = random.Random(0x5EED)
+    for _ in range(300):
+        chunks = _random_chunks(rng)
+        wire = await _encode(encoder_cls(), chunks)
+
+        decoded = _decode(decoder_cls(), _split(rng, wire))
+        assert await _encode(encoder_cls(), decoded) == wire
+        # Decoding is a fixed point after one round trip.
+        assert _decode(decoder_cls(), [wire]) == decoded
+
+
+@pytest.mark.anyio
+async def test_compact_dialect_round_trip_fuzz():
+    rng = random.Random(0xC0DE)
+    for _ in range(300):
+        chunks = _random_chunks(rng)
+        wire = await _encode(DataStreamEncoder(compact=True), chunks)
+
+        decoded = _decode(DataStreamDecoder(), _split(rng, wire))
+        assert await _encode(DataStreamEncoder(), decoded) == await _encode(
+            DataStreamEncoder(), chunks
+        )
+
+
+@pytest.mark.anyio
+async def test_assistant_transport_decodes_interop_fixture():
+    decoder = AssistantTransportDecoder()
+    decoded = _decode(decoder, [FIXTURE_PATH.read_bytes()])
+
+    assert decoded == CHUNKS
+    assert await _encode(AssistantTransportEncoder(), decoded) == (
+        FIXTURE_PATH.read_bytes()
+    )
+
+
+@pytest.mark.anyio
+async def test_relay_transcodes_between_formats():
+    rng = random.Random(7)
+    chunks = _random_chunks(rng)
+    data_stream = await _encode(DataStreamEncoder(), chunks)
+
+    async def upstream():
+        for piece in _split(rng, data_stream):
+            yield piece
+
+    relayed = b"".join(
+        [
+            frame
+            async for frame in relay(
+                upstream(), DataStreamDecoder(), AssistantTransportEncoder()
+            )
+        ]
+    )
+
+    direct = await _encode(
+        AssistantTransportEncoder(), _decode(DataStreamDecoder(), [data_stream])
+    )
+    assert relayed == direct
+    assert relayed.endswith(b"data: [DONE]\n\n")
+
+
+def test_data_stream_decoder_skips_keepalives_and_invalid_lines(caplog):
+    decoder = DataStreamDecoder()
+    chunks = decoder.feed(b'\n0:"a"\nnot a frame\n0:{broken\nzz:1\n2:{"x":1}\n0:"b"')
+    chunks += decoder.close()
+
+    assert chunks == [TextDeltaChunk(text_delta="a"), TextDeltaChunk(text_delta="b")]
+    assert "missing-prefix" in caplog.text
+    assert "unparseable" in caplog.text
+    assert "unknown-type:zz" in caplog.text
+    assert "invalid-fields:2" in caplog.text
+
+
+def test_assistant_transport_decoder_handles_sse_framing():
+    decoder = AssistantTransportDecoder()
+    chunks = decoder.feed(
+        b": heartbeat\r\n\r\n"
+        b'data: {"type": "step-start",\r\n'
+        b'data:  "messageId": "m"}\r\n\r\n'
+        b"data: [DONE]\n\n"
+        b'data: {"type": "step-start", "messageId": "late"}\n\n'
+    )
+    chunks += decoder.close()
+
+    assert chunks == [StepStartChunk(message_id="m")]
+
+
+def test_assistant_transport_decoder_strictness():
+    with pytest.raises(ValueError, match="without receiving"):
+        AssistantTransportDecoder().close()
+    with pytest.raises(ValueError, match="Unknown SSE event type"):
+        AssistantTransportDecoder().feed(b"event: ping\ndata: {}\n\n")
+
+    lenient = AssistantTransportDecoder(strict=False)
+    assert lenient.feed(b"event: ping\ndata: {}\n\n") == []
+    assert lenient.close() == []
+
+
+def test_line_buffer_joins_fragments_once():
+    buffer = _LineBuffer()
+    assert buffer.feed(b"ab") == []
+    assert buffer.feed(b"cd") == []
+    assert buffer.feed(b"e\nf") == [b"abcde"]
+    assert buffer.feed(b"\n\n") == [b"f", b""]
+    assert buffer.close() == []
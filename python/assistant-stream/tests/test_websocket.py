@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+from starlette.applications import Starlette
+from starlette.routing import WebSocketRoute
+from starlette.testclient import TestClient
+
+from assistant_stream import RunController, create_run
+from assistant_stream.serialization.data_stream import DataStreamDecoder
+from assistant_stream.serialization.websocket import WebSocketMultiplexer
+
+
+def _client(multiplexer) -> TestClient:
+    return TestClient(Starlette(routes=[WebSocketRoute("/runs", multiplexer)]))
+
+
+def _receive(ws, decoders, frames) -> dict:
+    """Read until the next control message, decoding data messages."""
+    while True:
+        message = ws.receive()
+        data = message.get("text") or message.get("bytes")
+        if isinstance(data, bytes):
+            data = data.decode()
+        if data.startswith("{"):
+            return json.loads(data)
+        run_id, _, body = data.partition("\n")
+        frames.setdefault(run_id, []).extend(decoders[run_id].feed(body))
+
+
+def test_runs_are_multiplexed_on_one_connection():
+    def start_run(payload):
+        async def run(controller: RunController):
+            for i in range(payload["count"]):
+                controller.append_text(f"{payload['word']}{i} ")
+                await asyncio.sleep(0)
+
+        return create_run(run)
+
+    decoders = {"a": DataStreamDecoder(), "b": DataStreamDecoder()}
+    frames: dict = {}
+    with _client(WebSocketMultiplexer(start_run, binary=True)) as client:
+        with client.websocket_connect("/runs") as ws:
+            ws.send_json({"type": "start", "runId": "a", "payload": {"word": "x", "count": 50}})
+            ws.send_json({"type": "start", "runId": "b", "payload": {"word": "y", "count": 30}})
+            ended = {_receive(ws, decoders, frames)["runId"] for _ in range(2)}
+
+    assert ended == {"a", "b"}
+    assert "".join(c.text_delta for c in frames["a"]) == "".join(
+        f"x{i} " for i in range(50)
+    )
+    assert len(frames["b"]) == 30
+
+
+def test_window_pauses_a_run_until_acked():
+    def start_run(payload):
+        async def run(controller: RunController):
+            for i in range(200):
+                controller.append_text("z" * 100)
+                await asyncio.sleep(0)
+
+        return create_run(run)
+
+    decoders = {"a": DataStreamDecoder()}
+    with _client(WebSocketMultiplexer(start_run)) as client:
+        with client.websocket_connect("/runs") as ws:
+            ws.send_json({"type": "start", "runId": "a", "window": 1000})
+            received = 0
+            while True:
+                message = ws.receive_text()
+                if message.startswith("{"):
+                    assert json.loads(message) == {"type": "end", "runId": "a"}
+                    break
+                body = message.partition("\n")[2]
+                # The client acks each message before the next is sent.
+                assert len(body) <= 1000
+                received += len(decoders["a"].feed(body))
+                ws.send_json({"type": "ack", "runId": "a", "bytes": len(body)})
+
+    assert received == 200
+
+
+def test_cancel_message_cancels_the_run_controller():
+    observed = {}
+
+    def start_run(payload):
+        async def run(controller: RunController):
+            controller.append_text("start")
+            await controller.cancelled_event.wait()
+            observed["cancelled"] = controller.is_cancelled
+
+        return create_run(run)
+
+    with _client(WebSocketMultiplexer(start_run)) as client:
+        with client.websocket_connect("/runs") as ws:
+            ws.send_json({"type": "start", "runId": "a"})
+            assert ws.receive_text() == 'a\n0:"start"\n'
+            ws.send_json({"type": "cancel", "runId": "a"})
+            assert ws.receive_json() == {"type": "cancelled", "runId": "a"}
+
+            ws.send_json({"type": "start", "runId": "{bad"})
+            assert ws.receive_json()["error"] == "Invalid run id"
+            ws.send_text("not json")
+            assert ws.receive_json() == {"type": "error", "error": "Invalid message"}
+
+    assert observed == {"cancelled": True}
+
+
+def test_non_string_run_ids_are_rejected_without_closing():
+    def start_run(payload):
+        async def run(controller: RunController):
+            controller.append_text("ok")
+
+        return create_run(run)
+
+    with _client(WebSocketMultiplexer(start_run)) as client:
+        with client.websocket_connect("/runs") as ws:
+            for kind in ("start", "ack", "cancel"):
+                for run_id in ([], {"a": 1}, 1, None):
+                    ws.send_json({"type": kind, "runId": run_id, "bytes": 1})
+                    assert ws.receive_json() == {
+                        "type": "error",
+                        "error": "Invalid message",
+                    }
+            ws.send_json({"type": "start", "runId": "a"})
+            assert ws.receive_text() == 'a\n0:"ok"\n'
+            assert ws.receive_json() == {"type": "end", "runId": "a"}
+
+
+def test_errors_end_only_their_run():
+    def start_run(payload):
+        async def run(controller: RunController):
+            if payload == "fail":
+                raise RuntimeError("boom")
+            controller.append_text("ok")
+
+        return create_run(run)
+
+    with _client(WebSocketMultiplexer(start_run)) as client:
+        with client.websocket_connect("/runs") as ws:
+            ws.send_json({"type": "start", "runId": "bad", "payload": "fail"})
+            assert ws.receive_text() == 'bad\n3:"boom"\n'
+            assert ws.receive_json() == {"type": "error", "runId": "bad", "error": "boom"}
+            ws.send_json({"type": "start", "runId": "good"})
+            assert ws.receive_text() == 'good\n0:"ok"\n'
+            assert ws.receive_json() == {"type": "end", "runId": "good"}